@@ -0,0 +1,65 @@
+"""
+Memory cost of a game, measured with tracemalloc.
+
+    python -m benchmarks.alloc --games 2000
+
+Reports the bytes a finished game keeps alive (deck, hands, players, round
+history), the bytes still held after creating a game, and the peak extra
+memory while one game is played, all per game. Also times full games, since
+tracing is off for that part.
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from diamond_game.tournament import game_id, new_game, play_game
+
+LEVELS = ("medium", "expert")
+
+
+def retained(build, n: int) -> float:
+    """Bytes per object still allocated while `n` objects from `build` are alive."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    keep = [build(i) for i in range(n)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del keep
+    return (after - before) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=2000)
+    args = parser.parse_args()
+    n = args.games
+
+    created = retained(lambda i: new_game(LEVELS, game_id(0, i)), n)
+    finished = retained(lambda i: play_game(LEVELS, game_id(0, i)), n)
+
+    peaks = []
+    for i in range(200):
+        g = new_game(LEVELS, game_id(1, i))
+        gc.collect()
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        while not g.is_over():
+            g.play_round()
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+        tracemalloc.stop()
+
+    start = time.perf_counter()
+    for i in range(n):
+        play_game(LEVELS, game_id(2, i))
+    elapsed = time.perf_counter() - start
+
+    print(f"new game, retained       {created:10,.0f} bytes/game")
+    print(f"finished game, retained  {finished:10,.0f} bytes/game")
+    print(f"playing a game, peak     {sum(peaks) / len(peaks):10,.0f} bytes above the new game")
+    print(f"play_game                {n / elapsed:10,.0f} games/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+In-process load test for the async API (no network, ASGI transport).
+
+    python -m benchmarks.api_load --games 2000 --concurrency 500
+
+Creates `--games` games, then plays every game to the end with all games in
+flight at once (bounded by `--concurrency` outstanding requests), polling
+status after each round. Reports p50/p99 latency and requests/sec per endpoint.
+"""
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import httpx
+
+from diamond_game.api import app
+from diamond_game.storage import manager
+
+
+def _pct(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def run(games: int, concurrency: int, levels: List[str]) -> Dict[str, List[float]]:
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    sem = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def call(op: str, method: str, url: str, **kw) -> httpx.Response:
+            async with sem:
+                start = time.perf_counter()
+                r = await client.request(method, url, **kw)
+                latencies[op].append(time.perf_counter() - start)
+            r.raise_for_status()
+            return r
+
+        async def one_game() -> None:
+            r = await call("create", "POST", "/games", json={"bot_levels": levels})
+            game_id = r.json()["game_id"]
+            active = True
+            while active:
+                active = (await call("play", "POST", f"/games/{game_id}/play")).json()["active"]
+                await call("status", "GET", f"/games/{game_id}")
+
+        await asyncio.gather(*(one_game() for _ in range(games)))
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--levels", nargs=2, default=["medium", "expert"])
+    args = parser.parse_args()
+
+    manager.capacity = max(manager.capacity or 0, args.games)
+    start = time.perf_counter()
+    latencies = asyncio.run(run(args.games, args.concurrency, args.levels))
+    elapsed = time.perf_counter() - start
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"{args.games} games, {total} requests in {elapsed:.2f}s ({total / elapsed:,.0f} req/s)")
+    for op in ("create", "play", "status"):
+        v = latencies[op]
+        print(
+            f"{op:<7} {len(v):>7} reqs | p50 {_pct(v, 0.5) * 1e3:7.2f} ms | "
+            f"p99 {_pct(v, 0.99) * 1e3:7.2f} ms | {len(v) / elapsed:,.0f} req/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
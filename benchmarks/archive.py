@@ -0,0 +1,99 @@
+"""
+Replay archive size, write rate, random access and scan rate against CSV.
+
+    python -m benchmarks.archive --games 1000000
+
+Plays games on the batched engine and appends them to a fresh archive, checks
+a sample against the scalar `Game`, then times O(1) lookups, a full
+vectorized scan (win counts and mean score difference) and, for comparison,
+parsing `diamond_game_summary.csv`.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from diamond_game.archive import Archive, ArchiveWriter
+from diamond_game.batched import play_batch, tournament_ids
+from diamond_game.results import read_summary_csv
+from diamond_game.tournament import play_game
+
+LEVELS = ("medium", "expert")
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "diamond_game_summary.csv")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=1_000_000)
+    parser.add_argument("--block", type=int, default=100_000, help="games per batched run")
+    parser.add_argument("--path", default=None, help="archive to write (default: a temp file)")
+    args = parser.parse_args()
+    path = args.path or os.path.join(tempfile.mkdtemp(), "games.dga")
+    if os.path.exists(path):
+        os.remove(path)
+
+    ids = tournament_ids(0, args.games)
+    play_time = write_time = 0.0
+    with ArchiveWriter(path) as out:
+        for start in range(0, args.games, args.block):
+            t0 = time.perf_counter()
+            b = play_batch(LEVELS, ids[start:start + args.block])
+            t1 = time.perf_counter()
+            out.add_arrays(LEVELS, b.orders, b.plays, b.scores, b.game_ids)
+            write_time += time.perf_counter() - t1
+            play_time += t1 - t0
+    size = os.path.getsize(path)
+    print(f"wrote {args.games:,} games: {size / 1e6:,.1f} MB ({(size - 4096) / args.games:.0f} bytes/game), "
+          f"append {args.games / write_time:,.0f} games/s (playing them: {args.games / play_time:,.0f} games/s)")
+
+    with Archive(path) as a:
+        rng = random.Random(0)
+        sample = [rng.randrange(len(a)) for _ in range(200)]
+        mismatches = 0
+        for i in sample:
+            g = play_game(LEVELS, ids[i])
+            rec = a.record(i)
+            mismatches += rec.game_uid != g.id or rec.rounds != [(r.diamond.value,) + r.plays for r in g.history]
+            mismatches += list(a.scores[i]) != [b.score for b in g.bots]
+        print(f"checked {len(sample)} games against Game: {mismatches} mismatches")
+
+        lookups = [rng.randrange(len(a)) for _ in range(100_000)]
+        t0 = time.perf_counter()
+        for i in lookups:
+            a.games[i]
+        raw = (time.perf_counter() - t0) / len(lookups)
+        t0 = time.perf_counter()
+        for i in lookups[:10_000]:
+            a.record(i)
+        full = (time.perf_counter() - t0) / 10_000
+        print(f"random access: {raw * 1e6:.2f} µs per raw record, {full * 1e6:.1f} µs as a GameRecord")
+
+        t0 = time.perf_counter()
+        wins = np.zeros(3, dtype=np.int64)
+        diff = 0
+        for chunk in a.chunks():
+            s = chunk["scores"].astype(np.int32)
+            d = s[:, 0] - s[:, 1]
+            wins += np.bincount(np.sign(d) + 1, minlength=3)
+            diff += int(d.sum())
+        elapsed = time.perf_counter() - t0
+        print(f"scan: {len(a) / elapsed:,.0f} games/s ({a.games.nbytes / elapsed / 1e9:.2f} GB/s from the page cache), "
+              f"{LEVELS[0]} W-D-L {wins[2]}-{wins[1]}-{wins[0]}, mean diff {diff / 12 / len(a):+.2f}")
+
+    if os.path.exists(CSV_PATH):
+        t0 = time.perf_counter()
+        reps = 50
+        n = sum(1 for _ in range(reps) for _ in read_summary_csv(CSV_PATH))
+        elapsed = time.perf_counter() - t0
+        per_game = os.path.getsize(CSV_PATH) / (n / reps)
+        print(f"CSV: {per_game:.0f} bytes/game, parsed at {n / elapsed:,.0f} games/s "
+              f"({args.games / (n / elapsed):,.0f}s for {args.games:,} games)")
+    if not args.path:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Throughput of the batched NumPy engine against the scalar Game path.
+
+    python -m benchmarks.batched --games 100000 --verify 2000
+
+The first `--verify` games of every matchup are also played through the scalar
+`Game` and must match play for play.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from diamond_game.batched import play_batch, tournament_ids
+from diamond_game.tournament import play_game
+
+MATCHUPS = [("easy", "expert"), ("medium", "expert"), ("easy", "medium"), ("expert", "expert")]
+
+
+def verify(levels, game_ids) -> None:
+    batch = play_batch(levels, game_ids)
+    for g, gid in enumerate(game_ids):
+        game = play_game(levels, gid)
+        plays = [list(r.plays) for r in game.history]
+        if plays != batch.plays[g].tolist():
+            raise AssertionError(f"{levels} game {gid}: plays differ")
+        if [b.score for b in game.bots] != batch.scores[g].tolist():
+            raise AssertionError(f"{levels} game {gid}: scores differ")
+
+
+def bench(levels, games: int, scalar_games: int):
+    game_ids = tournament_ids(0, games)
+    start = time.perf_counter()
+    batch = play_batch(levels, game_ids)
+    batched_rate = games / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for gid in game_ids[:scalar_games]:
+        play_game(levels, gid)
+    scalar_rate = scalar_games / (time.perf_counter() - start)
+    win_rate = float(np.mean(batch.winners() == 1))
+    return batched_rate, scalar_rate, win_rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=100_000)
+    parser.add_argument("--scalar-games", type=int, default=5_000)
+    parser.add_argument("--verify", type=int, default=2_000)
+    args = parser.parse_args()
+
+    for levels in MATCHUPS:
+        if args.verify:
+            verify(levels, tournament_ids(0, args.verify))
+        batched, scalar, win_rate = bench(levels, args.games, args.scalar_games)
+        print(
+            f"{' vs '.join(levels):<18} batched {batched:>12,.0f} games/s | "
+            f"scalar {scalar:>9,.0f} games/s | speedup {batched / scalar:6.1f}x | "
+            f"bot2 win rate {win_rate:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+CFR trainer throughput, decision cost of the cfr level, and its strength.
+
+    python -m benchmarks.cfr [--policy cfr_policy.bin]
+
+Checks the array abstraction against the scalar one on random states, times a
+few training batches, then (with a trained policy) times `choose_card` for cfr
+against expert and mcts, estimates exploitability of cfr and expert, and plays
+cfr against expert.
+"""
+import argparse
+import os
+import random
+import time
+
+import numpy as np
+
+from diamond_game import cfr, mcts
+from diamond_game.players import Bot
+from diamond_game.public import PublicInfo
+from diamond_game.strategies import choose_card
+from diamond_game.tournament import format_result, run_matchup
+
+
+def _states(n: int, rng: random.Random):
+    """Random two-bot positions: (diamond, future mask, rank, points left, my mask, their mask, gap2)."""
+    out = []
+    for _ in range(n):
+        order = rng.sample(range(1, 14), 13)
+        size = rng.randint(1, 13)
+        d, later = order[0], order[1:size]
+        mine = sum(1 << v for v in rng.sample(range(1, 14), size))
+        opp = sum(1 << v for v in rng.sample(range(1, 14), size))
+        rank = sum(v < d for v in later)
+        out.append((d, sum(1 << v for v in later), rank, d + sum(later), mine, opp, rng.randint(-60, 60)))
+    return out
+
+
+def check(n: int) -> int:
+    states = _states(n, random.Random(0))
+    d, future, rank, left, mine, opp, gap2 = (np.array(col, dtype=np.int64) for col in zip(*states))
+    keys = cfr._infosets(rank, left, mine, opp, gap2)
+    cards = cfr._action_cards(np.tile(np.arange(len(cfr.ACTIONS)), (n, 1)), d, mine, opp)
+    mismatches = 0
+    for i, (dv, f, _, _, m, o, g) in enumerate(states):
+        mismatches += keys[i] != cfr.infoset(dv, f, m, o, g)
+        mismatches += sum(cards[i, a] != cfr.action_card(a, dv, m, o) for a in range(len(cfr.ACTIONS)))
+    return mismatches
+
+
+def decision_ns(level: str, states, repeat: int = 3) -> float:
+    rng = random.Random(1)
+    cases = []
+    for d, future, _, _, mine, opp, gap2 in states:
+        bot = Bot("♠", "♠", difficulty=level, rng=rng)
+        bot.hand.mask = mine
+        cases.append((bot, d, PublicInfo([mine, opp], future, [gap2 / 2, 0.0], 14 - len(bot.hand))))
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for bot, d, public in cases:
+            choose_card(bot, d, public, 0)
+        best = min(best, time.perf_counter() - start)
+    return best / len(cases) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--policy", default=cfr.DEFAULT_PATH)
+    parser.add_argument("--batches", type=int, default=5, help="training batches to time")
+    parser.add_argument("--games", type=int, default=2000, help="games for exploitability and the match")
+    args = parser.parse_args()
+
+    print(f"scalar vs array abstraction: {check(20_000)} mismatches over 20,000 states")
+
+    trainer = cfr.Trainer(batch=1024)
+    for _ in range(args.batches):
+        trainer.step()
+    print(f"training: {trainer.games:,} self-play games in {trainer.elapsed:.2f}s "
+          f"({trainer.games / trainer.elapsed:,.0f} games/s on one process)")
+
+    if not os.path.exists(args.policy):
+        print(f"No {args.policy}; train one with `python -m diamond_game.cfr train` for the rest")
+        return
+    cfr.load(args.policy)
+    states = _states(5000, random.Random(2))
+    mcts.config = mcts.MCTSConfig(rollouts=100)
+    for level in ("smart", "cfr", "mcts"):
+        n = len(states) if level != "mcts" else 200
+        note = " (100 rollouts)" if level == "mcts" else ""
+        print(f"choose_card[{level}]: {decision_ns(level, states[:n]) / 1000:8.2f} µs/decision{note}")
+
+    for level in ("cfr", "expert"):
+        value, err = cfr.exploitability(cfr._level_policy(level), args.games)
+        print(f"exploitability[{level}]: {value:+.3f} ± {1.96 * err:.3f}")
+    print(format_result(run_matchup(("cfr", "expert"), args.games, seed=0, workers=1, paired=True)))
+
+
+if __name__ == "__main__":
+    main()
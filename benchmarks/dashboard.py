@@ -0,0 +1,73 @@
+"""
+Dashboard refresh cost: a first full read, an unchanged poll, and a poll after an append.
+
+    python -m benchmarks.dashboard --games 2000000
+
+Writes an archive on the batched engine, then times `ArchiveFeed.poll()` cold
+(every game), again with nothing new, and after appending a small block; the
+last two are what a dashboard rerun pays. Also times reading one page of the
+game table near the end of the archive, and checks the incremental totals
+against a single pass over the finished archive.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from diamond_game.archive import ArchiveWriter
+from diamond_game.batched import play_batch, tournament_ids
+from diamond_game.dashboard import ArchiveFeed
+
+LEVELS = ("medium", "expert")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=2_000_000)
+    parser.add_argument("--append", type=int, default=10_000, help="games appended between polls")
+    parser.add_argument("--block", type=int, default=100_000, help="games per batched run")
+    args = parser.parse_args()
+    path = os.path.join(tempfile.mkdtemp(), "games.dga")
+
+    # Tile one batch of played games to reach the size quickly; the feed only reads records.
+    b = play_batch(LEVELS, tournament_ids(0, args.block))
+    with ArchiveWriter(path) as out:
+        for start in range(0, args.games, args.block):
+            n = min(args.block, args.games - start)
+            out.add_arrays(LEVELS, b.orders[:n], b.plays[:n], b.scores[:n], b.game_ids[:n])
+    print(f"archive: {args.games:,} games, {os.path.getsize(path) / 1e6:,.1f} MB")
+
+    feed = ArchiveFeed(path)
+    t0 = time.perf_counter()
+    feed.poll()
+    cold = time.perf_counter() - t0
+    print(f"first poll:     {cold * 1e3:9.1f} ms ({args.games / cold:,.0f} games/s)")
+
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        feed.poll()
+    print(f"unchanged poll: {(time.perf_counter() - t0) / 1000 * 1e3:9.3f} ms")
+
+    n = min(args.append, args.block)
+    with ArchiveWriter(path) as out:
+        out.add_arrays(LEVELS, b.orders[:n], b.plays[:n], b.scores[:n], b.game_ids[:n])
+    t0 = time.perf_counter()
+    added = feed.poll()
+    print(f"poll +{added:,}:   {(time.perf_counter() - t0) * 1e3:9.1f} ms")
+
+    t0 = time.perf_counter()
+    feed.page(len(feed) - 100, 100)
+    print(f"last page:      {(time.perf_counter() - t0) * 1e3:9.2f} ms (100 games)")
+
+    fresh = ArchiveFeed(path)
+    fresh.poll()
+    same = all(np.array_equal(getattr(feed.totals, k), getattr(fresh.totals, k))
+               for k in ("pair_games", "pair_wins", "pair_ties", "score_hist", "rounds", "round_wins", "round_ties"))
+    print(f"incremental totals equal a single pass: {same}")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
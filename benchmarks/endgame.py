@@ -0,0 +1,53 @@
+"""
+Per-decision latency of the "perfect" level as its endgame cache warms up.
+
+    python -m benchmarks.endgame --games 300 --passes 3
+
+Only decisions answered by the solver are timed (earlier rounds fall back to
+smart). Each pass plays fresh deals against expert.
+"""
+import argparse
+import time
+
+from diamond_game import endgame, strategies
+from diamond_game.tournament import game_id, play_game
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=300)
+    parser.add_argument("--passes", type=int, default=3)
+    parser.add_argument("--cache", default=None, help="load/save the transposition table here")
+    args = parser.parse_args()
+
+    if args.cache:
+        endgame.solver = endgame.EndgameSolver(cache_path=args.cache)
+    latencies = []
+    pick = strategies._pick_perfect
+
+    def timed(bot, diamond_value, *rest):
+        start = time.perf_counter()
+        value = pick(bot, diamond_value, *rest)
+        if len(bot.hand) <= endgame.MAX_CARDS:
+            latencies.append(time.perf_counter() - start)
+        return value
+
+    strategies._pick_perfect = timed
+    for p in range(args.passes):
+        latencies.clear()
+        start = time.perf_counter()
+        for g in range(args.games):
+            play_game(("perfect", "expert"), game_id(p, g))
+        elapsed = time.perf_counter() - start
+        latencies.sort()
+        ms = [latencies[int(q * (len(latencies) - 1))] * 1e3 for q in (0.5, 0.99, 1.0)]
+        print(
+            f"pass {p + 1}: {elapsed:.2f}s | table {len(endgame.solver):,} entries | "
+            f"solver decisions p50 {ms[0]:.3f}ms p99 {ms[1]:.3f}ms max {ms[2]:.3f}ms"
+        )
+    if args.cache:
+        endgame.solver.save()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Cost of per-round event output against building `Game.summary()`.
+
+    python -m benchmarks.events --games 5000
+
+Plays the same games three ways: without output, writing `summary()` as JSON
+lines, and writing `Game.events()` through `EventWriter`. Reports time, output
+cost and bytes per game, then the peak memory of streaming the events back.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from diamond_game.events import EventWriter, read_events
+from diamond_game.tournament import game_id, new_game
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=5000)
+    args = parser.parse_args()
+    levels = ("medium", "expert")
+    tmp = tempfile.mkdtemp()
+    summary_path = os.path.join(tmp, "summaries.jsonl")
+    events_path = os.path.join(tmp, "events.jsonl")
+
+    def play_only():
+        for i in range(args.games):
+            g = new_game(levels, game_id(0, i))
+            while not g.is_over():
+                g.play_round()
+
+    def summaries():
+        with open(summary_path, "w", encoding="utf-8") as f:
+            for i in range(args.games):
+                g = new_game(levels, game_id(0, i))
+                while not g.is_over():
+                    g.play_round()
+                f.write(json.dumps(g.summary()) + "\n")
+
+    def events():
+        with EventWriter(events_path) as out:
+            for i in range(args.games):
+                out.write_many(new_game(levels, game_id(0, i)).events())
+
+    # Best of three, interleaved, to keep machine noise out of the differences.
+    best = {"play": float("inf"), "summary": float("inf"), "events": float("inf")}
+    for _ in range(3):
+        for name, run in (("play", play_only), ("summary", summaries), ("events", events)):
+            if name == "events" and os.path.exists(events_path):
+                os.remove(events_path)
+            start = time.perf_counter()
+            run()
+            best[name] = min(best[name], time.perf_counter() - start)
+    t_play, t_summary, t_events = best["play"], best["summary"], best["events"]
+
+    print(f"{'play only':<10} {t_play / args.games * 1e6:8.1f} µs/game")
+    for label, seconds, path in (("summary()", t_summary, summary_path), ("events", t_events, events_path)):
+        size = os.path.getsize(path)
+        print(
+            f"{label:<10} {seconds / args.games * 1e6:8.1f} µs/game | output "
+            f"{(seconds - t_play) / args.games * 1e6:6.1f} µs/game | {size / args.games:7.0f} bytes/game"
+        )
+
+    tracemalloc.start()
+    rounds = sum(1 for _ in read_events(events_path))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"read back {rounds:,} events streaming, peak {peak / 1024:.1f} KiB")
+    os.remove(summary_path)
+    os.remove(events_path)
+    os.rmdir(tmp)
+
+
+if __name__ == "__main__":
+    main()
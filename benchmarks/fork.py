@@ -0,0 +1,58 @@
+"""
+Cost of `Game.fork()` against `copy.deepcopy`, and a what-if sweep built on it.
+
+    python -m benchmarks.fork
+
+The sweep forks a finished game before every round, forces each card the first
+bot could have played instead, plays the rest out and reports how the final
+score gap would have changed.
+"""
+import copy
+import time
+import timeit
+
+from diamond_game.tournament import game_id, new_game, play_game
+
+
+def rate(fn, number: int) -> float:
+    return number / min(timeit.repeat(fn, number=number, repeat=3))
+
+
+def main():
+    g = new_game(("medium", "expert"), game_id(0, 1))
+    for _ in range(6):
+        g.play_round()
+    r = new_game(("easy", "expert"), game_id(0, 1))
+    for _ in range(6):
+        r.play_round()
+
+    print(f"fork (current round)       {rate(g.fork, 100_000):>12,.0f} /s")
+    print(f"fork (back to round 2)     {rate(lambda: g.fork(2), 100_000):>12,.0f} /s")
+    print(f"fork (random bot)          {rate(r.fork, 20_000):>12,.0f} /s")
+    print(f"copy.deepcopy              {rate(lambda: copy.deepcopy(g), 1_000):>12,.0f} /s")
+
+    done = play_game(("medium", "expert"), game_id(0, 2))
+    base = done.bots[0].score - done.bots[1].score
+    start = time.perf_counter()
+    branches = 0
+    best = (0.0, None, None)
+    for k, played in enumerate(done.history):
+        options = done.fork(k).bots[0].remaining_values()
+        for v in options:
+            f = done.fork(k)
+            f.play_round({0: v})
+            while not f.is_over():
+                f.play_round()
+            branches += 1
+            gain = f.bots[0].score - f.bots[1].score - base
+            if gain > best[0]:
+                best = (gain, k + 1, (played.plays[0], v))
+    elapsed = time.perf_counter() - start
+    print(f"what-if sweep: {branches} branches played out in {elapsed * 1e3:.1f} ms ({branches / elapsed:,.0f}/s)")
+    if best[1] is not None:
+        gain, round_no, (was, instead) = best
+        print(f"best single change: round {round_no}, play {instead} instead of {was} -> gap {gain:+.1f}")
+
+
+if __name__ == "__main__":
+    main()
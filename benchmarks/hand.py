@@ -0,0 +1,95 @@
+"""
+Per-decision cost of the bitmask hand against the previous list-of-Cards hand.
+
+    python -m benchmarks.hand
+
+The list-based reference below is the strategy code as it was before hands
+became bitmasks, given the opponent's cards as a list; the bitmask side reads
+them from a `PublicInfo`. Both sides answer the same decisions.
+"""
+import random
+import timeit
+from typing import List
+
+from diamond_game.cards import Card
+from diamond_game.players import Bot
+from diamond_game.public import PublicInfo
+from diamond_game.strategies import _pick_matching, _pick_smart, choose_card
+
+
+class ListBot:
+    def __init__(self, suit: str, values: List[int], difficulty: str):
+        self.hand = [Card(suit, v) for v in values]
+        self.difficulty = difficulty
+
+    def has_card(self, value: int) -> bool:
+        return any(c.value == value for c in self.hand)
+
+    def remaining_values(self) -> List[int]:
+        return sorted(c.value for c in self.hand)
+
+
+def _list_matching(bot: ListBot, diamond_value: int) -> int:
+    if bot.has_card(diamond_value):
+        return diamond_value
+    options = bot.remaining_values()
+    above = [v for v in options if v >= diamond_value]
+    return min(above) if above else min(options)
+
+
+def _list_smart(bot: ListBot, diamond_value: int, known: List[int]) -> int:
+    bot_vals = bot.remaining_values()
+    user_high = max(known) if known else 10
+    if diamond_value < 10:
+        return min(bot_vals)
+    candidates = [v for v in bot_vals if v > user_high]
+    if candidates:
+        return min(candidates)
+    atleast = [v for v in bot_vals if v >= diamond_value]
+    return min(atleast) if atleast else min(bot_vals)
+
+
+def _cases(n: int, size: int):
+    rng = random.Random(size)
+    return [(sorted(rng.sample(range(1, 14), size)), rng.sample(range(1, 14), size), rng.randint(1, 13))
+            for _ in range(n)]
+
+
+def main():
+    n = 2000
+    print(f"{'strategy':<10}{'hand':>6}{'list ns':>12}{'bitmask ns':>12}{'speedup':>10}")
+    for difficulty in ("matching", "smart"):
+        for size in (13, 7, 2):
+            cases = _cases(n, size)
+            list_bots = [(ListBot("♠", vals, difficulty), d) for vals, _, d in cases]
+            bit_bots = [(Bot("♠", "♠", [Card("♠", v) for v in vals], difficulty=difficulty), d) for vals, _, d in cases]
+            known = [opp for _, opp, _ in cases]
+            views = [PublicInfo([b.hand.mask, sum(1 << v for v in opp)], 0, [0.0, 0.0]) for (b, _), opp in zip(bit_bots, known)]
+            for (lb, d), (bb, _), k, view in zip(list_bots, bit_bots, known, views):
+                ref = _list_matching(lb, d) if difficulty == "matching" else _list_smart(lb, d, k)
+                assert ref == choose_card(bb, d, view, 0), (difficulty, d)
+
+            if difficulty == "matching":
+                def run_list():
+                    for b, d in list_bots:
+                        _list_matching(b, d)
+
+                def run_bits():
+                    for b, d in bit_bots:
+                        _pick_matching(b, d)
+            else:
+                def run_list():
+                    for (b, d), k in zip(list_bots, known):
+                        _list_smart(b, d, k)
+
+                def run_bits():
+                    for (b, d), view in zip(bit_bots, views):
+                        _pick_smart(b, d, view.opponent_high(0))
+
+            t_list = min(timeit.repeat(run_list, number=10, repeat=5)) / (10 * n) * 1e9
+            t_bits = min(timeit.repeat(run_bits, number=10, repeat=5)) / (10 * n) * 1e9
+            print(f"{difficulty:<10}{size:>6}{t_list:>12.0f}{t_bits:>12.0f}{t_list / t_bits:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
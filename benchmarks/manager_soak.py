@@ -0,0 +1,53 @@
+"""
+Memory soak test for GameManager: create many games and watch RSS.
+
+    python -m benchmarks.manager_soak --games 1000000 --capacity 10000
+
+Each game plays `--rounds` rounds and is then abandoned (or finishes), so it
+becomes evictable. RSS should level off once the manager reaches capacity;
+`est MB` is the manager's own estimate of what its live games hold.
+"""
+import argparse
+import os
+import resource
+import time
+
+from diamond_game.storage import GameManager
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # Peak RSS only (kilobytes on Linux, bytes on macOS).
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=1_000_000)
+    parser.add_argument("--capacity", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=13, help="rounds played per game before abandoning it")
+    parser.add_argument("--spill", default=None, help="spill evicted summaries to this SQLite file")
+    parser.add_argument("--report-every", type=int, default=100_000)
+    args = parser.parse_args()
+
+    m = GameManager(capacity=args.capacity, spill_path=args.spill)
+    start = time.perf_counter()
+    print(f"{'games':>10} {'rss MB':>8} {'est MB':>8} {'live':>7} {'evicted':>9} {'games/s':>9}")
+    for i in range(1, args.games + 1):
+        g = m.create(bot_levels=["medium", "expert"])
+        for _ in range(args.rounds):
+            g.play_round()
+        g.abandon()
+        if i % args.report_every == 0:
+            s = m.stats()
+            rate = i / (time.perf_counter() - start)
+            est = s["live_bytes_estimate"] / 2**20
+            print(f"{i:>10,} {rss_mb():>8.1f} {est:>8.1f} {s['live_games']:>7,} {s['evictions']:>9,} {rate:>9,.0f}")
+
+
+if __name__ == "__main__":
+    main()
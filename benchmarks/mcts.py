@@ -0,0 +1,56 @@
+"""
+Rollout throughput and strength of the "mcts" level against expert (smart).
+
+    python -m benchmarks.mcts --games 100 --rollouts 200 1000 --workers 1 4
+
+Seats alternate between games so neither side always sits first.
+"""
+import argparse
+import time
+from itertools import product
+
+from diamond_game import mcts
+from diamond_game.tournament import game_id, play_game
+
+
+def run(games: int, cfg: mcts.MCTSConfig):
+    mcts.config = cfg
+    wins = ties = rollouts = 0
+    seconds = 0.0
+    start = time.perf_counter()
+    for g in range(games):
+        levels = ("mcts", "expert") if g % 2 == 0 else ("expert", "mcts")
+        game = play_game(levels, game_id(0, g))
+        me = levels.index("mcts")
+        bot, other = game.bots[me], game.bots[1 - me]
+        wins += bot.score > other.score
+        ties += bot.score == other.score
+        rollouts += bot.memory.get("mcts_rollouts", 0)
+        seconds += bot.memory.get("mcts_seconds", 0.0)
+    elapsed = time.perf_counter() - start
+    return (wins + 0.5 * ties) / games, rollouts / seconds, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--rollouts", type=int, nargs="+", default=[200, 1000])
+    parser.add_argument("--time-ms", type=float, default=None, help="per-move budget instead of rollouts")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1])
+    args = parser.parse_args()
+
+    try:
+        for rollouts, workers in product(args.rollouts, args.workers):
+            cfg = mcts.MCTSConfig(rollouts=rollouts, time_ms=args.time_ms, workers=workers)
+            score, rate, elapsed = run(args.games, cfg)
+            budget = f"{args.time_ms:g}ms" if args.time_ms else f"{rollouts} rollouts"
+            print(
+                f"{budget:>14} x {workers} workers | score vs smart {score:.3f} | "
+                f"{rate:,.0f} rollouts/s | {elapsed / args.games * 1000:.0f} ms/game"
+            )
+    finally:
+        mcts.shutdown()
+
+
+if __name__ == "__main__":
+    main()
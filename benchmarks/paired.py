@@ -0,0 +1,52 @@
+"""
+Variance reduction from paired deals and common random numbers.
+
+    python -m benchmarks.paired --games 4000
+
+For head-to-head matchups, compares the standard error of the mean score
+difference between independent games and seat-swapped pairs. For comparing two
+strategies against a common opponent, compares independent seeds with a shared
+seed (same deals and opponent draws). "Equivalent games" is how many
+independent games would give the same standard error.
+"""
+import argparse
+
+from diamond_game.tournament import compare_results, run_matchup
+
+HEAD_TO_HEAD = [("easy", "expert"), ("easy", "medium"), ("medium", "expert")]
+# (strategy A, strategy B, common opponent)
+COMPARISONS = [("medium", "expert", "easy"), ("easy", "medium", "expert")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=4000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    n = args.games - args.games % 2
+
+    print("Head to head: mean score difference ± standard error")
+    for levels in HEAD_TO_HEAD:
+        plain = run_matchup(levels, n, seed=1, workers=args.workers).score_diff()
+        paired = run_matchup(levels, n, seed=1, workers=args.workers, paired=True).score_diff()
+        print(
+            f"  {' vs '.join(levels):<18} independent {plain[0]:+7.2f} ± {plain[1]:.3f} | "
+            f"paired {paired[0]:+7.2f} ± {paired[1]:.3f} | equivalent games {n * (plain[1] / paired[1]) ** 2:>9,.0f}"
+        )
+
+    print("Strategy comparison against a common opponent: difference of mean score differences")
+    for a, b, opp in COMPARISONS:
+        ra1 = run_matchup((a, opp), n, seed=1, workers=args.workers)
+        rb1 = run_matchup((b, opp), n, seed=1, workers=args.workers)
+        rb2 = run_matchup((b, opp), n, seed=2, workers=args.workers)
+        indep = compare_results(ra1, rb2)
+        common = compare_results(ra1, rb1)
+        print(
+            f"  {a} vs {b} (against {opp}):".ljust(36)
+            + f"independent {indep[0]:+7.2f} ± {indep[1]:.3f} | common {common[0]:+7.2f} ± {common[1]:.3f} | "
+            f"equivalent games {n * (indep[1] / common[1]) ** 2 if common[1] else float('inf'):>9,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Throughput of the hindsight regret analyzer.
+
+    python -m benchmarks.regret --games 200000
+
+Builds an archive of games with the batched engine, checks `regret.hindsight`
+against a plain-Python reference on the first games, then times the reference
+loop, the vectorized analyzer on one process, and the analyzer across a
+process pool. Finally streams the archive through a SQLite results database
+and reports the peak memory of that pass.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from diamond_game.batched import play_batch, tournament_ids
+from diamond_game.regret import analyze, hindsight
+from diamond_game.results import GameRecord, ResultsStore
+
+PAIRS = [("easy", "expert"), ("medium", "expert"), ("easy", "medium")]
+
+
+def _points(diamond: int, card: int, opp: int) -> float:
+    return diamond if card > opp else diamond / 2 if card == opp else 0.0
+
+
+def reference(rounds, seat: int):
+    """Per-round regret for one seat, one swap at a time."""
+    opp = 1 - seat
+    out = []
+    for k, row in enumerate(rounds):
+        base = _points(row[0], row[1 + seat], row[1 + opp])
+        best = 0.0
+        for j in range(k + 1, len(rounds)):
+            other = rounds[j]
+            gain = (
+                _points(row[0], other[1 + seat], row[1 + opp])
+                + _points(other[0], row[1 + seat], other[1 + opp])
+                - base
+                - _points(other[0], other[1 + seat], other[1 + opp])
+            )
+            best = max(best, gain)
+        out.append(best)
+    return out
+
+
+def archive(games: int):
+    per_pair = games // len(PAIRS)
+    records = []
+    for levels in PAIRS:
+        b = play_batch(levels, tournament_ids(0, per_pair))
+        rounds = np.concatenate([b.orders[:, :, None], b.plays], axis=2).tolist()
+        records.extend(GameRecord(levels, [tuple(r) for r in game]) for game in rounds)
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=200000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    records = archive(args.games)
+    n = len(records)
+    sample = records[:2000]
+    _, regret, _ = hindsight(np.array([rec.rounds for rec in sample]))
+    mismatches = sum(
+        not np.allclose(regret[i, s], reference(rec.rounds, s)) for i, rec in enumerate(sample) for s in (0, 1)
+    )
+    print(f"checked {len(sample):,} games against the reference: {mismatches} mismatches")
+
+    start = time.perf_counter()
+    for rec in records[:20000]:
+        reference(rec.rounds, 0)
+        reference(rec.rounds, 1)
+    ref_rate = min(n, 20000) / (time.perf_counter() - start)
+    print(f"{'python reference':<22} {ref_rate:>12,.0f} games/s")
+
+    for label, workers in (("vectorized, 1 process", 1), ("vectorized, pool", args.workers)):
+        start = time.perf_counter()
+        report = analyze(records, workers=workers)
+        rate = report.games / (time.perf_counter() - start)
+        print(f"{label:<22} {rate:>12,.0f} games/s ({rate / ref_rate:.0f}x)")
+
+    path = os.path.join(tempfile.mkdtemp(), "regret.db")
+    with ResultsStore(path) as store:
+        store.add_games(records)
+    del records
+    start = time.perf_counter()
+    with ResultsStore(path) as store:
+        report = analyze(store.records(), workers=1)
+    elapsed = time.perf_counter() - start
+    # A second pass under tracemalloc, which slows allocation-heavy code down.
+    tracemalloc.start()
+    with ResultsStore(path) as store:
+        analyze(store.records(), workers=1)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"streamed {report.games:,} games from SQLite in {elapsed:.1f}s "
+        f"({report.games / elapsed:,.0f} games/s), peak {peak / 2 ** 20:.1f} MiB"
+    )
+    for level, s in sorted(report.levels.items()):
+        print(f"  {level:<8} regret {s.regret.sum() / s.decisions.sum():5.3f} per decision")
+    os.remove(path)
+    os.rmdir(os.path.dirname(path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Per-round cost as the deck size and the number of bots grow.
+
+    python -m benchmarks.scaling [--sizes 13 100 1000 10000] [--bots 2 8 32 128]
+
+Plays scalar `Game`s with larger decks (one round per card value) and more
+seats, and reports microseconds per round and per decision. With bitmask hands,
+a public view rebuilt once per round and linear resolution, a round costs
+about the same per bot at any seat count, and grows only slowly with deck size
+(bit operations on wider integers). mcts and perfect are two-bot levels and
+only appear in the deck-size table; mcts runs with a small rollout budget.
+"""
+import argparse
+import time
+
+from diamond_game import mcts
+from diamond_game.tournament import game_id, new_game
+
+LEVELS = ("easy", "medium", "expert")
+
+
+def per_round(levels, size: int, rounds: int) -> float:
+    """Seconds per round, over at least `rounds` rounds of fresh games."""
+    played = 0
+    elapsed = 0.0
+    i = 0
+    while played < rounds:
+        g = new_game(levels, game_id(size, i), deck_size=size)
+        i += 1
+        start = time.perf_counter()
+        while not g.is_over() and played < rounds:
+            g.play_round()
+            played += 1
+        elapsed += time.perf_counter() - start
+    return elapsed / played
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[13, 100, 1000, 10000])
+    parser.add_argument("--bots", type=int, nargs="+", default=[2, 8, 32, 128])
+    parser.add_argument("--seat-size", type=int, default=100, help="deck size for the bot-count table")
+    parser.add_argument("--rounds", type=int, default=2000, help="rounds timed per cell")
+    args = parser.parse_args()
+    mcts.config = mcts.MCTSConfig(rollouts=20)
+
+    print(f"Two bots, µs per round by deck size (mcts: {mcts.config.rollouts} rollouts per move)")
+    levels = LEVELS + ("perfect", "mcts")
+    print(f"{'level':<10}" + "".join(f"{s:>10}" for s in args.sizes))
+    for level in levels:
+        rounds = args.rounds if level != "mcts" else max(args.rounds // 20, 20)
+        cells = [per_round((level, "expert"), size, rounds) * 1e6 for size in args.sizes]
+        print(f"{level:<10}" + "".join(f"{c:>10.1f}" for c in cells))
+
+    print(f"\nDeck of {args.seat_size}, µs per round (and per decision) by bot count")
+    print(f"{'level':<10}" + "".join(f"{n:>18}" for n in args.bots))
+    for level in LEVELS:
+        cells = [per_round((level,) * n, args.seat_size, max(args.rounds // n, 50)) * 1e6 for n in args.bots]
+        print(f"{level:<10}" + "".join(f"{c:>9.1f} ({c / n:>5.2f})" for c, n in zip(cells, args.bots)))
+
+
+if __name__ == "__main__":
+    main()
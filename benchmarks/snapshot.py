@@ -0,0 +1,60 @@
+"""
+Snapshot size and encode/decode rates, and a check that restored games play on
+exactly like the originals.
+
+    python -m benchmarks.snapshot [--games 200]
+
+The check snapshots games of randomized and deterministic levels (plain and
+paired deals, some with a forced play) after every round count, plays the
+original and the restored copy to the end and compares every play.
+"""
+import argparse
+import timeit
+
+from diamond_game import mcts, snapshot
+from diamond_game.game import Game
+from diamond_game.tournament import game_id, new_game
+
+PAIRS = (("easy", "perfect"), ("perfect", "easy"), ("easy", "easy"), ("mcts", "expert"), ("medium", "expert"))
+
+
+def rate(fn, number: int) -> float:
+    return number / min(timeit.repeat(fn, number=number, repeat=3))
+
+
+def continues_identically(levels, i: int) -> bool:
+    deal = game_id(1, i) if i % 2 else None
+    g = Game(human_names=[], human_suits=[], bot_levels=list(levels), id=game_id(0, i), deal_id=deal)
+    for _ in range(i % 13):
+        g.play_round()
+    if i % 4 == 0:
+        g.play_round({0: g.bots[0].hand.max()})  # forced, whatever the strategy would pick
+    h = snapshot.decode(snapshot.encode(g))
+    while not g.is_over():
+        g.play_round()
+        h.play_round()
+    return [r.plays for r in g.history] == [r.plays for r in h.history]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=200, help="games checked per level pair")
+    args = parser.parse_args()
+    mcts.config = mcts.MCTSConfig(rollouts=50)
+
+    for levels in (("medium", "expert"), ("easy", "perfect")):
+        g = new_game(levels, game_id(0, 1))
+        for _ in range(6):
+            g.play_round()
+        data = snapshot.encode(g)
+        print(f"{':'.join(levels):<14} {len(data)} bytes   encode {rate(lambda: snapshot.encode(g), 20_000):>9,.0f} /s"
+              f"   decode {rate(lambda: snapshot.decode(data), 2_000):>9,.0f} /s")
+
+    for levels in PAIRS:
+        games = args.games if "mcts" not in levels else max(args.games // 10, 12)
+        same = sum(continues_identically(levels, i) for i in range(games))
+        print(f"{':'.join(levels):<14} restored games continue identically: {same}/{games}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Fixed-seed benchmark suite for strategies, rounds, full games and batches.
+
+    python -m benchmarks.suite run --out bench.json
+    python -m benchmarks.suite run --out new.json --compare bench.json --threshold 0.15
+    python -m benchmarks.suite compare bench.json new.json
+
+Every benchmark reports nanoseconds per operation (median and best of several
+repeats) and, from a separate tracemalloc pass, the peak traced memory of one
+run and the bytes still retained per operation afterwards. `compare` flags
+benchmarks whose median time or peak memory grew by more than the threshold
+and exits non-zero if any did.
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from diamond_game import mcts
+from diamond_game.public import PublicInfo
+from diamond_game.storage import GameManager
+from diamond_game.strategies import LEVELS, choose_card
+from diamond_game.tournament import game_id, new_game, play_game
+
+# name -> setup(); setup returns (run, ops) where run() performs `ops` operations
+BENCHMARKS: Dict[str, Callable[[], Tuple[Callable[[], None], int]]] = {}
+
+
+def benchmark(name: str):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _mid_game(levels, seed: int, rounds: int):
+    g = new_game(levels, game_id(0, seed))
+    for _ in range(rounds):
+        g.play_round()
+    return g
+
+
+def _choose_card_setup(level: str, ops: int):
+    def setup():
+        # Decisions from a spread of positions, replayed with the same inputs each run.
+        states = []
+        for i in range(ops):
+            g = _mid_game((level, "expert"), 1000 + i, i % 13)
+            bot = g.bots[0]
+            bot.rng = None  # draw from the global stream, reseeded in run()
+            diamond = g.deck[g.round_no].value
+            future = [c.value for c in g.deck[g.round_no + 1:]]
+            states.append((bot, diamond, PublicInfo.of(g.bots, future, g.round_no + 1)))
+
+        def run():
+            random.seed(0)
+            for bot, diamond, public in states:
+                choose_card(bot, diamond, public, 0)
+        return run, ops
+    return setup
+
+
+for _level, _ops in (("easy", 2000), ("medium", 2000), ("expert", 2000), ("perfect", 500), ("mcts", 20)):
+    benchmark(f"choose_card[{_level}]")(_choose_card_setup(_level, _ops))
+
+
+@benchmark("game.play_round")
+def _play_round():
+    games = 200
+
+    def run():
+        for i in range(games):
+            g = _mid_game(("medium", "expert"), i, 0)
+            while not g.is_over():
+                g.play_round()
+    # Game creation is included; it is measured on its own below.
+    return run, games * 13
+
+
+@benchmark("game.create")
+def _create():
+    def run():
+        for i in range(1000):
+            new_game(("medium", "expert"), game_id(0, i))
+    return run, 1000
+
+
+@benchmark("game.status")
+def _status():
+    g = _mid_game(("medium", "expert"), 7, 6)
+
+    def run():
+        for _ in range(2000):
+            g.status()
+    return run, 2000
+
+
+@benchmark("game.summary")
+def _summary():
+    g = play_game(("medium", "expert"), game_id(0, 7))
+
+    def run():
+        for _ in range(1000):
+            g.summary()
+    return run, 1000
+
+
+@benchmark("game.full[medium-expert]")
+def _full_game():
+    def run():
+        for i in range(200):
+            play_game(("medium", "expert"), game_id(0, i))
+    return run, 200
+
+
+@benchmark("game.full[easy-expert]")
+def _full_game_random():
+    def run():
+        for i in range(200):
+            play_game(("easy", "expert"), game_id(0, i))
+    return run, 200
+
+
+@benchmark("manager.batch")
+def _manager_batch():
+    def run():
+        m = GameManager(capacity=1000)
+        for _ in range(500):
+            g = m.create(bot_levels=["medium", "expert"])
+            while not g.is_over():
+                g.play_round()
+    return run, 500
+
+
+def _time(run: Callable[[], None], ops: int, repeat: int) -> Tuple[float, float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        run()
+        samples.append((time.perf_counter_ns() - start) / ops)
+    return statistics.median(samples), min(samples)
+
+
+def _memory(run: Callable[[], None], ops: int) -> Tuple[int, float]:
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        run()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - before, (after - before) / ops
+
+
+def run_suite(names: List[str], repeat: int) -> Dict:
+    mcts.config = mcts.MCTSConfig(rollouts=200)
+    results = {}
+    for name in names:
+        run, ops = BENCHMARKS[name]()
+        run()  # warm caches (endgame table, imports)
+        median, best = _time(run, ops, repeat)
+        peak, retained = _memory(run, ops)
+        results[name] = {
+            "ops": ops,
+            "ns_per_op": round(median, 1),
+            "best_ns_per_op": round(best, 1),
+            "peak_bytes": peak,
+            "retained_bytes_per_op": round(retained, 1),
+        }
+        print(f"{name:<28} {median:>12,.0f} ns/op (best {best:,.0f}) | peak {peak / 1024:>9,.1f} KiB", flush=True)
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "levels": sorted(LEVELS),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    """Human-readable regressions of `current` against `baseline`."""
+    regressions = []
+    print(f"{'benchmark':<28} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, cur in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<28} {'-':>12} {cur['ns_per_op']:>12,.0f}      new")
+            continue
+        change = cur["ns_per_op"] / base["ns_per_op"] - 1
+        mark = ""
+        if change > threshold:
+            mark = "  REGRESSION (time)"
+            regressions.append(f"{name}: {change:+.1%} time")
+        base_peak = base.get("peak_bytes") or 0
+        if base_peak and cur["peak_bytes"] / base_peak - 1 > threshold:
+            mark += "  REGRESSION (memory)"
+            regressions.append(f"{name}: {cur['peak_bytes'] / base_peak - 1:+.1%} peak memory")
+        print(f"{name:<28} {base['ns_per_op']:>12,.0f} {cur['ns_per_op']:>12,.0f} {change:>+8.1%}{mark}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_p = sub.add_parser("run", help="run the suite")
+    run_p.add_argument("--out", default="bench.json")
+    run_p.add_argument("--repeat", type=int, default=5)
+    run_p.add_argument("--only", nargs="*", default=None, help="benchmark names to run")
+    run_p.add_argument("--compare", default=None, help="baseline file to compare against")
+    run_p.add_argument("--threshold", type=float, default=0.10)
+    cmp_p = sub.add_parser("compare", help="compare two result files")
+    cmp_p.add_argument("baseline")
+    cmp_p.add_argument("current")
+    cmp_p.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        names = args.only or list(BENCHMARKS)
+        unknown = [n for n in names if n not in BENCHMARKS]
+        if unknown:
+            parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+        current = run_suite(names, args.repeat)
+        with open(args.out, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"Results written to {args.out}")
+        if not args.compare:
+            return 0
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print("Regressions beyond threshold:")
+        for r in regressions:
+            print(f"  {r}")
+        return 1
+    print("No regressions beyond threshold.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Decision-table fast path against the reference matching and smart strategies.
+
+    python -m benchmarks.tables [--path decision_tables.bin]
+
+Builds the tables (unless the file exists), reports size and build time, then
+times the bare decision (strategy function against table read) and the batched
+engine with and without the tables, and checks that both agree. Only the
+batched engine reads the tables; a single scalar read is no faster than the
+strategy's bit operations.
+"""
+import argparse
+import os
+import random
+import time
+import timeit
+
+from diamond_game import tables
+from diamond_game.batched import play_batch, tournament_ids
+from diamond_game.players import Bot
+from diamond_game.public import PublicInfo
+from diamond_game.strategies import _pick_matching, _pick_smart
+
+
+def _cases(n: int, difficulty: str):
+    rng = random.Random(n)
+    cases = []
+    for _ in range(n):
+        size = rng.randint(1, 13)
+        bot = Bot("♠", "♠", difficulty=difficulty)
+        for v in rng.sample(range(1, 14), size):
+            bot.hand.add(v)
+        opponent = sum(1 << v for v in rng.sample(range(1, 14), rng.randint(0, 13)))
+        cases.append((bot, rng.randint(1, 13), PublicInfo([bot.hand.mask, opponent], 0, [0.0, 0.0])))
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--path", default="decision_tables.bin")
+    parser.add_argument("--decisions", type=int, default=20_000)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        start = time.perf_counter()
+        tables.build(args.path)
+        print(f"Built {args.path} in {time.perf_counter() - start:.2f}s")
+    print(f"Table size: {os.path.getsize(args.path):,} bytes")
+
+    n = args.decisions
+    print(f"{'strategy':<10}{'':<14}{'reference ns':>14}{'table ns':>10}{'speedup':>10}")
+    for difficulty in ("matching", "smart"):
+        cases = _cases(n, difficulty)
+        t = tables.load(args.path)
+        if difficulty == "matching":
+            def lookup_ref():
+                return [_pick_matching(bot, d) for bot, d, _ in cases]
+
+            def lookup_table():
+                return [t.matching(bot.hand.mask, d) for bot, d, _ in cases]
+        else:
+            def lookup_ref():
+                return [_pick_smart(bot, d, view.opponent_high(0)) for bot, d, view in cases]
+
+            def lookup_table():
+                return [t.smart(bot.hand.mask, d, view.opponent_high(0) or 10) for bot, d, view in cases]
+
+        assert lookup_ref() == lookup_table(), difficulty
+        # Alternate the two sides so clock drift affects both equally.
+        ref_times, table_times = [], []
+        for _ in range(5):
+            ref_times.append(timeit.timeit(lookup_ref, number=3))
+            table_times.append(timeit.timeit(lookup_table, number=3))
+        tables.unload()
+        t_ref = min(ref_times) / (3 * n) * 1e9
+        t_tab = min(table_times) / (3 * n) * 1e9
+        print(f"{difficulty:<10}{'lookup':<14}{t_ref:>14.0f}{t_tab:>10.0f}{t_ref / t_tab:>9.1f}x")
+
+    game_ids = tournament_ids(0, 100_000)
+    for levels in (("medium", "expert"), ("expert", "expert")):
+        start = time.perf_counter()
+        ref = play_batch(levels, game_ids)
+        t_ref = time.perf_counter() - start
+        tables.load(args.path)
+        start = time.perf_counter()
+        fast = play_batch(levels, game_ids)
+        t_tab = time.perf_counter() - start
+        same = (ref.plays == fast.plays).all()
+        del fast
+        tables.unload()
+        print(f"batched {'-'.join(levels):<14} {len(game_ids) / t_ref:>10,.0f} -> {len(game_ids) / t_tab:>10,.0f} games/s "
+              f"({t_ref / t_tab:.1f}x), identical: {same}")
+
+
+if __name__ == "__main__":
+    main()
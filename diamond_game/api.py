@@ -1,96 +1,164 @@
-# from fastapi import FastAPI, HTTPException
-# from pydantic import BaseModel, Field
-# from typing import Optional
-# from .storage import manager
-# from .game import Game
-
-# app = FastAPI(title="Diamond Card Game API", version="1.0.0")
-
-# # ---------- Schemas ----------
-# class CreateGameReq(BaseModel):
-#     human_name: str = Field(default="You", min_length=1)
-#     bot_level: str = Field(default="medium")  # easy/medium/hard/expert
-
-# class CreateGameResp(BaseModel):
-#     game_id: str
-#     status: dict
-
-# class PlayReq(BaseModel):
-#     human_value: int = Field(ge=1, le=13, description="Your bid card value (1..13)")
-
-# class PlayResp(BaseModel):
-#     round_no: int
-#     diamond: str
-#     human_play: str
-#     bot_play: str
-#     winner: str
-#     points: int
-#     scores: dict
-#     remaining_human_cards: list
-#     remaining_diamonds_count: int
-#     active: bool
-
-# # ---------- Endpoints ----------
-# @app.post("/games", response_model=CreateGameResp)
-# def create_game(req: CreateGameReq):
-#     g = manager.create(human_name=req.human_name, bot_level=req.bot_level)
-#     return CreateGameResp(game_id=g.id, status=g.status())
-
-# @app.get("/games/{game_id}")
-# def get_status(game_id: str):
-#     try:
-#         g = manager.get(game_id)
-#     except KeyError:
-#         raise HTTPException(status_code=404, detail="Game not found")
-#     return g.status()
-
-# @app.post("/games/{game_id}/play", response_model=PlayResp)
-# def play_round(game_id: str, req: PlayReq):
-#     try:
-#         g = manager.get(game_id)
-#     except KeyError:
-#         raise HTTPException(status_code=404, detail="Game not found")
-
-#     try:
-#         result = g.play_round(req.human_value)
-#     except (RuntimeError, ValueError) as e:
-#         raise HTTPException(status_code=400, detail=str(e))
-
-#     status = g.status()
-#     return PlayResp(
-#         round_no=result.round_no,
-#         diamond=str(result.diamond),
-#         human_play=str(result.human_play),
-#         bot_play=str(result.bot_play),
-#         winner=result.winner,
-#         points=result.points,
-#         scores=status["scores"],
-#         remaining_human_cards=status["remaining_human_cards"],
-#         remaining_diamonds_count=status["remaining_diamonds_count"],
-#         active=status["active"],
-#     )
-
-# @app.get("/games/{game_id}/score")
-# def show_score(game_id: str):
-#     try:
-#         g = manager.get(game_id)
-#     except KeyError:
-#         raise HTTPException(status_code=404, detail="Game not found")
-#     s = g.status()
-#     return {"game_id": game_id, "scores": s["scores"], "round_no": s["round_no"], "active": s["active"]}
-
-# @app.get("/games/{game_id}/summary")
-# def get_summary(game_id: str):
-#     try:
-#         g = manager.get(game_id)
-#     except KeyError:
-#         raise HTTPException(status_code=404, detail="Game not found")
-#     return g.summary()
-
-# @app.post("/games/{game_id}/abandon")
-# def abandon_game(game_id: str):
-#     try:
-#         g = manager.abandon(game_id)
-#     except KeyError:
-#         raise HTTPException(status_code=404, detail="Game not found")
-#     return {"game_id": game_id, "active": g.active}
+"""
+Async HTTP service for bot-vs-bot games.
+
+Requests for the same game are serialized with a per-game asyncio lock, while
+different games proceed concurrently. Rounds involving search-based levels run
+in a thread pool so they do not block the event loop.
+
+    uvicorn diamond_game.api:app
+
+Set DIAMOND_PROFILE=1 to enable instrumentation; `/metrics` then serves it in
+Prometheus text format and a profile summary is printed on shutdown.
+"""
+import asyncio
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Union
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+
+from . import instrument
+from .game import Game, RoundResult
+from .storage import ArchivedGame, manager
+from .strategies import LEVELS
+
+# Strategies whose decisions take milliseconds rather than microseconds.
+HEAVY_STRATEGIES = {"perfect", "mcts"}
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="diamond-bots")
+_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+if os.environ.get("DIAMOND_PROFILE"):
+    instrument.enable()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    if instrument.sink is not None:
+        print(instrument.sink.format_summary())
+
+
+app = FastAPI(title="Diamond Card Game API", version="2.0.0", lifespan=lifespan)
+
+
+def _lock_for(game_id: str) -> asyncio.Lock:
+    # Locks live only while some request holds a reference, so finished games
+    # do not accumulate locks.
+    lock = _locks.get(game_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        _locks[game_id] = lock
+    return lock
+
+
+def _get_game(game_id: str) -> Union[Game, ArchivedGame]:
+    try:
+        return manager.get(game_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+
+def _is_heavy(g: Game) -> bool:
+    return any(LEVELS.get(level) in HEAVY_STRATEGIES for level in g.bot_levels)
+
+
+# ---------- Schemas ----------
+class CreateGameReq(BaseModel):
+    bot_levels: List[str] = Field(default_factory=lambda: ["medium", "expert"], min_length=2)
+    bot_names: Optional[List[str]] = None
+
+class CreateGameResp(BaseModel):
+    game_id: str
+    status: dict
+
+class PlayResp(BaseModel):
+    round_no: int
+    diamond: str
+    bot_play: List[str]
+    winner: Union[str, List[str]]
+    points: int
+    scores: dict
+    remaining_bot_cards: list
+    remaining_diamonds_count: int
+    active: bool
+
+# ---------- Endpoints ----------
+@app.post("/games", response_model=CreateGameResp)
+async def create_game(req: CreateGameReq):
+    unknown = [level for level in req.bot_levels if level not in LEVELS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown bot level(s): {', '.join(unknown)}")
+    n = len(req.bot_levels)
+    names = req.bot_names or [f"Bot {i+1}" for i in range(n)]
+    if len(names) != n:
+        raise HTTPException(status_code=400, detail="bot_names must match bot_levels")
+    suits = [("♠", "♣", "♥", "♦")[i % 4] for i in range(n)]
+    try:
+        g = manager.create(bot_names=names, bot_suits=suits, bot_levels=req.bot_levels)
+    except ValueError as e:  # e.g. a cfr level without a trained policy
+        raise HTTPException(status_code=400, detail=str(e))
+    return CreateGameResp(game_id=g.id, status=g.status())
+
+@app.get("/games/{game_id}")
+async def get_status(game_id: str):
+    async with _lock_for(game_id):  # not while a search round is half played on the executor
+        return _get_game(game_id).status()
+
+@app.post("/games/{game_id}/play", response_model=PlayResp)
+async def play_round(game_id: str):
+    async with _lock_for(game_id):
+        g = _get_game(game_id)
+        if g.is_over():
+            raise HTTPException(status_code=400, detail="Game is already over or inactive.")
+        try:
+            if _is_heavy(g):
+                loop = asyncio.get_running_loop()
+                result: RoundResult = await loop.run_in_executor(_executor, g.play_round)
+            else:
+                result = g.play_round()
+        except (RuntimeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        status = g.status()
+    return PlayResp(
+        round_no=result.round_no,
+        diamond=str(result.diamond),
+        bot_play=result.bot_play,
+        winner=result.winner,
+        points=result.points,
+        scores=status["scores"],
+        remaining_bot_cards=status["remaining_bot_cards"],
+        remaining_diamonds_count=status["remaining_diamonds_count"],
+        active=status["active"],
+    )
+
+@app.get("/games/{game_id}/score")
+async def show_score(game_id: str):
+    async with _lock_for(game_id):
+        s = _get_game(game_id).status()
+    return {"game_id": game_id, "scores": s["scores"], "round_no": s["round_no"], "active": s["active"]}
+
+@app.get("/games/{game_id}/summary")
+async def get_summary(game_id: str):
+    return _get_game(game_id).summary()
+
+@app.post("/games/{game_id}/abandon")
+async def abandon_game(game_id: str):
+    async with _lock_for(game_id):
+        g = _get_game(game_id)
+        g.abandon()
+    return {"game_id": game_id, "active": g.active}
+
+@app.get("/stats")
+async def manager_stats() -> Dict:
+    return manager.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    if instrument.sink is None:
+        raise HTTPException(status_code=404, detail="Instrumentation is disabled")
+    return instrument.prometheus_text(instrument.sink)
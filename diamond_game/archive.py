@@ -0,0 +1,382 @@
+"""
+Append-only replay archive of bot games, one fixed-width record per game.
+
+A record holds the game id (16 bytes when it is a UUID, as tournament ids
+are), the diamond order, every seat's plays, level ids and final scores; for
+two bots that is 64 bytes, against several hundred for a game in
+`diamond_game_summary.csv`. Level names live once in the file header. Since
+every record has the same size, game i sits at a fixed offset: the reader
+memory-maps the file and returns game i in O(1), and whole columns (scores,
+plays, levels) come back as NumPy views of the mapping, so scans run at the
+speed of the disk rather than a parser.
+
+Writers buffer records and append them in blocks. On opening an existing
+archive a torn last record (from a crash mid-write) is cut off, so what is
+left is always whole games. One writer at a time.
+
+    python -m diamond_game.archive convert diamond_game_summary.csv games.dga
+    python -m diamond_game.archive info games.dga
+    python -m diamond_game.archive show games.dga 12345
+
+    with Archive("games.dga") as a:
+        a.record(12345)                       # a results.GameRecord
+        diff = a.scores[:, 0] - a.scores[:, 1]  # every game, without copying the file
+"""
+import argparse
+import mmap
+import os
+import struct
+import time
+import uuid
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from .cards import VALUES
+from .results import GameRecord, read_summary_csv
+
+VERSION = 1
+MAGIC = b"DGA1"
+HEADER_SIZE = 4096
+SCORE_SCALE = 12  # scores are stored in twelfths: tie splits among up to 4 bots are exact
+
+_HEADER = struct.Struct("<4sHBBHH")  # magic, version, bots, values, record size, level count
+FLAG_UID = 1  # the uid field holds the game id
+
+
+def record_dtype(bots: int = 2) -> np.dtype:
+    """Layout of one game, padded to a multiple of 8 bytes (64 for two bots)."""
+    fields = [
+        ("uid", np.uint8, (16,)),
+        ("diamonds", np.uint8, (VALUES,)),  # diamond values in play order, 0 after the last round played
+        ("plays", np.uint8, (bots, VALUES)),  # per seat, in play order
+        ("levels", np.uint8, (bots,)),  # indexes into the header's level names
+        ("scores", "<u2", (bots,)),  # final scores * SCORE_SCALE
+        ("rounds", np.uint8),
+        ("flags", np.uint8),
+    ]
+    raw = np.dtype(fields)
+    names = list(raw.names)
+    return np.dtype({
+        "names": names,
+        "formats": [raw.fields[n][0] for n in names],
+        "offsets": [raw.fields[n][1] for n in names],
+        "itemsize": (raw.itemsize + 7) // 8 * 8,
+    })
+
+
+def _pack_header(bots: int, levels: Sequence[str]) -> bytes:
+    out = bytearray(_HEADER.pack(MAGIC, VERSION, bots, VALUES, record_dtype(bots).itemsize, len(levels)))
+    for name in levels:
+        raw = name.encode("utf-8")
+        out += bytes([len(raw)]) + raw
+    if len(out) > HEADER_SIZE:
+        raise ValueError("too many level names for the archive header")
+    return bytes(out) + bytes(HEADER_SIZE - len(out))
+
+
+def _read_header(data, path: str):
+    magic, version, bots, values, size, count = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION or values != VALUES or size != record_dtype(bots).itemsize:
+        raise ValueError(f"{path} is not a version {VERSION} game archive")
+    levels = []
+    pos = _HEADER.size
+    for _ in range(count):
+        n = data[pos]
+        levels.append(bytes(data[pos + 1:pos + 1 + n]).decode("utf-8"))
+        pos += 1 + n
+    return bots, levels
+
+
+def _uid_bytes(game_id: Optional[str]) -> Optional[bytes]:
+    if not game_id:
+        return None
+    try:
+        return uuid.UUID(game_id).bytes
+    except ValueError:
+        return None  # not a UUID: the id is not kept
+
+
+class ArchiveWriter:
+    """Appends games to an archive, creating it if needed."""
+
+    def __init__(self, path: str, bots: int = 2, buffer: int = 8192):
+        self.path = path
+        self.written = 0
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self._f = open(path, "r+b")
+            header = self._f.read(HEADER_SIZE)
+            self.bots, self.levels = _read_header(header, path)
+            if self.bots != bots:
+                raise ValueError(f"{path} holds {self.bots}-bot games, not {bots}")
+            self.dtype = record_dtype(self.bots)
+            end = os.path.getsize(path)
+            whole = HEADER_SIZE + (end - HEADER_SIZE) // self.dtype.itemsize * self.dtype.itemsize
+            if whole != end:
+                self._f.truncate(whole)  # a torn record from an interrupted write
+            self._f.seek(whole)
+        else:
+            self._f = open(path, "w+b")
+            self.bots, self.levels = bots, []
+            self.dtype = record_dtype(bots)
+            self._f.write(_pack_header(bots, self.levels))
+        self._ids: Dict[str, int] = {name: i for i, name in enumerate(self.levels)}
+        self._header_dirty = False
+        self._buf = np.zeros(buffer, dtype=self.dtype)
+        self._n = 0
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _level_ids(self, levels: Sequence[str]) -> List[int]:
+        if len(levels) != self.bots:
+            raise ValueError(f"expected {self.bots} levels, got {len(levels)}")
+        out = []
+        for name in levels:
+            i = self._ids.get(name)
+            if i is None:
+                if len(self.levels) >= 255:
+                    raise ValueError("an archive holds at most 255 level names")
+                i = self._ids[name] = len(self.levels)
+                self.levels.append(name)
+                _pack_header(self.bots, self.levels)  # raises now if the names no longer fit
+                self._header_dirty = True
+            out.append(i)
+        return out
+
+    def add(self, levels: Sequence[str], rounds: Sequence[Sequence[int]], game_id: Optional[str] = None,
+            scores: Optional[Sequence[float]] = None):
+        """
+        Append one game. `rounds` are (diamond, *plays) per round in play order;
+        scores are worked out from them unless given.
+        """
+        if len(rounds) > VALUES:
+            raise ValueError(f"a game has at most {VALUES} rounds")
+        rec = self._buf[self._n]
+        rec["levels"] = self._level_ids(levels)
+        rec["rounds"] = len(rounds)
+        rec["diamonds"] = 0
+        rec["plays"] = 0
+        if rounds:
+            arr = np.asarray(rounds, dtype=np.uint8)
+            rec["diamonds"][:len(rounds)] = arr[:, 0]
+            rec["plays"][:, :len(rounds)] = arr[:, 1:].T
+        if scores is None:
+            totals = [0.0] * self.bots
+            for d, *plays in rounds:
+                best = max(plays)
+                winners = [i for i, p in enumerate(plays) if p == best]
+                for i in winners:
+                    totals[i] += d / len(winners)
+            scores = totals
+        rec["scores"] = [round(s * SCORE_SCALE) for s in scores]
+        uid = _uid_bytes(game_id)
+        rec["flags"] = FLAG_UID if uid else 0
+        rec["uid"] = np.frombuffer(uid, dtype=np.uint8) if uid else 0
+        self._n += 1
+        if self._n == len(self._buf):
+            self.flush()
+
+    def add_record(self, rec: GameRecord):
+        self.add(rec.bot_levels, rec.rounds, rec.game_uid, rec.scores)
+
+    def add_outcome(self, levels: Sequence[str], outcome):
+        """Append a recorded `tournament.GameOutcome` of a matchup between `levels`."""
+        self.add(levels, outcome.rounds, outcome.game_id, outcome.scores)
+
+    def add_arrays(self, levels: Sequence[str], diamonds: np.ndarray, plays: np.ndarray, scores: np.ndarray,
+                   game_ids: Optional[Sequence[str]] = None):
+        """
+        Append N complete games between the same levels at once: `diamonds` is
+        (N, 13), `plays` (N, 13, bots) and `scores` (N, bots), as held by
+        `batched.BatchedGames`.
+        """
+        self.flush()
+        n = len(diamonds)
+        block = np.zeros(n, dtype=self.dtype)
+        block["levels"] = self._level_ids(levels)
+        block["diamonds"] = diamonds
+        block["plays"] = np.asarray(plays).transpose(0, 2, 1)
+        block["scores"] = np.rint(np.asarray(scores) * SCORE_SCALE)
+        block["rounds"] = VALUES
+        if game_ids is not None:
+            uids = [_uid_bytes(g) for g in game_ids]
+            has = np.array([u is not None for u in uids])
+            block["uid"][has] = np.frombuffer(b"".join(u for u in uids if u), dtype=np.uint8).reshape(-1, 16)
+            block["flags"][has] = FLAG_UID
+        self._write(block)
+
+    def flush(self):
+        if self._n:
+            self._write(self._buf[:self._n])
+            self._n = 0
+
+    def _write(self, block: np.ndarray):
+        f = self._f
+        if self._header_dirty:
+            # Names go in before the records that use them.
+            end = f.tell()
+            f.seek(0)
+            f.write(_pack_header(self.bots, self.levels))
+            f.seek(end)
+            self._header_dirty = False
+        f.write(block.tobytes())
+        f.flush()
+        self.written += len(block)
+
+    def close(self):
+        if not self._f.closed:
+            self.flush()
+            self._f.close()
+
+
+class Archive:
+    """Read-only, memory-mapped view of an archive."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, "rb")
+        self._mm: Optional[mmap.mmap] = None
+        self.refresh()
+
+    def refresh(self):
+        """Map the file again, picking up games appended since it was opened."""
+        self._unmap()
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.bots, self.levels = _read_header(self._mm, self.path)
+        self.dtype = record_dtype(self.bots)
+        count = (len(self._mm) - HEADER_SIZE) // self.dtype.itemsize
+        self.games = np.frombuffer(self._mm, dtype=self.dtype, count=count, offset=HEADER_SIZE)
+
+    def _unmap(self):
+        if self._mm is not None:
+            self.games = None
+            try:
+                self._mm.close()
+            except BufferError:
+                pass  # views handed out are still alive; unmapped once they are gone
+            self._mm = None
+
+    def close(self):
+        self._unmap()
+        self._f.close()
+
+    def __enter__(self) -> "Archive":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.games)
+
+    # --- Columns (views, nothing is copied) ---
+    @property
+    def diamonds(self) -> np.ndarray:
+        return self.games["diamonds"]
+
+    @property
+    def plays(self) -> np.ndarray:
+        return self.games["plays"]
+
+    @property
+    def level_ids(self) -> np.ndarray:
+        return self.games["levels"]
+
+    @property
+    def scores(self) -> np.ndarray:
+        """Final scores as floats (a computed array, not a view)."""
+        return self.games["scores"] / SCORE_SCALE
+
+    def chunks(self, size: int = 1 << 20) -> Iterator[np.ndarray]:
+        """Consecutive slices of at most `size` games, for scans that keep memory flat."""
+        for start in range(0, len(self.games), size):
+            yield self.games[start:start + size]
+
+    # --- Single games ---
+    def game_id(self, i: int) -> Optional[str]:
+        rec = self.games[i]
+        return str(uuid.UUID(bytes=rec["uid"].tobytes())) if rec["flags"] & FLAG_UID else None
+
+    def rounds(self, i: int) -> List[tuple]:
+        """(diamond, *plays) per round of game i."""
+        rec = self.games[i]
+        n = int(rec["rounds"])
+        return list(zip(rec["diamonds"][:n].tolist(), *rec["plays"][:, :n].tolist()))
+
+    def record(self, i: int) -> GameRecord:
+        if self.bots != 2:
+            raise ValueError("GameRecord holds two-bot games only")
+        rec = self.games[i]
+        levels = tuple(self.levels[j] for j in rec["levels"])
+        return GameRecord(levels, self.rounds(i), self.game_id(i))
+
+    def records(self) -> Iterator[GameRecord]:
+        for i in range(len(self)):
+            yield self.record(i)
+
+
+def convert(records: Iterable[GameRecord], path: str) -> int:
+    """Append `records` to the archive at `path`; returns how many were written."""
+    with ArchiveWriter(path) as out:
+        for rec in records:
+            out.add_record(rec)
+    return out.written
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Fixed-width binary archive of bot games.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    c = sub.add_parser("convert", help="append the games in a diamond_game_summary.csv file")
+    c.add_argument("csv_path")
+    c.add_argument("archive")
+    i = sub.add_parser("info", help="games, levels and per-matchup results")
+    i.add_argument("archive")
+    s = sub.add_parser("show", help="print one game")
+    s.add_argument("archive")
+    s.add_argument("index", type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == "convert":
+        start = time.perf_counter()
+        n = convert(read_summary_csv(args.csv_path), args.archive)
+        print(f"Converted {n:,} games in {time.perf_counter() - start:.2f}s: "
+              f"{os.path.getsize(args.csv_path):,} bytes of CSV -> {os.path.getsize(args.archive):,} bytes")
+        return
+    with Archive(args.archive) as a:
+        if args.command == "show":
+            if not -len(a) <= args.index < len(a):
+                parser.error(f"{args.archive} holds {len(a):,} games")
+            rec = a.games[args.index]
+            levels = [a.levels[j] for j in rec["levels"]]
+            print(f"Game {args.index} ({a.game_id(args.index) or 'no id'}): {' vs '.join(levels)}")
+            for k, (d, *plays) in enumerate(a.rounds(args.index), start=1):
+                print(f"Round {k:>2}: {d:>2} ♦ | {' vs '.join(f'{p:>2}' for p in plays)}")
+            print(f"Final scores: {(rec['scores'] / SCORE_SCALE).tolist()}")
+            return
+        start = time.perf_counter()
+        print(f"{len(a):,} {a.bots}-bot games, {a.dtype.itemsize} bytes each, {len(a.levels)} levels")
+        totals: Dict[tuple, np.ndarray] = {}
+        for chunk in a.chunks():
+            levels = chunk["levels"]
+            scores = chunk["scores"].astype(np.int32)
+            best = scores.max(axis=1)
+            sole = (scores == best[:, None]).sum(axis=1) == 1
+            winner = np.where(sole, scores.argmax(axis=1), a.bots)  # a.bots: a tie
+            key = levels.astype(np.int64) @ (256 ** np.arange(a.bots))
+            for k in np.unique(key):
+                sel = key == k
+                counts = np.bincount(winner[sel], minlength=a.bots + 1)
+                totals[tuple(levels[sel][0])] = totals.get(tuple(levels[sel][0]), 0) + counts
+        for ids, counts in sorted(totals.items()):
+            names = " vs ".join(a.levels[j] for j in ids)
+            wins = " / ".join(str(w) for w in counts[:-1])
+            print(f"{names:<30} {counts.sum():>12,} games | wins {wins} | ties {counts[-1]}")
+        print(f"Scanned in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
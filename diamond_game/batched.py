@@ -0,0 +1,189 @@
+"""
+Vectorized engine that plays many bot-only games in lockstep.
+
+State for N games is kept as arrays: hands are an (N, bots, 13) boolean matrix
+(column k holds card value k+1) and diamond orders an (N, 13) permutation
+matrix of values. Every round advances all games at once using array versions
+of the policies in `strategies.py`.
+
+Each game's RNG is seeded from its id exactly like `Game`, so for the same ids
+the scores and plays are identical to the scalar `Game`. When decision tables are
+loaded (`tables.load`), matching and smart become a single gather per round.
+"""
+import functools
+import random
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from . import tables
+from .cards import VALUES
+from .strategies import LEVEL_PARAMS, LEVELS
+from .tournament import game_id
+
+_VALUE_OF = np.arange(1, VALUES + 1, dtype=np.int64)
+_MASK_WEIGHTS = 1 << np.arange(VALUES)  # hand row -> bitmask >> 1
+
+
+# --- Array helpers (rows are hands, True = card still held) ---
+def _lowest(hand: np.ndarray) -> np.ndarray:
+    return np.argmax(hand, axis=1) + 1
+
+
+def _highest(hand: np.ndarray) -> np.ndarray:
+    return VALUES - np.argmax(hand[:, ::-1], axis=1)
+
+
+def _lowest_from(hand: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Lowest held card among `mask`, else the lowest held card."""
+    sel = hand & mask
+    return np.where(sel.any(axis=1), _lowest(sel), _lowest(hand))
+
+
+# --- Array policies, mirroring strategies._pick_* ---
+def _batch_random(hand: np.ndarray, diamond: np.ndarray, known: np.ndarray, draws: np.ndarray) -> np.ndarray:
+    # random.choice(remaining_values()) picks the draws-th smallest held card.
+    ranks = np.cumsum(hand, axis=1)
+    return np.argmax(ranks == (draws + 1)[:, None], axis=1) + 1
+
+
+def _batch_matching(
+    hand: np.ndarray, diamond: np.ndarray, known: np.ndarray, draws: np.ndarray, offset: int = 0
+) -> np.ndarray:
+    if offset:
+        diamond = np.clip(diamond + offset, 1, VALUES)
+    rows = np.arange(hand.shape[0])
+    has = hand[rows, diamond - 1]
+    above = _lowest_from(hand, _VALUE_OF[None, :] >= diamond[:, None])
+    return np.where(has, diamond, above)
+
+
+def _batch_smart(
+    hand: np.ndarray,
+    diamond: np.ndarray,
+    known: np.ndarray,
+    draws: np.ndarray,
+    threshold: int = 10,
+    neutral_high: int = 10,
+) -> np.ndarray:
+    high_diamond_threshold = threshold
+    user_high = np.where(known.any(axis=1), _highest(known), neutral_high)
+    beat = hand & (_VALUE_OF[None, :] > user_high[:, None])
+    atleast = _lowest_from(hand, _VALUE_OF[None, :] >= diamond[:, None])
+    high = np.where(beat.any(axis=1), _lowest(beat), atleast)
+    return np.where(diamond < high_diamond_threshold, _lowest(hand), high)
+
+
+_POLICIES: Dict[str, Callable[..., np.ndarray]] = {
+    "random": _batch_random,
+    "matching": _batch_matching,
+    "smart": _batch_smart,
+}
+
+
+def _table_policies(t: tables.DecisionTables) -> Dict[str, Callable[..., np.ndarray]]:
+    """`_POLICIES` with matching and smart answered from precomputed tables."""
+    matching_raw, smart_raw = t.sections()
+    matching = np.frombuffer(matching_raw, dtype=np.uint8).reshape(-1, VALUES)
+    smart = np.frombuffer(smart_raw, dtype=np.uint8).reshape(-1, VALUES, VALUES)
+
+    def table_matching(hand, diamond, known, draws):
+        return matching[hand @ _MASK_WEIGHTS, diamond - 1]
+
+    def table_smart(hand, diamond, known, draws):
+        user_high = np.where(known.any(axis=1), _highest(known), 10)
+        return smart[hand @ _MASK_WEIGHTS, diamond - 1, user_high - 1]
+
+    return dict(_POLICIES, matching=table_matching, smart=table_smart)
+
+
+class BatchedGames:
+    """N games between the same bot levels, advanced one round at a time."""
+
+    def __init__(self, bot_levels: Sequence[str], game_ids: Sequence[str]):
+        self.bot_levels = list(bot_levels)
+        self.strategies = [LEVELS.get(level, "matching") for level in self.bot_levels]
+        for s in self.strategies:
+            if s not in _POLICIES:
+                raise ValueError(f"No batched policy for strategy: {s}")
+        n, bots = len(game_ids), len(self.bot_levels)
+        self.game_ids = list(game_ids)
+        self.round_no = 0
+        self.orders = np.empty((n, VALUES), dtype=np.int64)
+        self.hands = np.ones((n, bots, VALUES), dtype=bool)
+        self.scores = np.zeros((n, bots), dtype=np.float64)
+        self.plays = np.zeros((n, VALUES, bots), dtype=np.int64)
+        self._draws = np.zeros((n, VALUES, bots), dtype=np.int64)
+        self._others = [[j for j in range(bots) if j != i] for i in range(bots)]
+        policies = _table_policies(tables.active) if tables.active is not None else _POLICIES
+        # Levels with their own parameters always use the array policies; the tables hold the defaults.
+        self._policies = [
+            functools.partial(_POLICIES[s], **LEVEL_PARAMS[level]) if level in LEVEL_PARAMS else policies[s]
+            for level, s in zip(self.bot_levels, self.strategies)
+        ]
+        self._deal()
+
+    def _deal(self):
+        # Replay each game's RNG stream: one deck shuffle, then one draw per
+        # random bot per round in seat order, exactly as the scalar Game does.
+        random_seats = [i for i, s in enumerate(self.strategies) if s == "random"]
+        for g, gid in enumerate(self.game_ids):
+            rng = random.Random(gid)
+            order = list(range(1, VALUES + 1))
+            rng.shuffle(order)
+            self.orders[g] = order
+            if random_seats:
+                for r in range(VALUES):
+                    for i in random_seats:
+                        self._draws[g, r, i] = rng.randrange(VALUES - r)
+
+    def is_over(self) -> bool:
+        return self.round_no >= VALUES
+
+    def play_round(self) -> np.ndarray:
+        """Advance every game by one round and return the (N, bots) plays."""
+        if self.is_over():
+            raise RuntimeError("Games are already over.")
+        r = self.round_no
+        diamond = self.orders[:, r]
+        rows = np.arange(len(self.game_ids))
+        plays = self.plays[:, r, :]
+        # Every seat decides on the hands as they were before anyone played, like Game,
+        # and knows the cards its opponents have left (their union).
+        for i, others in enumerate(self._others):
+            known = self.hands[:, others[0], :] if len(others) == 1 else self.hands[:, others, :].any(axis=1)
+            plays[:, i] = self._policies[i](self.hands[:, i, :], diamond, known, self._draws[:, r, i])
+        for i in range(len(self._others)):
+            self.hands[rows, i, plays[:, i] - 1] = False
+
+        best = plays.max(axis=1)
+        winners = plays == best[:, None]
+        share = diamond / winners.sum(axis=1)
+        self.scores += np.where(winners, share[:, None], 0.0)
+        self.round_no += 1
+        return plays
+
+    def run(self) -> "BatchedGames":
+        while not self.is_over():
+            self.play_round()
+        return self
+
+    def winners(self) -> np.ndarray:
+        """Seat index of each game's winner, -1 on a tie."""
+        best = self.scores.max(axis=1)
+        top = self.scores == best[:, None]
+        return np.where(top.sum(axis=1) == 1, np.argmax(top, axis=1), -1)
+
+
+def supports(bot_levels: Sequence[str]) -> bool:
+    """True when every level has an array policy, so `BatchedGames` can play it."""
+    return all(LEVELS.get(level, "matching") in _POLICIES for level in bot_levels)
+
+
+def play_batch(bot_levels: Sequence[str], game_ids: Sequence[str]) -> BatchedGames:
+    return BatchedGames(bot_levels, game_ids).run()
+
+
+def tournament_ids(seed: int, games: int) -> List[str]:
+    """Game ids used by `tournament.run_matchup` for the same arguments (unpaired)."""
+    return [game_id(seed, i) for i in range(games)]
@@ -1,27 +1,52 @@
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, List, Optional, Tuple
 import random
 
 SUITS = ("♦", "♥", "♠", "♣")
+VALUES = 13  # values per suit in the standard game; larger decks are a game option
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Card:
     suit: str
-    value: int  # 1..13 (Ace=1, ... , King=13)
+    value: int  # 1..13 (Ace=1, ... , King=13), or up to the deck size in larger variants
 
     def __str__(self):
-        return f"{self.value} {self.suit}"
+        return label(self.suit, self.value)
 
-def diamond_deck() -> List["Card"]: # initializing the diamond deck and shuffling it
-    """Return 13 diamond cards (♦1..♦13)."""
-    diamond_deck = [Card("♦", v) for v in range(1, 14)]
-    random.shuffle(diamond_deck)
+# One shared instance per suit/value pair; cards are immutable, so games can share them.
+_CARDS: Dict[Tuple[str, int], Card] = {(s, v): Card(s, v) for s in SUITS for v in range(1, VALUES + 1)}
+_DIAMONDS: Tuple[Card, ...] = tuple(_CARDS["♦", v] for v in range(1, VALUES + 1))
+_LABELS: Dict[Tuple[str, int], str] = {key: f"{key[1]} {key[0]}" for key in _CARDS}
+_SUIT_LABELS: Dict[str, Tuple[str, ...]] = {}
+
+def card(suit: str, value: int) -> Card:
+    """The shared card for a standard suit and value; a new `Card` for anything else."""
+    try:
+        return _CARDS[suit, value]
+    except KeyError:
+        if suit in SUITS and value > 0:  # larger decks: share these too once made
+            c = _CARDS[suit, value] = Card(suit, value)
+            return c
+        return Card(suit, value)
+
+def label(suit: str, value: int) -> str:
+    """Display form of a card, e.g. "7 ♠"."""
+    return _LABELS.get((suit, value)) or f"{value} {suit}"
+
+def suit_labels(suit: str, size: int = VALUES) -> Tuple[str, ...]:
+    """Display forms of a suit's cards, indexed by value (index 0 is unused), for values up to at least `size`."""
+    labels = _SUIT_LABELS.get(suit)
+    if labels is None or len(labels) <= size:
+        labels = _SUIT_LABELS[suit] = ("",) + tuple(label(suit, v) for v in range(1, max(size, VALUES) + 1))
+    return labels
+
+def diamond_deck(rng: Optional[random.Random] = None, size: int = VALUES) -> List["Card"]: # initializing the diamond deck and shuffling it
+    """Return `size` diamond cards (♦1..♦13 by default), shuffled with `rng` (default: the global random module)."""
+    diamond_deck = list(_DIAMONDS) if size == VALUES else [card("♦", v) for v in range(1, size + 1)]
+    (rng or random).shuffle(diamond_deck)
     return diamond_deck
 
-def suit_hand(suit: str) -> List["Card"]: # giving each suit to the players
-    """Return 13 cards of a single suit (values 1..13)."""
+def suit_hand(suit: str, size: int = VALUES) -> List["Card"]: # giving each suit to the players
+    """Return `size` cards of a single suit (values 1..13 by default)."""
     assert suit in SUITS
-    return [Card(suit, v) for v in range(1, 14)]
-
-hearts_hand = suit_hand("♥")
-print(hearts_hand)
\ No newline at end of file
+    return [card(suit, v) for v in range(1, size + 1)]
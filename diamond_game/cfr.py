@@ -0,0 +1,572 @@
+"""
+Self-play CFR trainer and memory-mapped equilibrium policy for two-bot games.
+
+Both bots see each other's plays, so the state is public apart from the order
+of the diamonds still to come; what makes the game hard is that the cards are
+chosen simultaneously, and any deterministic strategy can be beaten by one
+that knows it. The trainer looks for a mixed strategy instead, with
+counterfactual regret minimization over an abstraction of the state:
+
+- infoset: cards left, the diamond's rank among the diamonds still to come,
+  the score gap relative to the points left (5 buckets), and how the bot's
+  highest card and card total compare with the opponent's (3 x 3);
+  91 x 5 x 9 = 4095 infosets.
+- actions: play the lowest card, the smallest card >= the diamond ("match"),
+  the median card, the smallest card beating the opponent's highest
+  ("clinch"), or the highest card.
+
+Training plays batches of self-play games with numpy. At every decision on a
+sampled game, each of the acting bot's actions is valued with one rollout of
+the current strategy against the opponent's sampled card, and the regrets
+(CFR+: floored at zero) and the strategy sum (weighted by iteration) are added
+to the infoset. Batches run across worker processes; the regret and strategy
+sums are checkpointed periodically and training can resume from them. The
+payoff is the game result (+1 win, 0 tie, -1 loss), as in `endgame`.
+
+The averaged strategy is written as one byte of cumulative probability per
+infoset and action (about 20 KB), memory-mapped by the "cfr" level, which
+samples a decision in O(1). Exploitability is estimated with a local best
+response: an exploiter that, every round, tries each card it holds with a few
+rollouts of the policy and plays the best. It is a lower bound, and 0 for an
+unexploitable policy.
+
+    python -m diamond_game.cfr train --games 2000000
+    python -m diamond_game.cfr exploit cfr expert medium
+
+The policy is written to and read from `cfr_policy.bin` beside the package (the
+project root in a checkout), or wherever DIAMOND_CFR_POLICY points.
+"""
+import argparse
+import functools
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .cards import VALUES
+
+VERSION = 1
+MAGIC = b"DGC1"
+
+ACTIONS = ("low", "match", "mid", "clinch", "high")
+GAP_BUCKETS = 5
+_POSITIONS = VALUES * (VALUES + 1) // 2  # (cards left, diamond rank) pairs
+INFOSETS = _POSITIONS * GAP_BUCKETS * 9
+
+_HEADER = struct.Struct("<4sHHI")  # magic, version, actions, infosets
+_FULL = ((1 << VALUES) - 1) << 1
+
+# --- Per-hand lookups, indexed by mask >> 1 (bit v - 1 set = value v held) ---
+_HANDS = 1 << VALUES
+_HELD = [[v for v in range(1, VALUES + 1) if h >> (v - 1) & 1] for h in range(_HANDS)]
+_POP_L = [len(vs) for vs in _HELD]
+_SUM_L = [sum(vs) for vs in _HELD]
+_LOW_L = [vs[0] if vs else 0 for vs in _HELD]
+_HIGH_L = [vs[-1] if vs else 0 for vs in _HELD]
+_MID_L = [vs[(len(vs) - 1) // 2] if vs else 0 for vs in _HELD]
+_TRI_L = [n * (n - 1) // 2 for n in range(VALUES + 1)]
+
+_POP = np.array(_POP_L, dtype=np.int64)
+_SUM = np.array(_SUM_L, dtype=np.int64)
+_LOW = np.array(_LOW_L, dtype=np.int64)
+_HIGH = np.array(_HIGH_L, dtype=np.int64)
+_MID = np.array(_MID_L, dtype=np.int64)
+_TRI = np.array(_TRI_L, dtype=np.int64)
+# _CEIL[h, v]: smallest held card >= v, 0 if none (v = 0..14)
+_CEIL = np.array(
+    [[next((c for c in vs if c >= v), 0) for v in range(VALUES + 2)] for vs in _HELD], dtype=np.int64
+)
+
+
+# --- Abstraction ---
+def _gap_bucket(gap2: int, left: int) -> int:
+    # gap2 is twice the score gap; left the points still in play (> 0).
+    if gap2 <= -left:
+        return 0
+    if 5 * gap2 < -left:
+        return 1
+    if 5 * gap2 <= left:
+        return 2
+    return 3 if gap2 < left else 4
+
+
+def infoset(diamond: int, future: int, mine: int, opp: int, gap2: int) -> int:
+    """
+    Infoset index for the bot holding `mine` when `diamond` is on the table.
+    `future`, `mine` and `opp` are bitmasks (bit v = value v); `gap2` is twice
+    the bot's score minus the opponent's.
+    """
+    m, o = mine >> 1, opp >> 1
+    position = _TRI_L[_POP_L[m]] + (future & ((1 << diamond) - 1)).bit_count()
+    gap = _gap_bucket(gap2, diamond + _SUM_L[future >> 1])
+    high = (_HIGH_L[m] > _HIGH_L[o]) - (_HIGH_L[m] < _HIGH_L[o]) + 1
+    total = (_SUM_L[m] > _SUM_L[o]) - (_SUM_L[m] < _SUM_L[o]) + 1
+    return ((position * GAP_BUCKETS + gap) * 3 + high) * 3 + total
+
+
+def action_card(action: int, diamond: int, mine: int, opp: int) -> int:
+    """The card an abstract action plays from `mine`."""
+    m = mine >> 1
+    if action == 0:
+        return _LOW_L[m]
+    if action == 2:
+        return _MID_L[m]
+    if action == 4:
+        return _HIGH_L[m]
+    target = diamond if action == 1 else _HIGH_L[opp >> 1] + 1
+    above = mine >> target << target
+    if above:
+        return (above & -above).bit_length() - 1
+    if action == 3 and mine >> (target - 1) & 1:
+        return target - 1  # cannot beat their highest card: tie it
+    return _LOW_L[m]
+
+
+# Array versions take the diamond's rank among the diamonds still to come and
+# the points left instead of the future mask; both depend only on the deal.
+_BASE = _TRI[_POP] * GAP_BUCKETS  # cards left, folded into the position
+_WIDTH = 3 + 2 * (VALUES + 1)
+# _OPTIONS[h, col]: lowest, median and highest card, then "match" by diamond
+# value and "clinch" by the opponent's highest card (0..13 each).
+_OPTIONS = np.zeros((_HANDS, _WIDTH), dtype=np.int64)
+for _h in range(1, _HANDS):
+    _OPTIONS[_h, :3] = (_LOW_L[_h], _MID_L[_h], _HIGH_L[_h])
+    for _v in range(VALUES + 1):
+        _OPTIONS[_h, 3 + _v] = action_card(1, _v, _h << 1, 0) if _v else _LOW_L[_h]
+        _OPTIONS[_h, 4 + VALUES + _v] = action_card(3, 0, _h << 1, 1 << _v if _v else 0)
+_OPTIONS = _OPTIONS.ravel()
+_COLUMN = np.array([0, 3, 1, 4 + VALUES, 2])  # per action, before the diamond / opponent offset
+
+
+def _infosets(
+    rank: np.ndarray, left: np.ndarray, mine: np.ndarray, opp: np.ndarray, gap2: np.ndarray
+) -> np.ndarray:
+    """`infoset` over arrays of states."""
+    m, o = mine >> 1, opp >> 1
+    g5 = 5 * gap2
+    # Same buckets as _gap_bucket: count the thresholds passed.
+    gap = (gap2 > -left).astype(np.int64) + (g5 >= -left) + (g5 > left) + (gap2 >= left)
+    high = np.sign(_HIGH[m] - _HIGH[o])
+    total = np.sign(_SUM[m] - _SUM[o])
+    return ((_BASE[m] + rank * GAP_BUCKETS + gap) * 3 + high) * 3 + total + 4
+
+
+def _action_cards(actions: np.ndarray, d: np.ndarray, mine: np.ndarray, opp: np.ndarray) -> np.ndarray:
+    """Card each row's action plays, as in `action_card`; `actions` is (N,) or (N, k)."""
+    col = _COLUMN[actions]
+    if actions.ndim == 2:
+        d, mine, opp = d[:, None], mine[:, None], opp[:, None]
+    col = col + np.where(actions == 1, d, 0) + np.where(actions == 3, _HIGH[opp >> 1], 0)
+    return _OPTIONS[(mine >> 1) * _WIDTH + col]
+
+
+# --- Vectorized play ---
+# A policy maps (diamond, rank, left, mine, opp, gap2, rng) arrays to the cards played.
+Policy = Callable[..., np.ndarray]
+
+
+class _TablePolicy:
+    """Samples abstract actions from an (infosets, actions) probability table."""
+
+    def __init__(self, probs: np.ndarray):
+        cum = np.cumsum(probs, axis=1)
+        self.cum = cum[:, :-1].T.copy()  # the last column is 1
+
+    def actions(self, keys: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        u = rng.random(len(keys))
+        a = (u >= self.cum[0][keys]).astype(np.int64)
+        for column in self.cum[1:]:
+            a += u >= column[keys]
+        return a
+
+    def __call__(self, d, rank, left, mine, opp, gap2, rng) -> np.ndarray:
+        return _action_cards(self.actions(_infosets(rank, left, mine, opp, gap2), rng), d, mine, opp)
+
+
+def _level_policy(level: str) -> Policy:
+    """Vectorized policy of a level: the loaded policy file for "cfr", else the batched engine's."""
+    from . import batched
+    from .strategies import LEVEL_PARAMS, LEVELS
+
+    strategy = LEVELS.get(level)
+    if strategy == "cfr":
+        return _TablePolicy(policy().probabilities())
+    if strategy not in batched._POLICIES:
+        raise ValueError(f"No vectorized policy for level: {level}")
+    fn = functools.partial(batched._POLICIES[strategy], **LEVEL_PARAMS.get(level, {}))
+    held = (np.arange(_HANDS)[:, None] >> np.arange(VALUES) & 1).astype(bool)
+
+    def play(d, rank, left, mine, opp, gap2, rng):
+        # Strategies see the opponent's remaining cards, as in Game.
+        return fn(held[mine >> 1], d, held[opp >> 1], rng.integers(0, _POP[mine >> 1]))
+
+    return play
+
+
+def _deal(n: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Diamond orders (N, 13) with, per round, the diamond's rank among those
+    still to come and the points left including it.
+    """
+    orders = rng.permuted(np.tile(np.arange(1, VALUES + 1), (n, 1)), axis=1)
+    later = np.triu(np.ones((VALUES, VALUES), dtype=bool), 1)  # [t, u]: round u comes after t
+    ranks = ((orders[:, None, :] < orders[:, :, None]) & later).sum(axis=2)
+    lefts = np.cumsum(orders[:, ::-1], axis=1)[:, ::-1].copy()
+    return orders, ranks, lefts
+
+
+def _playout(
+    deal: Tuple[np.ndarray, np.ndarray, np.ndarray], start: int,
+    mine: np.ndarray, opp: np.ndarray, gap2: np.ndarray,
+    p0: Policy, p1: Policy, rng: np.random.Generator,
+) -> np.ndarray:
+    """Play rounds `start`.. to the end; returns the final gap2 from the first bot's side."""
+    orders, ranks, lefts = deal
+    for r in range(start, VALUES - 1):
+        d, rank, left = orders[:, r], ranks[:, r], lefts[:, r]
+        c0 = p0(d, rank, left, mine, opp, gap2, rng)
+        c1 = p1(d, rank, left, opp, mine, -gap2, rng)
+        gap2 = gap2 + 2 * d * np.sign(c0 - c1)
+        mine = mine ^ (1 << c0)
+        opp = opp ^ (1 << c1)
+    # One card each is left.
+    return gap2 + 2 * orders[:, -1] * np.sign(_HIGH[mine >> 1] - _HIGH[opp >> 1])
+
+
+# --- Training ---
+def _regret_matching(regrets: np.ndarray) -> np.ndarray:
+    pos = np.maximum(regrets, 0.0)
+    total = pos.sum(axis=1, keepdims=True)
+    return np.where(total > 0, pos / np.where(total > 0, total, 1.0), 1.0 / len(ACTIONS))
+
+
+def average_policy(strategy_sum: np.ndarray) -> np.ndarray:
+    """Normalized average strategy; uniform where an infoset was never reached."""
+    total = strategy_sum.sum(axis=1, keepdims=True)
+    return np.where(total > 0, strategy_sum / np.where(total > 0, total, 1.0), 1.0 / len(ACTIONS))
+
+
+def train_batch(probs: np.ndarray, games: int, seed, explore: float = 0.1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    One batch of self-play games under the current strategy `probs`; returns
+    the (regret, strategy) sums to add, both (infosets, actions).
+    """
+    rng = np.random.default_rng(seed)
+    a = len(ACTIONS)
+    current = _TablePolicy(probs)
+    # Sampled games wander off the current strategy now and then, so rarely chosen lines get regrets too.
+    walk = _TablePolicy((1 - explore) * probs + explore / a)
+    deal = _deal(games, rng)
+    orders, ranks, lefts = deal
+    mine = np.full(games, _FULL, dtype=np.int64)
+    opp = mine.copy()
+    gap2 = np.zeros(games, dtype=np.int64)
+    rows = np.arange(games)
+    rep = np.tile(rows, 2 * a)
+    rep_deal = tuple(x[rep] for x in deal)
+    every = np.tile(np.arange(a), (games, 1))
+    regret = np.zeros(INFOSETS * a)
+    strategy = np.zeros(INFOSETS * a)
+    for t in range(VALUES - 1):
+        d, rank, left = orders[:, t], ranks[:, t], lefts[:, t]
+        keys = (_infosets(rank, left, mine, opp, gap2), _infosets(rank, left, opp, mine, -gap2))
+        cards = (_action_cards(every, d, mine, opp), _action_cards(every, d, opp, mine))
+        played = [cards[s][rows, walk.actions(keys[s], rng)] for s in (0, 1)]
+        # Every action of each bot against the other's sampled card: rows are (bot, action, game).
+        c0 = np.concatenate([cards[0].T.ravel(), np.tile(played[0], a)])
+        c1 = np.concatenate([np.tile(played[1], a), cards[1].T.ravel()])
+        after = gap2[rep] + 2 * d[rep] * np.sign(c0 - c1)
+        final = _playout(rep_deal, t + 1, mine[rep] ^ (1 << c0), opp[rep] ^ (1 << c1), after, current, current, rng)
+        result = np.sign(final).reshape(2, a, games).astype(np.float64)
+        for s, values in ((0, result[0].T), (1, -result[1].T)):
+            sigma = probs[keys[s]]
+            idx = (keys[s][:, None] * a + every).ravel()
+            gain = values - (sigma * values).sum(axis=1, keepdims=True)
+            regret += np.bincount(idx, weights=gain.ravel(), minlength=INFOSETS * a)
+            strategy += np.bincount(idx, weights=sigma.ravel(), minlength=INFOSETS * a)
+        gap2 = gap2 + 2 * d * np.sign(played[0] - played[1])
+        mine = mine ^ (1 << played[0])
+        opp = opp ^ (1 << played[1])
+    return regret.reshape(INFOSETS, a), strategy.reshape(INFOSETS, a)
+
+
+class Trainer:
+    """CFR+ state: regret and strategy sums with the number of iterations and games behind them."""
+
+    def __init__(self, seed: int = 0, batch: int = 1024, explore: float = 0.1):
+        self.seed = seed
+        self.batch = batch
+        self.explore = explore
+        self.regrets = np.zeros((INFOSETS, len(ACTIONS)))
+        self.strategy_sum = np.zeros((INFOSETS, len(ACTIONS)))
+        self.iterations = 0
+        self.games = 0
+        self.elapsed = 0.0
+
+    def step(self, pool: Optional[ProcessPoolExecutor] = None, tasks: int = 1):
+        """One iteration: `tasks` batches under the current strategy, then one update."""
+        probs = _regret_matching(self.regrets)
+        seeds = [(self.seed, self.iterations, i) for i in range(tasks)]
+        start = time.perf_counter()
+        if pool is None:
+            parts = [train_batch(probs, self.batch, s, self.explore) for s in seeds]
+        else:
+            parts = list(pool.map(train_batch, [probs] * tasks, [self.batch] * tasks, seeds, [self.explore] * tasks))
+        self.iterations += 1
+        for regret, strategy in parts:
+            self.regrets += regret
+            self.strategy_sum += self.iterations * strategy  # linear averaging
+        np.maximum(self.regrets, 0.0, out=self.regrets)  # CFR+
+        self.games += tasks * self.batch
+        self.elapsed += time.perf_counter() - start
+
+    def policy(self) -> np.ndarray:
+        return average_policy(self.strategy_sum)
+
+    # --- Checkpoints ---
+    def save(self, path: str):
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f, version=VERSION, regrets=self.regrets, strategy_sum=self.strategy_sum,
+                counters=np.array([self.iterations, self.games, self.seed, self.batch]),
+                elapsed=self.elapsed, explore=self.explore,
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "Trainer":
+        with np.load(path) as data:
+            if int(data["version"]) != VERSION or data["regrets"].shape != (INFOSETS, len(ACTIONS)):
+                raise ValueError(f"{path} is not a version {VERSION} CFR checkpoint")
+            iterations, games, seed, batch = (int(x) for x in data["counters"])
+            t = cls(seed, batch, float(data["explore"]))
+            t.regrets = data["regrets"].copy()
+            t.strategy_sum = data["strategy_sum"].copy()
+            t.iterations, t.games, t.elapsed = iterations, games, float(data["elapsed"])
+        return t
+
+
+# --- Exploitability ---
+def exploitability(target: Policy, games: int = 2000, seed: int = 0, samples: int = 4) -> Tuple[float, float]:
+    """
+    Local best response to `target`: every round the exploiter tries each card
+    it holds with `samples` rollouts in which both bots then play `target`, and
+    plays the best one. Returns the exploiter's mean result (+1 win, -1 loss)
+    and its standard error, a lower bound on exploitability.
+    """
+    rng = np.random.default_rng(seed)
+    deal = _deal(games, rng)
+    orders, ranks, lefts = deal
+    mine = np.full(games, _FULL, dtype=np.int64)
+    opp = mine.copy()
+    gap2 = np.zeros(games, dtype=np.int64)
+    values = np.arange(1, VALUES + 1)
+    rep = np.tile(np.arange(games), VALUES * samples)
+    rep_deal = tuple(x[rep] for x in deal)
+    tried = np.repeat(values, samples * games)
+    for t in range(VALUES - 1):
+        d, rank, left = orders[:, t], ranks[:, t], lefts[:, t]
+        theirs = target(d, rank, left, opp, mine, -gap2, rng)
+        # Rows are (card, sample, game); the opponent's card is drawn afresh in each.
+        dr = d[rep]
+        answer = target(dr, rank[rep], left[rep], opp[rep], mine[rep], -gap2[rep], rng)
+        after = gap2[rep] + 2 * dr * np.sign(tried - answer)
+        final = _playout(rep_deal, t + 1, mine[rep] ^ (1 << tried), opp[rep] ^ (1 << answer), after,
+                         target, target, rng)
+        score = np.sign(final).reshape(VALUES, samples, games).mean(axis=1).T
+        held = (mine[:, None] >> values) & 1 == 1
+        ours = np.argmax(np.where(held, score, -np.inf), axis=1) + 1
+        gap2 = gap2 + 2 * d * np.sign(ours - theirs)
+        mine = mine ^ (1 << ours)
+        opp = opp ^ (1 << theirs)
+    gap2 = gap2 + 2 * orders[:, -1] * np.sign(_HIGH[mine >> 1] - _HIGH[opp >> 1])
+    result = np.sign(gap2)
+    return float(result.mean()), float(result.std(ddof=1) / np.sqrt(games))
+
+
+# --- Policy file ---
+def encode_policy(probs: np.ndarray) -> bytes:
+    """One byte of cumulative probability (out of 255) per infoset and action."""
+    cum = np.rint(np.cumsum(probs, axis=1) * 255)
+    cum[:, -1] = 255
+    return _HEADER.pack(MAGIC, VERSION, len(ACTIONS), INFOSETS) + cum.astype(np.uint8).tobytes()
+
+
+def write_policy(path: str, probs: np.ndarray) -> int:
+    data = encode_policy(probs)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+class CFRPolicy:
+    """Read-only view of a policy file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, actions, infosets = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION or actions != len(ACTIONS) or infosets != INFOSETS:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {VERSION} CFR policy file")
+        if len(self._mm) != _HEADER.size + INFOSETS * len(ACTIONS):
+            self._mm.close()
+            raise ValueError(f"{path} is truncated")
+        self._buf = memoryview(self._mm)
+
+    def sample(self, key: int, draw: int) -> int:
+        """Action for infoset `key` given a uniform `draw` in [0, 255)."""
+        base = _HEADER.size + key * len(ACTIONS)
+        buf = self._buf
+        for a in range(len(ACTIONS) - 1):
+            if draw < buf[base + a]:
+                return a
+        return len(ACTIONS) - 1
+
+    def probabilities(self) -> np.ndarray:
+        cum = np.frombuffer(self._buf, dtype=np.uint8, offset=_HEADER.size).reshape(INFOSETS, len(ACTIONS))
+        return np.diff(cum.astype(np.float64), axis=1, prepend=0.0) / 255
+
+    def close(self):
+        self._buf.release()
+        self._mm.close()
+
+
+# Where the "cfr" level looks for its policy: $DIAMOND_CFR_POLICY, else next to the package.
+DEFAULT_PATH = os.environ.get("DIAMOND_CFR_POLICY") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cfr_policy.bin"
+)
+
+# The policy the "cfr" level plays; loaded from DEFAULT_PATH on first use if not set.
+active: Optional[CFRPolicy] = None
+
+
+def load(path: str) -> CFRPolicy:
+    global active
+    unload()
+    active = CFRPolicy(path)
+    return active
+
+
+def unload():
+    global active
+    if active is not None:
+        active.close()
+        active = None
+
+
+def available() -> bool:
+    return active is not None or os.path.exists(DEFAULT_PATH)
+
+
+def missing() -> str:
+    """Why the cfr level cannot play, for error messages."""
+    return (f"No CFR policy loaded and no {DEFAULT_PATH}; train one with `python -m diamond_game.cfr train` "
+            "or point DIAMOND_CFR_POLICY at a policy file")
+
+
+def policy() -> CFRPolicy:
+    if active is None:
+        if not os.path.exists(DEFAULT_PATH):
+            raise RuntimeError(missing())
+        load(DEFAULT_PATH)
+    return active
+
+
+def choose(bot, diamond_value: int, future: int, opponent: int, diff2: int) -> int:
+    """The card `bot` plays under the loaded policy against one opponent holding the cards in mask `opponent`."""
+    mine, opp = bot.hand.mask, opponent
+    key = infoset(diamond_value, future, mine, opp, diff2)
+    draw = (bot.rng or random).randrange(255)
+    return action_card(policy().sample(key, draw), diamond_value, mine, opp)
+
+
+# --- CLI ---
+def _train(args) -> int:
+    if args.resume and os.path.exists(args.checkpoint):
+        trainer = Trainer.load(args.checkpoint)
+        print(f"Resumed from {args.checkpoint}: {trainer.games:,} games, {trainer.iterations:,} iterations")
+    else:
+        trainer = Trainer(args.seed, args.batch, args.explore)
+    workers = args.workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    def report():
+        line = (f"{trainer.games:>11,} games | {trainer.iterations:>7,} iterations | "
+                f"{trainer.games / max(trainer.elapsed, 1e-9):>8,.0f} games/s")
+        if args.eval_games:
+            value, err = exploitability(_TablePolicy(trainer.policy()), args.eval_games, seed=trainer.iterations)
+            line += f" | exploitability {value:+.3f} ± {1.96 * err:.3f}"
+        print(line)
+        sys.stdout.flush()
+
+    last = time.monotonic()
+    try:
+        while trainer.games < args.games:
+            trainer.step(pool, workers)
+            if time.monotonic() - last >= args.checkpoint_every:
+                trainer.save(args.checkpoint)
+                write_policy(args.out, trainer.policy())
+                report()
+                last = time.monotonic()
+    except KeyboardInterrupt:
+        print("Interrupted; saving")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    trainer.save(args.checkpoint)
+    size = write_policy(args.out, trainer.policy())
+    report()
+    print(f"Wrote {args.out} ({size:,} bytes) and checkpoint {args.checkpoint}")
+    return 0
+
+
+def _exploit(args) -> int:
+    from .strategies import LEVELS
+
+    if args.policy:
+        load(args.policy)
+    for level in args.levels:
+        if level not in LEVELS:
+            raise SystemExit(f"Unknown bot level: {level}")
+        value, err = exploitability(_level_policy(level), args.games, args.seed, args.samples)
+        print(f"{level:<10} exploitability {value:+.3f} ± {1.96 * err:.3f} (exploiter's mean result, 1 = always wins)")
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Train or evaluate the CFR policy for two-bot games.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    t = sub.add_parser("train", help="run self-play CFR and write the averaged policy")
+    t.add_argument("--games", type=int, default=1_000_000, help="self-play games to train on in total")
+    t.add_argument("--batch", type=int, default=1024, help="games per worker and iteration")
+    t.add_argument("--workers", type=int, default=None)
+    t.add_argument("--seed", type=int, default=0)
+    t.add_argument("--explore", type=float, default=0.1, help="chance a sampled game leaves the current strategy")
+    t.add_argument("--out", default=DEFAULT_PATH)
+    t.add_argument("--checkpoint", default="cfr_checkpoint.npz")
+    t.add_argument("--checkpoint-every", type=float, default=60.0, help="seconds between checkpoints")
+    t.add_argument("--resume", action="store_true", help="continue from the checkpoint if it exists")
+    t.add_argument("--eval-games", type=int, default=1000, help="games per exploitability estimate (0: off)")
+    e = sub.add_parser("exploit", help="estimate how exploitable levels are")
+    e.add_argument("levels", nargs="+")
+    e.add_argument("--policy", default=None, help=f"policy file for the cfr level (default: {DEFAULT_PATH})")
+    e.add_argument("--games", type=int, default=2000)
+    e.add_argument("--samples", type=int, default=4, help="rollouts per candidate card")
+    e.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    return _train(args) if args.command == "train" else _exploit(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -108,6 +108,7 @@
 
 import sys
 from .storage import manager
+from .strategies import playable_levels
 import csv
 import os
 
@@ -128,12 +129,12 @@ def prompt_int_any(msg: str, min_val: int, max_val: int):
         print(f"Please enter an integer between {min_val} and {max_val}.")
 
 def prompt_level(bot_name, default):
-    allowed_levels = ["easy", "medium", "expert"]
+    allowed_levels = playable_levels()
     while True:
-        level = input(f"Choose {bot_name} level [easy|medium|expert] (default={default}): ").strip() or default
+        level = input(f"Choose {bot_name} level [{'|'.join(allowed_levels)}] (default={default}): ").strip() or default
         if level in allowed_levels:
             return level
-        print("Please enter one of: easy, medium, expert.")
+        print(f"Please enter one of: {', '.join(allowed_levels)}.")
 
 def main():
     print(BANNER)
@@ -155,54 +156,44 @@ def main():
         g = manager.create(bot_names=bot_names, bot_suits=bot_suits, bot_levels=bot_levels)
         print(f"\nGame {game_index} created: {g.id}")
 
-        while True:
-            s = g.status()
-            if not s["active"]:
-                print(f"\nGame {game_index} over!")
-                summary = g.summary()
-
-                with open(csv_path, "a", newline="", encoding="utf-8") as csvfile:
-                    writer = csv.writer(csvfile)
-                    # Write header only if file is new
-                    if not file_exists:
-                        writer.writerow(["Game Number", "Bot 1 Level", "Bot 2 Level", "Round", "Diamond", "Bot 1 Play", "Bot 2 Play", "Winner", "Points Awarded"])
-                        file_exists = True
-                    for r in summary["rounds"]:
-                        writer.writerow([
-                            game_index,
-                            summary["bot_levels"][0],
-                            summary["bot_levels"][1],
-                            r["round"],
-                            r["diamond"],
-                            r["bot_play"],
-                            r["bot_play"][1],
-                            r["winner"],
-                            r["points_awarded"],
-                        ])
-                    # Write final scores for each game
-                    writer.writerow([])
-                    writer.writerow(["Game Number", game_index, "Final Scores"])
-                    for k, v in summary["final_scores"].items():
-                        writer.writerow([k, v])
-                    writer.writerow(["Winner", summary["winner"]])
-                    writer.writerow([])
-
-                print("Summary appended to diamond_game_summary.csv")
-                break
-
-            current_diamond = g.deck[g.round_no]
-            print(f"Diamond for this round: {current_diamond}")
-            try:
-                res = g.play_round()
-            except Exception as e:
-                print("Error:", e)
-                continue
-
-            print(f"Diamond: {res.diamond} | Bot 1: {res.bot_play[0]} | Bot 2: {res.bot_play[1]}")
-            print(f"Winner: {res.winner} (+{res.points})")
-            st = g.status()
-            score_str = " | ".join([f"Bot {i+1}: {st['scores'][f'bot{i+1}']}" for i in range(2)])
-            print(f"Scores -> {score_str}")
+        # One event per round; status() is not needed while the game runs.
+        for ev in g.events():
+            plays = " | ".join(f"Bot {i+1}: {v} {bot_suits[i]}" for i, v in enumerate(ev.plays))
+            print(f"Diamond: {ev.diamond} ♦ | {plays}")
+            winner = ", ".join(f"bot{i+1}" for i in ev.winners)
+            print(f"Winner: {winner} (+{ev.diamond})")
+            print("Scores -> " + " | ".join(f"Bot {i+1}: {v}" for i, v in enumerate(ev.scores)))
+
+        print(f"\nGame {game_index} over!")
+        summary = g.summary()
+
+        with open(csv_path, "a", newline="", encoding="utf-8") as csvfile:
+            writer = csv.writer(csvfile)
+            # Write header only if file is new
+            if not file_exists:
+                writer.writerow(["Game Number", "Bot 1 Level", "Bot 2 Level", "Round", "Diamond", "Bot 1 Play", "Bot 2 Play", "Winner", "Points Awarded"])
+                file_exists = True
+            for r in summary["rounds"]:
+                writer.writerow([
+                    game_index,
+                    summary["bot_levels"][0],
+                    summary["bot_levels"][1],
+                    r["round"],
+                    r["diamond"],
+                    r["bot_play"],
+                    r["bot_play"][1],
+                    r["winner"],
+                    r["points_awarded"],
+                ])
+            # Write final scores for each game
+            writer.writerow([])
+            writer.writerow(["Game Number", game_index, "Final Scores"])
+            for k, v in summary["final_scores"].items():
+                writer.writerow([k, v])
+            writer.writerow(["Winner", summary["winner"]])
+            writer.writerow([])
+
+        print("Summary appended to diamond_game_summary.csv")
 
     print(f"\nTotal games played: {num_games}")
 
@@ -0,0 +1,239 @@
+"""
+Incremental result aggregates behind the Streamlit dashboard.
+
+A feed remembers how far it has read a results source (a replay archive or a
+SQLite results database) and each `poll()` adds only the games appended since
+then to running totals. The totals are a win matrix by level pair, final-score
+histograms per level, and round results per level and diamond value. If the
+source has not changed, a poll costs one file-size or max-id check, so the
+dashboard can poll on every rerun however large the source has grown. Tables
+are paged by game index (archive) or row id (database), so a page is read
+directly and never by scanning from the start.
+
+    feed = open_feed("games.dga")
+    feed.poll()                       # new games since the last poll
+    levels, rates, games = feed.totals.win_matrix()
+"""
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .archive import MAGIC, SCORE_SCALE, Archive
+from .cards import VALUES
+
+HALF = SCORE_SCALE // 2  # score histograms count half points
+SCORE_BINS = 2 * sum(range(1, VALUES + 1)) + 1  # 0 to 91 points in halves
+
+
+class Totals:
+    """Running counts over every game added so far. Levels are indexed in order of first appearance."""
+
+    def __init__(self):
+        self.levels: List[str] = []
+        self._index: Dict[str, int] = {}
+        self.games = 0
+        # [a, b]: seat-pairs where level a met level b, and how a fared
+        self.pair_games = np.zeros((0, 0), dtype=np.int64)
+        self.pair_wins = np.zeros((0, 0), dtype=np.int64)
+        self.pair_ties = np.zeros((0, 0), dtype=np.int64)
+        self.score_hist = np.zeros((0, SCORE_BINS), dtype=np.int64)  # [level, half points]
+        # [level, diamond - 1]: rounds played, won outright, split
+        self.rounds = np.zeros((0, VALUES), dtype=np.int64)
+        self.round_wins = np.zeros((0, VALUES), dtype=np.int64)
+        self.round_ties = np.zeros((0, VALUES), dtype=np.int64)
+
+    def _level_ids(self, names: Sequence[str]) -> np.ndarray:
+        for name in names:
+            if name not in self._index:
+                self._index[name] = len(self.levels)
+                self.levels.append(name)
+        n = len(self.levels)
+        if n > len(self.pair_games):
+            grow = n - len(self.pair_games)
+            for attr in ("pair_games", "pair_wins", "pair_ties"):
+                setattr(self, attr, np.pad(getattr(self, attr), ((0, grow), (0, grow))))
+            for attr in ("score_hist", "rounds", "round_wins", "round_ties"):
+                setattr(self, attr, np.pad(getattr(self, attr), ((0, grow), (0, 0))))
+        return np.array([self._index[name] for name in names], dtype=np.int64)
+
+    def add(self, names: Sequence[str], seat_levels: np.ndarray, diamonds: np.ndarray, plays: np.ndarray,
+            scores: np.ndarray):
+        """
+        Add a block of games. `seat_levels` (games, bots) indexes into `names`;
+        `diamonds` (games, 13) is the diamond order, 0 past the last round;
+        `plays` is (games, bots, 13) and `scores` (games, bots) in twelfths of a point.
+        """
+        if not len(seat_levels):
+            return
+        lv = self._level_ids(names)[seat_levels]
+        n = len(self.levels)
+        bots = lv.shape[1]
+        scores = scores.astype(np.int64)
+        for i in range(bots):
+            for j in range(bots):
+                if i != j:
+                    cell = lv[:, i] * n + lv[:, j]
+                    d = scores[:, i] - scores[:, j]
+                    self.pair_games += np.bincount(cell, minlength=n * n).reshape(n, n)
+                    self.pair_wins += np.bincount(cell[d > 0], minlength=n * n).reshape(n, n)
+                    self.pair_ties += np.bincount(cell[d == 0], minlength=n * n).reshape(n, n)
+        halves = np.clip((scores + HALF // 2) // HALF, 0, SCORE_BINS - 1)
+        self.score_hist += np.bincount((lv * SCORE_BINS + halves).ravel(), minlength=n * SCORE_BINS).reshape(n, -1)
+
+        played = diamonds > 0
+        top = plays == plays.max(axis=1, keepdims=True)
+        shared = top.sum(axis=1) > 1
+        for i in range(bots):
+            cell = (lv[:, i:i + 1] * VALUES + diamonds.astype(np.int64) - 1)
+            for table, mask in ((self.rounds, played), (self.round_wins, played & top[:, i] & ~shared),
+                                (self.round_ties, played & top[:, i] & shared)):
+                table += np.bincount(cell[mask], minlength=n * VALUES).reshape(n, VALUES)
+        self.games += len(seat_levels)
+
+    def win_matrix(self) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """(levels, rate, games): rate[a, b] is level a's score against level b, counting a tie as half; NaN where they never met."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rate = (self.pair_wins + 0.5 * self.pair_ties) / self.pair_games
+        return list(self.levels), rate, self.pair_games.copy()
+
+    def mean_scores(self) -> np.ndarray:
+        """Mean final score per level (NaN for a level with no games)."""
+        points = np.arange(SCORE_BINS) / 2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.score_hist @ points / self.score_hist.sum(axis=1)
+
+    def diamond_rates(self) -> np.ndarray:
+        """[level, diamond - 1]: share of rounds won, counting a split as half."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (self.round_wins + 0.5 * self.round_ties) / self.rounds
+
+
+class ArchiveFeed:
+    """Reads a replay archive (`archive.py`) incrementally."""
+
+    def __init__(self, path: str, chunk: int = 1 << 20):
+        self.path = path
+        self.chunk = chunk
+        self.archive = Archive(path)
+        self.totals = Totals()
+        self.position = 0  # games already added
+        self._size = os.path.getsize(path)
+        self._lock = threading.Lock()  # one feed may be shared by several dashboard sessions
+
+    def __len__(self) -> int:
+        return len(self.archive)
+
+    def poll(self) -> int:
+        """Add games appended since the last poll; returns how many."""
+        with self._lock:
+            size = os.path.getsize(self.path)
+            if size != self._size:
+                self._size = size
+                self.archive.refresh()
+            a = self.archive
+            start = self.position
+            for lo in range(start, len(a), self.chunk):
+                block = a.games[lo:lo + self.chunk]
+                self.totals.add(a.levels, block["levels"], block["diamonds"], block["plays"], block["scores"])
+                self.position = lo + len(block)
+            return self.position - start
+
+    def page(self, start: int, size: int) -> Dict[str, list]:
+        """Columns of games [start, start + size), read straight from the mapping."""
+        a = self.archive
+        block = a.games[start:start + size]
+        levels = np.array(a.levels, dtype=object)[block["levels"]] if len(block) else np.empty((0, a.bots), object)
+        scores = block["scores"] / SCORE_SCALE
+        cols = {"game": list(range(start, start + len(block))),
+                "id": [a.game_id(i) for i in range(start, start + len(block))]}
+        for s in range(a.bots):
+            cols[f"bot{s + 1}_level"] = levels[:, s].tolist()
+            cols[f"bot{s + 1}_score"] = scores[:, s].tolist()
+        cols["winner"] = _winners(scores)
+        return cols
+
+
+class ResultsFeed:
+    """Reads a SQLite results database (`results.py`) incrementally, by row id."""
+
+    def __init__(self, path: str, chunk: int = 50_000):
+        self.path = path
+        self.chunk = chunk
+        self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self.totals = Totals()
+        self.last_id = 0  # highest games.id already added
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM games").fetchone()[0]
+
+    def poll(self) -> int:
+        """Add games inserted since the last poll; returns how many."""
+        added = 0
+        with self._lock:
+            while True:
+                games = self.conn.execute(
+                    "SELECT id, bot1_level, bot2_level, bot1_score, bot2_score FROM games "
+                    "WHERE id > ? ORDER BY id LIMIT ?", (self.last_id, self.chunk),
+                ).fetchall()
+                if not games:
+                    return added
+                ids, l1, l2, s1, s2 = zip(*games)
+                first = ids[0]
+                # ids are assigned as MAX(id) + 1, so a block is one id range
+                rows = np.array(self.conn.execute(
+                    "SELECT game_id, round_no, diamond, bot1_play, bot2_play FROM rounds "
+                    "WHERE game_id BETWEEN ? AND ?", (first, ids[-1]),
+                ).fetchall(), dtype=np.int64).reshape(-1, 5)
+                slot = np.full(ids[-1] - first + 1, -1, dtype=np.int64)
+                slot[np.array(ids) - first] = np.arange(len(ids))
+                g = slot[rows[:, 0] - first]
+                keep = g >= 0
+                g, r = g[keep], rows[keep, 1] - 1
+                diamonds = np.zeros((len(ids), VALUES), dtype=np.int64)
+                plays = np.zeros((len(ids), 2, VALUES), dtype=np.int64)
+                diamonds[g, r] = rows[keep, 2]
+                plays[g, 0, r] = rows[keep, 3]
+                plays[g, 1, r] = rows[keep, 4]
+                names = sorted(set(l1) | set(l2))
+                index = {name: i for i, name in enumerate(names)}
+                seat_levels = np.array([[index[a], index[b]] for a, b in zip(l1, l2)], dtype=np.int64)
+                scores = np.rint(np.array([s1, s2]).T * SCORE_SCALE)
+                self.totals.add(names, seat_levels, diamonds, plays, scores)
+                self.last_id = ids[-1]
+                added += len(ids)
+
+    def page(self, start: int, size: int) -> Dict[str, list]:
+        """Columns of games [start, start + size), by id range (id = index + 1) rather than OFFSET."""
+        rows = self.conn.execute(
+            "SELECT id, game_uid, bot1_level, bot1_score, bot2_level, bot2_score FROM games "
+            "WHERE id > ? AND id <= ? ORDER BY id", (start, start + size),
+        ).fetchall()
+        ids, uids, l1, s1, l2, s2 = (list(c) for c in zip(*rows)) if rows else ([],) * 6
+        scores = np.array([s1, s2], dtype=float).T.reshape(-1, 2)
+        return {"game": [i - 1 for i in ids], "id": uids, "bot1_level": l1, "bot1_score": s1, "bot2_level": l2,
+                "bot2_score": s2, "winner": _winners(scores)}
+
+
+def _winners(scores: np.ndarray) -> List[str]:
+    if not len(scores):
+        return []
+    shared = (scores == scores.max(axis=1, keepdims=True)).sum(axis=1) > 1
+    return ["tie" if t else f"bot{s + 1}" for s, t in zip(scores.argmax(axis=1).tolist(), shared.tolist())]
+
+
+def open_feed(path: str):
+    """An `ArchiveFeed` or `ResultsFeed` for `path`, chosen by the file's magic bytes."""
+    with open(path, "rb") as f:
+        head = f.read(16)
+    if head.startswith(MAGIC):
+        return ArchiveFeed(path)
+    if head.startswith(b"SQLite format 3"):
+        return ResultsFeed(path)
+    raise ValueError(
+        f"{path} is neither a replay archive nor a results database; "
+        "convert a CSV with `python -m diamond_game.archive convert`"
+    )
@@ -0,0 +1,227 @@
+"""
+Exact solver for the last few rounds of a two-bot game.
+
+Once only a handful of cards remain, the rest of the game is a small
+simultaneous-move zero-sum game: each round both bots pick a card without
+seeing the other's choice, then the next diamond is revealed uniformly from the
+ones left. The solver computes the equilibrium (mixed) strategy of that
+subgame, maximising the chance of winning the game given the current score gap
+(payoff +1 win, 0 tie, -1 loss).
+
+States are keyed on compact integer encodings and kept in an LRU transposition
+table, which can be saved to and loaded from disk. The table is guarded by a
+lock, so one solver can be shared by games played on several threads.
+"""
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+# Hands larger than this are left to the heuristic strategies.
+MAX_CARDS = 4
+
+_EPS = 1e-12
+
+
+def _bits(mask: int) -> List[int]:
+    out = []
+    while mask:
+        low = mask & -mask
+        out.append(low.bit_length() - 1)
+        mask ^= low
+    return out
+
+
+def _compress(mine: int, opp: int) -> Tuple[int, int]:
+    """
+    Replace card values by their rank among both hands.
+
+    Cards are only ever compared with each other, so e.g. {3, 9} vs {5} plays
+    exactly like {1, 3} vs {2}. Equal values keep equal ranks (ties split).
+    """
+    rank = 1
+    a = b = 0
+    both = mine | opp
+    while both:
+        low = both & -both
+        if mine & low:
+            a |= 1 << rank
+        if opp & low:
+            b |= 1 << rank
+        rank += 1
+        both ^= low
+    return a, b
+
+
+def solve_matrix_game(payoff: Sequence[Sequence[float]]) -> Tuple[float, List[float]]:
+    """
+    Value and optimal mixed strategy of the row (maximising) player.
+
+    Uses a pure saddle point when there is one, otherwise the simplex method on
+    the column player's LP (with Bland's rule, so it terminates).
+    """
+    m, n = len(payoff), len(payoff[0])
+    row_min = [min(r) for r in payoff]
+    maximin = max(row_min)
+    minimax = min(max(payoff[i][j] for i in range(m)) for j in range(n))
+    if maximin >= minimax - _EPS:
+        best = row_min.index(maximin)
+        return maximin, [1.0 if i == best else 0.0 for i in range(m)]
+
+    # Make every entry positive, then: maximise sum(q) s.t. A q <= 1, q >= 0.
+    shift = 1.0 - min(min(r) for r in payoff)
+    width = n + m + 1
+    tableau = []
+    for i in range(m):
+        row = [payoff[i][j] + shift for j in range(n)] + [0.0] * m + [1.0]
+        row[n + i] = 1.0
+        tableau.append(row)
+    objective = [-1.0] * n + [0.0] * m + [0.0]
+    basis = [n + i for i in range(m)]
+
+    while True:
+        col = next((j for j in range(width - 1) if objective[j] < -_EPS), None)
+        if col is None:
+            break
+        pivot, best_ratio = None, None
+        for i in range(m):
+            a = tableau[i][col]
+            if a > _EPS:
+                ratio = tableau[i][-1] / a
+                if (
+                    best_ratio is None
+                    or ratio < best_ratio - _EPS
+                    or (abs(ratio - best_ratio) <= _EPS and basis[i] < basis[pivot])
+                ):
+                    pivot, best_ratio = i, ratio
+        prow = tableau[pivot]
+        a = prow[col]
+        for k in range(width):
+            prow[k] /= a
+        for i in range(m):
+            if i != pivot:
+                f = tableau[i][col]
+                if f:
+                    row = tableau[i]
+                    for k in range(width):
+                        row[k] -= f * prow[k]
+        f = objective[col]
+        for k in range(width):
+            objective[k] -= f * prow[k]
+        basis[pivot] = col
+
+    total = objective[-1]
+    # Row player's strategy is the dual solution, read off the slack columns.
+    strategy = [max(objective[n + i], 0.0) / total for i in range(m)]
+    norm = sum(strategy)
+    return 1.0 / total - shift, [p / norm for p in strategy]
+
+
+class EndgameSolver:
+    """
+    Memoised endgame values with an LRU transposition table.
+
+    `value(diamonds, mine, opp, diff2)` is the expected payoff for "me" before
+    the next diamond is revealed, where `diamonds`, `mine` and `opp` are
+    bitmasks (bit v = value v) and `diff2` is twice my score minus the
+    opponent's (scores move in half points on ties).
+    """
+
+    def __init__(self, max_entries: int = 500_000, cache_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.cache_path = cache_path
+        self._table: "OrderedDict[int, float]" = OrderedDict()
+        self._lock = threading.Lock()  # LRU reordering and eviction are not atomic
+        self.hits = 0
+        self.misses = 0
+        if cache_path and os.path.exists(cache_path):
+            self.load(cache_path)
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    # --- Persistence ---
+    def load(self, path: str):
+        with open(path, "rb") as f:
+            entries = pickle.load(f)
+        for key, value in entries:
+            self._store(key, value)
+
+    def save(self, path: Optional[str] = None):
+        path = path or self.cache_path
+        if not path:
+            raise ValueError("No cache path configured")
+        tmp = f"{path}.tmp"
+        with self._lock:
+            entries = list(self._table.items())
+        with open(tmp, "wb") as f:
+            pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    # --- Table ---
+    def _store(self, key: int, value: float):
+        table = self._table
+        with self._lock:
+            table[key] = value
+            table.move_to_end(key)
+            if len(table) > self.max_entries:
+                table.popitem(last=False)
+
+    @staticmethod
+    def _key(diamonds: int, mine: int, opp: int, diff2: int):
+        if -512 <= diff2 < 512:  # always, with 13 values
+            return (((diamonds << 14 | mine) << 14 | opp) << 10) | (diff2 + 512)
+        return diamonds, mine, opp, diff2  # larger decks: gaps beyond the packed field
+
+    # --- Solving ---
+    def value(self, diamonds: int, mine: int, opp: int, diff2: int) -> float:
+        if not diamonds:
+            return (diff2 > 0) - (diff2 < 0)
+        # The gap can no longer be closed: the result is already decided.
+        if abs(diff2) > 2 * sum(_bits(diamonds)):
+            return 1.0 if diff2 > 0 else -1.0
+        mine, opp = _compress(mine, opp)
+        if mine > opp:
+            # Zero-sum symmetry: store each position once.
+            return -self.value(diamonds, opp, mine, -diff2)
+
+        key = self._key(diamonds, mine, opp, diff2)
+        table = self._table
+        with self._lock:
+            cached = table.get(key)
+            if cached is not None:
+                table.move_to_end(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+
+        total = 0.0
+        ds = _bits(diamonds)
+        for d in ds:
+            v, _ = solve_matrix_game(self.payoff_matrix(d, diamonds ^ (1 << d), mine, opp, diff2))
+            total += v
+        result = total / len(ds)
+        self._store(key, result)
+        return result
+
+    def payoff_matrix(self, diamond: int, future: int, mine: int, opp: int, diff2: int) -> List[List[float]]:
+        """Payoffs for each (my card, opponent card) pair once `diamond` is on the table."""
+        rows = []
+        for a in _bits(mine):
+            row = []
+            for b in _bits(opp):
+                gap = diff2 + (2 * diamond if a > b else -2 * diamond if a < b else 0)
+                row.append(self.value(future, mine ^ (1 << a), opp ^ (1 << b), gap))
+            rows.append(row)
+        return rows
+
+    def strategy(self, diamond: int, future: int, mine: int, opp: int, diff2: int) -> Tuple[List[int], List[float]]:
+        """My cards and the equilibrium probability of playing each."""
+        _, probs = solve_matrix_game(self.payoff_matrix(diamond, future, mine, opp, diff2))
+        return _bits(mine), probs
+
+
+# Shared by every "perfect" bot; replace with EndgameSolver(cache_path=...) to persist.
+solver = EndgameSolver()
@@ -0,0 +1,111 @@
+"""
+Compact per-round events and a streaming JSONL (NDJSON) format for them.
+
+`Game.events()` plays the remaining rounds and yields one `RoundEvent` per
+round, holding only ints and floats. `EventWriter` appends events to a file as
+one JSON array per line and writes in batches; `read_events` streams them back
+one line at a time, so neither side holds a whole tournament in memory.
+
+    with EventWriter("games.jsonl") as out:
+        for event in game.events():
+            out.write(event)
+    for event in read_events("games.jsonl"):
+        ...
+
+Each line is `[game_id, round_no, diamond, plays, winners, scores]`, where
+`plays` and `scores` are per seat (scores after the round) and `winners` are the
+seats that split the diamond.
+"""
+import functools
+import json
+from dataclasses import dataclass
+from typing import IO, Iterable, Iterator, List, Tuple, Union
+
+# Consecutive events share a game id, so its JSON string is worth caching.
+_quote = functools.lru_cache(maxsize=1024)(json.dumps)
+
+
+@dataclass
+class RoundEvent:
+    game_id: str
+    round_no: int
+    diamond: int
+    plays: Tuple[int, ...]
+    winners: Tuple[int, ...]
+    scores: Tuple[float, ...]
+
+    def to_json(self) -> str:
+        # Hand-formatted: several times faster than json.dumps on the list, and
+        # ints and finite floats already print as valid JSON.
+        return (
+            f"[{_quote(self.game_id)},{self.round_no},{self.diamond},"
+            f"[{','.join(map(str, self.plays))}],[{','.join(map(str, self.winners))}],"
+            f"[{','.join(map(repr, self.scores))}]]"
+        )
+
+    @classmethod
+    def from_json(cls, line: str) -> "RoundEvent":
+        game_id, round_no, diamond, plays, winners, scores = json.loads(line)
+        return cls(game_id, round_no, diamond, tuple(plays), tuple(winners), tuple(scores))
+
+
+def round_events(game_id: str, rounds: Iterable[Tuple[int, ...]]) -> Iterator[RoundEvent]:
+    """Events for a game given as (diamond, *plays) tuples, with scores recomputed."""
+    scores: List[float] = []
+    for i, (diamond, *plays) in enumerate(rounds):
+        if not scores:
+            scores = [0.0] * len(plays)
+        best = max(plays)
+        winners = tuple(seat for seat, v in enumerate(plays) if v == best)
+        for seat in winners:
+            scores[seat] += diamond / len(winners)
+        yield RoundEvent(game_id, i + 1, diamond, tuple(plays), winners, tuple(scores))
+
+
+class EventWriter:
+    """Appends events to a JSONL file, writing every `batch_size` events."""
+
+    def __init__(self, target: Union[str, IO[str]], batch_size: int = 1000):
+        self._own = isinstance(target, str)
+        self._file = open(target, "a", encoding="utf-8") if self._own else target
+        self.batch_size = batch_size
+        self._buffer: List[str] = []
+        self.written = 0
+
+    def write(self, event: RoundEvent):
+        self._buffer.append(event.to_json())
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, events: Iterable[RoundEvent]):
+        for event in events:
+            self.write(event)
+
+    def flush(self):
+        if self._buffer:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self.written += len(self._buffer)
+            self._buffer.clear()
+        self._file.flush()
+
+    def close(self):
+        self.flush()
+        if self._own:
+            self._file.close()
+
+    def __enter__(self) -> "EventWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_events(source: Union[str, IO[str]]) -> Iterator[RoundEvent]:
+    """Stream events back from a JSONL file, skipping blank lines."""
+    if isinstance(source, str):
+        with open(source, encoding="utf-8") as f:
+            yield from read_events(f)
+        return
+    for line in source:
+        if line.strip():
+            yield RoundEvent.from_json(line)
@@ -1,21 +1,48 @@
 from dataclasses import dataclass, field, asdict
-from typing import List, Dict, Optional, Literal
+from typing import Callable, Iterator, List, Dict, Optional, Tuple, Union
+import random
 import uuid
+from operator import getitem
+from time import perf_counter
 
-from .cards import Card, diamond_deck
+from .cards import VALUES, Card, diamond_deck, suit_labels
+from .events import RoundEvent
 from .players import Player, Bot
-from .strategies import choose_card, LEVELS
+from .public import PublicInfo
+from .strategies import check_levels, choose_card, LEVELS, LEVEL_PARAMS
+from . import instrument
 
-Winner = Literal["human", "bot", "tie"]
+# Strategies that draw from the game's RNG; forks only copy it when one is present.
+_RANDOMIZED = {"random", "perfect", "mcts", "cfr"}
 
-@dataclass
+class _BotKeys(dict):
+    """"bot1", "bot2", ... by seat index, formatted once."""
+    def __missing__(self, i: int) -> str:
+        self[i] = key = f"bot{i+1}"
+        return key
+
+_BOT_KEYS = _BotKeys()
+
+@dataclass(slots=True)
 class RoundResult:
     round_no: int
-    diamond: Card
-    human_play: Card
-    bot_play: Card
-    winner: Winner
+    diamond: Card  # a shared flyweight, see cards.card
+    plays: Tuple[int, ...]  # card values in seat order
+    winners: Tuple[int, ...]  # seats that split the diamond
     points: int
+    labels: Tuple[Tuple[str, ...], ...] = field(default=(), repr=False)  # per-seat card labels, shared
+    forced: int = 0  # bit i set: seat i's play was given as an override
+
+    # Display forms, built only when asked for.
+    @property
+    def bot_play(self) -> List[str]:
+        return list(map(getitem, self.labels, self.plays))
+
+    @property
+    def winner(self) -> Union[str, List[str]]:
+        if len(self.winners) == 1:
+            return _BOT_KEYS[self.winners[0]]
+        return [_BOT_KEYS[i] for i in self.winners]
 
 @dataclass
 class Game:
@@ -25,17 +52,24 @@ class Game:
     bot_suits: List[str] = field(default_factory=lambda: ["♠", "♣"])
     bot_levels: List[str] = field(default_factory=lambda: ["medium", "hard"])
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    deal_id: Optional[str] = None  # deal the deck from another game's stream, e.g. a seat-swapped rematch
+    deck_size: int = VALUES  # values per suit and rounds per game; a supplied deck sets it
 
     # runtime state
     deck: List[Card] = field(default_factory=list)
     round_no: int = 0
     humans: List[Player] = field(init=False)
     bots: List[Bot] = field(init=False)
-    remaining_diamonds: List[int] = field(default_factory=list)  # values only
     history: List[RoundResult] = field(default_factory=list)
     active: bool = True
+    public: PublicInfo = field(init=False, repr=False, compare=False)  # what every seat sees, passed to strategies
+    rng: random.Random = field(init=False, repr=False, compare=False)
+    on_round: Optional[Callable[["Game"], None]] = field(default=None, init=False, repr=False, compare=False)  # e.g. GameManager's round count
 
     def __post_init__(self):
+        # All randomness (the deal, then random bot choices in seat order) comes
+        # from one stream seeded by the id, so a game can be replayed from its id.
+        self.rng = random.Random(self.id)
         self.humans = []
         for name, suit in zip(self.human_names, self.human_suits):
             p = Player(name, suit)
@@ -43,14 +77,31 @@ class Game:
             self.humans.append(p)
         self.bots = []
         for name, suit, level in zip(self.bot_names, self.bot_suits, self.bot_levels):
-            b = Bot(name, suit, difficulty=LEVELS.get(level, "matching"))
-            b.initialize_hand()
+            b = Bot(
+                name, suit, difficulty=LEVELS.get(level, "matching"), rng=self.rng, params=LEVEL_PARAMS.get(level)
+            )
+            b.initialize_hand(self.deck_size)
             self.bots.append(b)
-        self.deck = diamond_deck()
-        self.remaining_diamonds = [c.value for c in self.deck]
+        if not self.deck:  # a deck may be supplied, e.g. when restoring a snapshot
+            if self.deal_id is None or self.deal_id == self.id:
+                self.deck = diamond_deck(self.rng, self.deck_size)
+            else:
+                self.deck = diamond_deck(random.Random(self.deal_id), self.deck_size)
+        elif len(self.deck) != self.deck_size:
+            self.deck_size = len(self.deck)
+            for b in self.bots:
+                b.initialize_hand(self.deck_size)
+        check_levels(self.bot_levels[:len(self.bots)], self.deck_size)  # fail now, not at the first cfr decision
+        self.public = PublicInfo.start(len(self.bots), [c.value for c in self.deck], self.deck_size)
+        self._labels = tuple(suit_labels(b.suit, self.deck_size) for b in self.bots)
+
+    @property
+    def remaining_diamonds(self) -> List[int]:
+        """Values of the diamonds still to be drawn, in deck order."""
+        return [c.value for c in self.deck[self.round_no:]]
 
     def is_over(self) -> bool:
-        return (self.round_no >= 13) or (not self.active)
+        return (self.round_no >= self.deck_size) or (not self.active)
 
     def status(self) -> Dict:
         return {
@@ -63,54 +114,132 @@ class Game:
             "bot_levels": self.bot_levels,
         }
 
-    def _resolve_points(self, bot_cards: List[Card], diamond: Card) -> RoundResult:
+    def _resolve_points(self, values: List[int], diamond: Card, forced: int = 0) -> RoundResult:
         # Find highest card value
-        values = [c.value for c in bot_cards]
         max_value = max(values)
-        winners = [f"bot{i+1}" for i, c in enumerate(bot_cards) if c.value == max_value]
+        winners = tuple([i for i, v in enumerate(values) if v == max_value])
         pts = diamond.value
         pts_per_winner = pts / len(winners)
-        for i, b in enumerate(self.bots):
-            if f"bot{i+1}" in winners:
-                b.score += pts_per_winner
-        winner = winners if len(winners) > 1 else winners[0]
-        return RoundResult(
-            round_no=self.round_no,
-            diamond=diamond,
-            human_play=None,
-            bot_play=[str(c) for c in bot_cards],
-            winner=winner,
-            points=pts,
-        )
-
-    def play_round(self) -> RoundResult:
-        if self.is_over():
-            raise RuntimeError("Game is already over or inactive.")
+        bots = self.bots
+        for i in winners:
+            bots[i].score += pts_per_winner
+        self.public.resolve(values, winners, pts_per_winner)
+        if len(winners) > 1 and instrument.sink is not None:
+            instrument.sink.count("ties")
+        return RoundResult(self.round_no, diamond, tuple(values), winners, pts, self._labels, forced)
 
-        # Draw top diamond
+    def _draw(self) -> Card:
+        """Turn over the next diamond."""
         diamond = self.deck[self.round_no]
         self.round_no += 1
-        if diamond.value in self.remaining_diamonds:
-            self.remaining_diamonds.remove(diamond.value)
+        self.public.draw(diamond.value)
+        return diamond
 
-        # Each bot decides
-        bot_cards = []
+    def play_round(self, overrides: Optional[Dict[int, int]] = None) -> RoundResult:
+        """
+        Play the next round. `overrides` maps seat index to a card value that
+        bot must play instead of consulting its strategy.
+        """
+        if self.is_over():
+            raise RuntimeError("Game is already over or inactive.")
+        if overrides:
+            for i, v in overrides.items():
+                if not 0 <= i < len(self.bots):
+                    raise ValueError(f"No bot in seat {i}")
+                if not self.bots[i].has_card(v):
+                    raise ValueError(f"{self.bots[i].name} does not have card value {v} {self.bots[i].suit}")
+        sink = instrument.sink
+        if sink is not None:
+            t0 = perf_counter()
+
+        diamond = self._draw()
+
+        # Each bot decides before anyone plays, so all see the same public view
+        choices = []
+        public = self.public
         for i, bot in enumerate(self.bots):
-            known_remaining = bot.remaining_values()
-            bot_choice_value = choose_card(
-                bot, diamond.value, self.remaining_diamonds, known_remaining
-            )
-            bot_card = bot.play(bot_choice_value)
-            bot_cards.append(bot_card)
+            if overrides and i in overrides:
+                choices.append(overrides[i])
+                continue
+            choices.append(choose_card(bot, diamond.value, public, i))
+        if sink is not None:
+            t1 = perf_counter()
+            sink.phase("decide", t1 - t0)
+        for bot, v in zip(self.bots, choices):
+            bot.play(v)
+        if sink is not None:
+            t2 = perf_counter()
+            sink.phase("play", t2 - t1)
 
         # Resolve
-        result = self._resolve_points(bot_cards, diamond)
+        result = self._resolve_points(choices, diamond, sum(1 << i for i in overrides) if overrides else 0)
         self.history.append(result)
+        if self.on_round is not None:
+            self.on_round(self)
 
         if self.is_over():
             self.active = False
+        if sink is not None:
+            sink.phase("resolve", perf_counter() - t2)
+            sink.count("rounds")
+            if not self.active:
+                sink.count("games")
         return result
 
+    def fork(self, round_no: Optional[int] = None) -> "Game":
+        """
+        Branch the game as it stands now, or as it stood after `round_no` rounds.
+
+        The fork shares the deck, human players and past round results with this
+        game and gets its own bots (hands, scores, memory) and, only if a bot
+        uses it, a copy of the RNG, so playing either game leaves the other
+        untouched. Forking an
+        earlier round restores hands and scores from the history; the RNG still
+        continues from its current state.
+        """
+        if round_no is None:
+            round_no = self.round_no
+        elif not 0 <= round_no <= self.round_no:
+            raise ValueError(f"round_no must be between 0 and {self.round_no}")
+        g = object.__new__(Game)
+        g.__dict__ = self.__dict__.copy()
+        g.on_round = None  # a fork is not tracked by whatever tracks this game
+        # Human players are never modified by Game, so the fork shares them.
+        g.bots = [b.fork() for b in self.bots]
+        if not _RANDOMIZED.isdisjoint([b.difficulty for b in self.bots]):
+            g.rng = random.Random()
+            g.rng.setstate(self.rng.getstate())
+            for b in g.bots:
+                if b.rng is self.rng:
+                    b.rng = g.rng
+        if round_no == self.round_no:
+            g.history = self.history[:]
+            g.public = self.public.copy()
+            return g
+
+        g.round_no = round_no
+        g.active = True
+        g.history = self.history[:round_no]
+        for b in g.bots:
+            b.score = 0
+        for r in self.history[round_no:]:
+            for b, v in zip(g.bots, r.plays):
+                b.hand.mask |= 1 << v
+        # Re-add points in the original order so the float sums match exactly.
+        for r in g.history:
+            for i in r.winners:
+                g.bots[i].score += r.points / len(r.winners)
+        g.public = PublicInfo.of(g.bots, g.remaining_diamonds, round_no, self.deck_size)
+        return g
+
+    def events(self) -> Iterator[RoundEvent]:
+        """Play the remaining rounds, yielding one compact event per round."""
+        while not self.is_over():
+            r = self.play_round()
+            yield RoundEvent(
+                self.id, r.round_no, r.diamond.value, r.plays, r.winners, tuple([b.score for b in self.bots])
+            )
+
     def abandon(self):
         self.active = False
 
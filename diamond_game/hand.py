@@ -0,0 +1,132 @@
+from typing import Iterable, Iterator, List, Optional
+
+from .cards import VALUES, Card, card
+
+def nth_bit(mask: int, k: int) -> int:
+    """Position of the k-th lowest set bit of `mask` (0-based)."""
+    if k < 8:  # clearing a few low bits beats the search
+        for _ in range(k):
+            mask &= mask - 1
+        if not mask:
+            raise IndexError("hand index out of range")
+        return (mask & -mask).bit_length() - 1
+    if k >= mask.bit_count():
+        raise IndexError("hand index out of range")
+    # Smallest v with more than k set bits at or below v.
+    lo, hi = 0, mask.bit_length() - 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if (mask & ((2 << mid) - 1)).bit_count() > k:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+class BitHand:
+    """
+    A hand of single-suit cards stored as an integer bitmask (bit v set = value v held).
+
+    Membership, removal, min/max and "smallest card >= v" are single bit
+    operations (constant time for 13 values, one pass over machine words for
+    decks of thousands), and `nth` is a binary search over prefix popcounts.
+    Iterating yields `Card`s in ascending order, so the hand can still be used
+    wherever a list of cards was expected.
+    """
+    __slots__ = ("suit", "mask")
+
+    def __init__(self, suit: str = "", mask: int = 0):
+        self.suit = suit
+        self.mask = mask
+
+    @classmethod
+    def full(cls, suit: str, size: int = VALUES) -> "BitHand":
+        """All values 1..size."""
+        return cls(suit, ((1 << size) - 1) << 1)
+
+    @classmethod
+    def from_cards(cls, suit: str, cards: Iterable[Card]) -> "BitHand":
+        mask = 0
+        for c in cards:
+            mask |= 1 << c.value
+        return cls(suit, mask)
+
+    def copy(self) -> "BitHand":
+        return BitHand(self.suit, self.mask)
+
+    # --- Queries ---
+    def has(self, value: int) -> bool:
+        return value > 0 and (self.mask >> value) & 1 == 1
+
+    def min(self) -> int:
+        m = self.mask
+        if not m:
+            raise ValueError("hand is empty")
+        return (m & -m).bit_length() - 1
+
+    def max(self) -> int:
+        if not self.mask:
+            raise ValueError("hand is empty")
+        return self.mask.bit_length() - 1
+
+    def ceil(self, value: int) -> Optional[int]:
+        """Smallest held value >= value, or None."""
+        m = self.mask >> value << value if value > 0 else self.mask
+        return (m & -m).bit_length() - 1 if m else None
+
+    def higher(self, value: int) -> Optional[int]:
+        """Smallest held value > value, or None."""
+        return self.ceil(value + 1)
+
+    def nth(self, k: int) -> int:
+        """k-th smallest held value (0-based)."""
+        return nth_bit(self.mask, k)
+
+    def values(self) -> List[int]:
+        """Held values in ascending order."""
+        out = []
+        m = self.mask
+        while m:
+            low = m & -m
+            out.append(low.bit_length() - 1)
+            m ^= low
+        return out
+
+    # --- Mutation ---
+    def remove(self, value: int) -> Card:
+        if not self.has(value):
+            raise ValueError(f"value {value} not in hand")
+        self.mask ^= 1 << value
+        return card(self.suit, value)
+
+    def add(self, value: int):
+        self.mask |= 1 << value
+
+    # --- Sequence-like views ---
+    def __len__(self) -> int:
+        return self.mask.bit_count()
+
+    def __bool__(self) -> bool:
+        return self.mask != 0
+
+    def __iter__(self) -> Iterator[Card]:
+        return (card(self.suit, v) for v in self.values())
+
+    def __getitem__(self, index: int) -> Card:
+        if index < 0:
+            index += len(self)
+        if index < 0:
+            raise IndexError("hand index out of range")
+        return card(self.suit, self.nth(index))
+
+    def __contains__(self, item) -> bool:
+        if isinstance(item, Card):
+            return item.suit == self.suit and self.has(item.value)
+        return self.has(item)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, BitHand):
+            return self.suit == other.suit and self.mask == other.mask
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"BitHand({self.suit!r}, {self.values()})"
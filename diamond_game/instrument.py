@@ -0,0 +1,183 @@
+"""
+Opt-in instrumentation for the game hot paths.
+
+`Game.play_round`, `choose_card` and `_resolve_points` check the module-level
+`sink` and only time anything when it is set, so the cost when disabled is one
+attribute lookup per call.
+
+    from diamond_game import instrument
+    sink = instrument.enable()          # in-memory aggregation
+    ...play games...
+    print(sink.format_summary())
+    print(instrument.prometheus_text(sink))
+
+Sinks record per-phase timings of a round ("decide", "play", "resolve"),
+per-strategy decision latency histograms, and counters for games, rounds and
+ties. `JsonDumpSink` additionally writes its aggregate to a file periodically.
+"""
+import bisect
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+# Histogram upper bounds in seconds: 1µs doubling up to ~1s.
+BUCKETS: List[float] = [1e-6 * 2 ** i for i in range(21)]
+
+# The active sink; None means instrumentation is off.
+sink: Optional["MemorySink"] = None
+
+
+def enable(new_sink: Optional["MemorySink"] = None) -> "MemorySink":
+    global sink
+    sink = new_sink if new_sink is not None else MemorySink()
+    return sink
+
+
+def disable() -> Optional["MemorySink"]:
+    """Turn instrumentation off and return the sink that was active."""
+    global sink
+    old, sink = sink, None
+    return old
+
+
+class MemorySink:
+    """Aggregates timings and counters in memory."""
+
+    def __init__(self):
+        self.phases: Dict[str, List[float]] = {}  # name -> [count, total seconds, max seconds]
+        self.decisions: Dict[str, List[int]] = {}  # strategy -> bucket counts (last = overflow)
+        self.decision_totals: Dict[str, List[float]] = {}  # strategy -> [count, total seconds]
+        self.counters: Dict[str, int] = {}
+
+    def phase(self, name: str, seconds: float):
+        p = self.phases.get(name)
+        if p is None:
+            p = self.phases[name] = [0, 0.0, 0.0]
+        p[0] += 1
+        p[1] += seconds
+        if seconds > p[2]:
+            p[2] = seconds
+
+    def decision(self, strategy: str, seconds: float):
+        h = self.decisions.get(strategy)
+        if h is None:
+            h = self.decisions[strategy] = [0] * (len(BUCKETS) + 1)
+            self.decision_totals[strategy] = [0, 0.0]
+        h[bisect.bisect_left(BUCKETS, seconds)] += 1
+        t = self.decision_totals[strategy]
+        t[0] += 1
+        t[1] += seconds
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    # --- Aggregates ---
+    def snapshot(self) -> Dict:
+        """Plain-data copy of everything recorded, suitable for JSON or merging."""
+        return {
+            "phases": {k: list(v) for k, v in self.phases.items()},
+            "decisions": {k: list(v) for k, v in self.decisions.items()},
+            "decision_totals": {k: list(v) for k, v in self.decision_totals.items()},
+            "counters": dict(self.counters),
+        }
+
+    def merge(self, snap: Dict):
+        """Add a `snapshot()` from another sink, e.g. one recorded in a worker process."""
+        for name, (count, total, longest) in snap["phases"].items():
+            p = self.phases.setdefault(name, [0, 0.0, 0.0])
+            p[0] += count
+            p[1] += total
+            p[2] = max(p[2], longest)
+        for strategy, buckets in snap["decisions"].items():
+            h = self.decisions.setdefault(strategy, [0] * (len(BUCKETS) + 1))
+            for i, c in enumerate(buckets):
+                h[i] += c
+        for strategy, (count, total) in snap["decision_totals"].items():
+            t = self.decision_totals.setdefault(strategy, [0, 0.0])
+            t[0] += count
+            t[1] += total
+        for name, n in snap["counters"].items():
+            self.count(name, n)
+
+    def quantile(self, strategy: str, q: float) -> float:
+        """Upper bucket bound containing the q-quantile of decision latency."""
+        h = self.decisions[strategy]
+        target = q * sum(h)
+        seen = 0
+        for i, c in enumerate(h):
+            seen += c
+            if seen >= target and c:
+                return BUCKETS[i] if i < len(BUCKETS) else float("inf")
+        return float("inf")
+
+    def format_summary(self) -> str:
+        lines = ["Profile summary"]
+        if self.counters:
+            lines.append("  " + " | ".join(f"{k}: {v:,}" for k, v in sorted(self.counters.items())))
+        for name, (count, total, longest) in sorted(self.phases.items()):
+            lines.append(
+                f"  phase {name:<10} {count:>10,} calls | mean {total / count * 1e6:9.2f} µs | "
+                f"max {longest * 1e6:10.1f} µs | total {total:8.3f} s"
+            )
+        for strategy, (count, total) in sorted(self.decision_totals.items()):
+            lines.append(
+                f"  decide {strategy:<9} {count:>10,} calls | mean {total / count * 1e6:9.2f} µs | "
+                f"p50 <= {self.quantile(strategy, 0.5) * 1e6:8.0f} µs | p99 <= {self.quantile(strategy, 0.99) * 1e6:8.0f} µs"
+            )
+        return "\n".join(lines)
+
+
+class JsonDumpSink(MemorySink):
+    """In-memory aggregation that also writes its snapshot to `path` every `interval` seconds."""
+
+    def __init__(self, path: str, interval: float = 10.0):
+        super().__init__()
+        self.path = path
+        self.interval = interval
+        self._next_dump = time.monotonic() + interval
+
+    def _maybe_dump(self):
+        if time.monotonic() >= self._next_dump:
+            self.dump()
+
+    def dump(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(dict(self.snapshot(), time=time.time()), f)
+        os.replace(tmp, self.path)
+        self._next_dump = time.monotonic() + self.interval
+
+    def phase(self, name: str, seconds: float):
+        super().phase(name, seconds)
+        self._maybe_dump()
+
+    def count(self, name: str, n: int = 1):
+        super().count(name, n)
+        self._maybe_dump()
+
+
+def prometheus_text(s: MemorySink, prefix: str = "diamond") -> str:
+    """Render a sink in the Prometheus text exposition format."""
+    out = []
+    for name, value in sorted(s.counters.items()):
+        out.append(f"# TYPE {prefix}_{name}_total counter")
+        out.append(f"{prefix}_{name}_total {value}")
+    if s.phases:
+        out.append(f"# TYPE {prefix}_phase_seconds summary")
+        for name, (count, total, _) in sorted(s.phases.items()):
+            out.append(f'{prefix}_phase_seconds_sum{{phase="{name}"}} {total:.9f}')
+            out.append(f'{prefix}_phase_seconds_count{{phase="{name}"}} {count}')
+    if s.decisions:
+        out.append(f"# TYPE {prefix}_decision_seconds histogram")
+        for strategy, buckets in sorted(s.decisions.items()):
+            cumulative = 0
+            for bound, c in zip(BUCKETS, buckets):
+                cumulative += c
+                out.append(f'{prefix}_decision_seconds_bucket{{strategy="{strategy}",le="{bound:.6g}"}} {cumulative}')
+            cumulative += buckets[-1]
+            out.append(f'{prefix}_decision_seconds_bucket{{strategy="{strategy}",le="+Inf"}} {cumulative}')
+            count, total = s.decision_totals[strategy]
+            out.append(f'{prefix}_decision_seconds_sum{{strategy="{strategy}"}} {total:.9f}')
+            out.append(f'{prefix}_decision_seconds_count{{strategy="{strategy}"}} {count}')
+    return "\n".join(out) + "\n"
@@ -0,0 +1,239 @@
+"""
+Round-robin rating ladder with sequential early stopping.
+
+Every pairing of the given levels (default: every playable level) is
+played in small batches. Elo ratings are updated game by game as batches come
+in, and each pairing runs a sequential probability ratio test (SPRT) of "the
+first level is `margin` Elo stronger" against "it is `margin` Elo weaker". A
+pairing stops as soon as its log-likelihood ratio leaves the bounds set by
+`alpha` and `beta`, so lopsided matchups such as easy vs expert are settled in
+a few dozen games and the budget goes to close ones. Pairings still open after
+`max_games` are reported as undecided.
+
+    python -m diamond_game.ladder --levels easy medium expert perfect --max-games 4000
+"""
+import argparse
+import itertools
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .strategies import LEVELS, load_levels, playable_levels
+from .tournament import run_matchup
+
+
+def expected_score(elo: float) -> float:
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def _score_stats(wins: int, draws: int, losses: int) -> Tuple[float, float]:
+    """
+    Mean and per-game variance of the score (win 1, draw 0.5, loss 0). Half a
+    win and half a loss are added to the variance so that a perfect record does
+    not look certain.
+    """
+    mean = (wins + 0.5 * draws) / (wins + draws + losses)
+    w, d, l = wins + 0.5, draws, losses + 0.5
+    return mean, (w * (1 - mean) ** 2 + d * (0.5 - mean) ** 2 + l * mean ** 2) / (w + d + l)
+
+
+@dataclass
+class SPRT:
+    """Test elo0 (H0) against elo1 (H1) with error rates alpha and beta."""
+    elo0: float = -20.0
+    elo1: float = 20.0
+    alpha: float = 0.05
+    beta: float = 0.05
+
+    def bounds(self) -> Tuple[float, float]:
+        return math.log(self.beta / (1 - self.alpha)), math.log((1 - self.beta) / self.alpha)
+
+    def llr(self, wins: int, draws: int, losses: int) -> float:
+        """Log-likelihood ratio of H1 over H0 (normal approximation to the trinomial)."""
+        n = wins + draws + losses
+        if n == 0:
+            return 0.0
+        mean, var = _score_stats(wins, draws, losses)
+        s0, s1 = expected_score(self.elo0), expected_score(self.elo1)
+        return n * (s1 - s0) * (2 * mean - s0 - s1) / (2 * var)
+
+
+@dataclass
+class Pairing:
+    levels: Tuple[str, str]
+    wins: int = 0  # for levels[0]
+    draws: int = 0
+    losses: int = 0
+    llr: float = 0.0
+    decision: Optional[str] = None  # stronger level, or "undecided" once the cap is hit
+
+    @property
+    def games(self) -> int:
+        return self.wins + self.draws + self.losses
+
+    def elo(self) -> Tuple[float, float]:
+        """Performance difference of levels[0] over levels[1] and its 95% half-width."""
+        n = self.games
+        if n == 0:
+            return 0.0, float("inf")
+        mean, var = _score_stats(self.wins, self.draws, self.losses)
+        s = min(max(mean, 1 / (2 * n)), 1 - 1 / (2 * n))
+        slope = 400 / (math.log(10) * s * (1 - s))
+        return -400 * math.log10(1 / s - 1), 1.96 * slope * math.sqrt(var / n)
+
+
+@dataclass
+class Ladder:
+    levels: Sequence[str] = field(default_factory=playable_levels)
+    seed: int = 0
+    batch: int = 20
+    max_games: int = 4000
+    sprt: SPRT = field(default_factory=SPRT)
+    k: float = 16.0
+    pairings: List[Pairing] = field(init=False)
+    ratings: Dict[str, float] = field(init=False)
+
+    def __post_init__(self):
+        unknown = [level for level in self.levels if level not in LEVELS]
+        if unknown:
+            raise ValueError(f"Unknown bot level(s): {', '.join(unknown)}")
+        self.pairings = [Pairing(p) for p in itertools.combinations(self.levels, 2)]
+        self.ratings = {level: 1500.0 for level in self.levels}
+
+    @property
+    def games(self) -> int:
+        return sum(p.games for p in self.pairings)
+
+    def open_pairings(self) -> List[Pairing]:
+        return [p for p in self.pairings if p.decision is None]
+
+    def _rate(self, a: str, b: str, score: float):
+        expected = expected_score(self.ratings[a] - self.ratings[b])
+        self.ratings[a] += self.k * (score - expected)
+        self.ratings[b] -= self.k * (score - expected)
+
+    def record(self, p: Pairing, winners: Sequence[int]):
+        """Add finished games (winner seat, -1 on a tie) to a pairing and re-test it."""
+        a, b = p.levels
+        for w in winners:
+            if w == 0:
+                p.wins += 1
+                self._rate(a, b, 1.0)
+            elif w == 1:
+                p.losses += 1
+                self._rate(a, b, 0.0)
+            else:
+                p.draws += 1
+                self._rate(a, b, 0.5)
+        p.llr = self.sprt.llr(p.wins, p.draws, p.losses)
+        lower, upper = self.sprt.bounds()
+        if p.llr >= upper:
+            p.decision = a
+        elif p.llr <= lower:
+            p.decision = b
+        elif p.games >= self.max_games:
+            p.decision = "undecided"
+
+    def step(self, workers: Optional[int] = None, executor: Optional[ProcessPoolExecutor] = None) -> List[Pairing]:
+        """Play one batch for every open pairing; returns the pairings that were played."""
+        played = self.open_pairings()
+        for p in played:
+            games = min(self.batch, self.max_games - p.games)
+            r = run_matchup(p.levels, games, self.seed, workers, executor=executor, start=p.games)
+            self.record(p, [o.winner for o in r.outcomes])
+        return played
+
+    def run(
+        self,
+        workers: Optional[int] = None,
+        on_step: Optional[Callable[["Ladder", List[Pairing]], None]] = None,
+    ) -> "Ladder":
+        """Step until every pairing is decided, calling `on_step` after each batch."""
+        workers = workers or os.cpu_count() or 1
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            while self.open_pairings():
+                played = self.step(workers, pool)
+                if on_step is not None:
+                    on_step(self, played)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return self
+
+
+def format_pairing(p: Pairing, sprt: SPRT) -> str:
+    elo, ci = p.elo()
+    lower, upper = sprt.bounds()
+    status = p.decision or "running"
+    if p.decision not in (None, "undecided"):
+        status = f"{p.decision} stronger"
+    return (
+        f"{' vs '.join(p.levels):<18} {p.games:>6} games | W-D-L {p.wins}-{p.draws}-{p.losses} | "
+        f"elo {elo:+7.1f} ± {ci:5.1f} | LLR {p.llr:+6.2f} [{lower:.2f}, {upper:.2f}] | {status}"
+    )
+
+
+def format_ratings(ladder: Ladder) -> str:
+    ranked = sorted(ladder.ratings.items(), key=lambda kv: -kv[1])
+    return "\n".join(f"  {i + 1}. {level:<10} {rating:7.1f}" for i, (level, rating) in enumerate(ranked))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Round-robin rating ladder with SPRT early stopping.")
+    parser.add_argument("--levels", nargs="+", default=None, help="levels to rate (default: all; cfr only with a trained policy)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch", type=int, default=20, help="games per pairing between checks")
+    parser.add_argument("--max-games", type=int, default=4000, help="cap per pairing")
+    parser.add_argument("--margin", type=float, default=20.0, help="SPRT tests -margin against +margin Elo")
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    parser.add_argument("--k", type=float, default=16.0, help="Elo K-factor")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--levels-file", default=None, help="register extra levels saved by diamond_game.sweep")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.levels_file:
+            load_levels(args.levels_file)
+        ladder = Ladder(
+            levels=args.levels or playable_levels(),
+            seed=args.seed,
+            batch=args.batch,
+            max_games=args.max_games,
+            sprt=SPRT(-args.margin, args.margin, args.alpha, args.beta),
+            k=args.k,
+        )
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    start = time.perf_counter()
+
+    def progress(lad: Ladder, played: List[Pairing]):
+        print(f"[{time.perf_counter() - start:7.1f}s] {lad.games:,} games, {len(lad.open_pairings())} pairings open")
+        for p in played:
+            print(f"  {format_pairing(p, lad.sprt)}")
+        sys.stdout.flush()
+
+    ladder.run(args.workers, progress)
+    budget = len(ladder.pairings) * ladder.max_games
+    print("\nFinal pairings:")
+    for p in ladder.pairings:
+        print(f"  {format_pairing(p, ladder.sprt)}")
+    print("Ratings:")
+    print(format_ratings(ladder))
+    print(
+        f"Played {ladder.games:,} games in {time.perf_counter() - start:.1f}s; "
+        f"a fixed {ladder.max_games:,} games per pairing would be {budget:,} "
+        f"({1 - ladder.games / budget:.0%} saved)."
+    )
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -0,0 +1,258 @@
+"""
+Monte Carlo search for two-bot games.
+
+For each candidate card the searcher samples orders of the unseen diamonds and
+plays the game out with cheap rollout policies (bitmask versions of
+random/matching/smart), choosing which card to try next with UCB1. Rollouts
+only update a few integers per round; no `Game` is copied.
+
+Rollouts can be spread over worker processes (root parallelisation: every
+worker searches independently and the statistics are summed). Statistics for
+the positions reached after this round are kept in `Bot.memory`, so the next
+decision starts from what the previous search already learned.
+"""
+import functools
+import math
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Tuple
+
+from .cards import VALUES
+from .hand import nth_bit
+
+# (diamond, future diamonds mask, my mask, opponent mask, 2 * score gap)
+StateKey = Tuple[int, int, int, int, int]
+Stats = Dict[int, List[float]]  # move -> [visits, total payoff]
+
+
+@dataclass(frozen=True)
+class MCTSConfig:
+    rollouts: int = 1000  # per move; ignored when time_ms is set
+    time_ms: Optional[float] = None  # per-move time budget
+    workers: int = 1  # >1 runs rollouts in worker processes
+    policy: str = "smart"  # rollout policy for both bots
+    epsilon: float = 0.1  # chance a rollout move is random instead
+    exploration: float = 1.0  # UCB1 constant
+    threshold: int = 10  # smart rollouts contest diamonds from here up (scaled for larger decks by `choose`)
+    horizon: Optional[int] = None  # rounds a rollout plays before scoring the gap; None: to the end
+    width: Optional[int] = None  # cards searched at the root, spread over the hand; None: all of them
+
+
+# Module default; a bot can override it with bot.memory["mcts_config"].
+config = MCTSConfig()
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()  # games on several threads (the API) may create the pool at once
+
+
+# --- Bitmask rollout policies (bit v set = value v held) ---
+def _lowest(mask: int) -> int:
+    return (mask & -mask).bit_length() - 1
+
+
+def _ceil_or_lowest(mask: int, value: int) -> int:
+    above = mask >> value << value
+    return _lowest(above) if above else _lowest(mask)
+
+
+def _policy_random(mine: int, diamond: int, opp: int, rng: random.Random) -> int:
+    return nth_bit(mine, rng.randrange(mine.bit_count()))
+
+
+def _policy_matching(mine: int, diamond: int, opp: int, rng: random.Random) -> int:
+    if (mine >> diamond) & 1:
+        return diamond
+    return _ceil_or_lowest(mine, diamond)
+
+
+def _policy_smart(mine: int, diamond: int, opp: int, rng: random.Random, threshold: int = 10) -> int:
+    if diamond < threshold:
+        return _lowest(mine)
+    opp_high = opp.bit_length() - 1 if opp else threshold
+    beat = mine >> (opp_high + 1) << (opp_high + 1)
+    if beat:
+        return _lowest(beat)
+    return _ceil_or_lowest(mine, diamond)
+
+
+_POLICIES = {
+    "random": _policy_random,
+    "matching": _policy_matching,
+    "smart": _policy_smart,
+}
+
+
+def _bits(mask: int) -> List[int]:
+    out = []
+    while mask:
+        low = mask & -mask
+        out.append(low.bit_length() - 1)
+        mask ^= low
+    return out
+
+
+def _candidates(root: StateKey, width: int) -> List[int]:
+    """
+    At most about `width` root moves for a large hand: the cards the rollout
+    policies would consider (lowest, the diamond's match or next up, the
+    cheapest card over the opponent's best) plus cards evenly spaced by rank.
+    """
+    diamond, _, mine, opp, _ = root
+    count = mine.bit_count()
+    picks = {_lowest(mine), mine.bit_length() - 1, _ceil_or_lowest(mine, diamond)}
+    beat = mine >> opp.bit_length() << opp.bit_length()
+    if beat:
+        picks.add(_lowest(beat))
+    spread = max(width - len(picks), 2)
+    for k in range(spread):
+        picks.add(nth_bit(mine, k * (count - 1) // (spread - 1)))
+    return sorted(picks)
+
+
+# --- Search ---
+def _search(root: StateKey, prior: Stats, cfg: MCTSConfig, seed: int) -> Tuple[Stats, Dict[StateKey, Stats], int]:
+    """One independent search; returns root stats, next-round stats and rollout count."""
+    rng = random.Random(seed)
+    policy = _POLICIES[cfg.policy]
+    if policy is _policy_smart and cfg.threshold != 10:
+        policy = functools.partial(_policy_smart, threshold=cfg.threshold)
+    eps = cfg.epsilon
+    diamond, future, mine, opp, diff2 = root
+    moves = _bits(mine) if cfg.width is None or mine.bit_count() <= cfg.width else _candidates(root, cfg.width)
+    future_values = _bits(future)
+    horizon = cfg.horizon if cfg.horizon is not None and cfg.horizon < len(future_values) else None
+    stats: Stats = {m: list(prior.get(m, (0, 0.0))) for m in moves}
+    children: Dict[StateKey, Stats] = {}
+    deadline = time.perf_counter() + cfg.time_ms / 1000 if cfg.time_ms else None
+    budget = cfg.rollouts
+    done = 0
+
+    while (done < budget) if deadline is None else (done & 15 or time.perf_counter() < deadline):
+        # UCB1 over my card for this round
+        n = sum(s[0] for s in stats.values()) + 1
+        log_n = math.log(n)
+        best, best_score = moves[0], -1.0
+        for m in moves:
+            visits, total = stats[m]
+            if visits == 0:
+                best = m
+                break
+            score = total / visits + cfg.exploration * math.sqrt(log_n / visits)
+            if score > best_score:
+                best, best_score = m, score
+
+        # Opponent answers with the rollout policy; then play the sampled future out.
+        a = best
+        b = policy(opp, diamond, mine, rng) if rng.random() >= eps else _policy_random(opp, diamond, mine, rng)
+        my, op = mine ^ (1 << a), opp ^ (1 << b)
+        gap = diff2 + (2 * diamond if a > b else -2 * diamond if a < b else 0)
+        if horizon is None:
+            order = future_values[:]
+            rng.shuffle(order)
+        else:
+            order = rng.sample(future_values, horizon)
+        child_key = child_move = None
+        rest = future
+        for d in order:
+            rest ^= 1 << d
+            a = policy(my, d, op, rng) if rng.random() >= eps else _policy_random(my, d, op, rng)
+            b = policy(op, d, my, rng) if rng.random() >= eps else _policy_random(op, d, my, rng)
+            if child_key is None:
+                child_key, child_move = (d, rest, my, op, gap), a
+            my ^= 1 << a
+            op ^= 1 << b
+            gap += 2 * d if a > b else -2 * d if a < b else 0
+        payoff = 1.0 if gap > 0 else 0.5 if gap == 0 else 0.0
+
+        s = stats[best]
+        s[0] += 1
+        s[1] += payoff
+        if child_key is not None:
+            cs = children.setdefault(child_key, {}).setdefault(child_move, [0, 0.0])
+            cs[0] += 1
+            cs[1] += payoff
+        done += 1
+    return stats, children, done
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown()
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_workers = workers
+        return _pool
+
+
+def search(root: StateKey, prior: Stats, cfg: MCTSConfig, rng: random.Random) -> Tuple[Stats, Dict[StateKey, Stats], int]:
+    """Run the configured search, serially or across worker processes."""
+    if cfg.workers <= 1:
+        return _search(root, prior, cfg, rng.getrandbits(63))
+
+    per_worker = replace(cfg, rollouts=max(1, cfg.rollouts // cfg.workers))
+    pool = _get_pool(cfg.workers)
+    futures = [pool.submit(_search, root, prior, per_worker, rng.getrandbits(63)) for _ in range(cfg.workers)]
+    stats: Stats = {}
+    children: Dict[StateKey, Stats] = {}
+    done = 0
+    prior_visits = {m: s[0] for m, s in prior.items()}
+    prior_totals = {m: s[1] for m, s in prior.items()}
+    for f in futures:
+        s, c, n = f.result()
+        done += n
+        for m, (visits, total) in s.items():
+            # Every worker starts from the prior; count it once.
+            acc = stats.setdefault(m, [prior_visits.get(m, 0), prior_totals.get(m, 0.0)])
+            acc[0] += visits - prior_visits.get(m, 0)
+            acc[1] += total - prior_totals.get(m, 0.0)
+        for key, moves in c.items():
+            dest = children.setdefault(key, {})
+            for m, (visits, total) in moves.items():
+                acc = dest.setdefault(m, [0, 0.0])
+                acc[0] += visits
+                acc[1] += total
+    return stats, children, done
+
+
+def choose(bot, diamond_value: int, future: int, opponent: int, diff2: int, size: int = VALUES) -> int:
+    """
+    Pick a card for `bot` against a single opponent holding the cards in mask
+    `opponent`, with diamonds `future` still to come and `bot` leading by diff2 / 2.
+    `size` is the number of card values in the game.
+    """
+    cfg = bot.memory.get("mcts_config", config)
+    if size != VALUES:
+        # Keep a search on a large deck about as costly as one on the standard deck.
+        cfg = replace(
+            cfg, threshold=round(cfg.threshold * size / VALUES),
+            horizon=VALUES if cfg.horizon is None else cfg.horizon, width=VALUES if cfg.width is None else cfg.width,
+        )
+    root = (diamond_value, future, bot.hand.mask, opponent, diff2)
+    if len(bot.hand) == 1:
+        return bot.hand.min()
+
+    prior = bot.memory.get("mcts_children", {}).get(root, {})
+    start = time.perf_counter()
+    stats, children, done = search(root, prior, cfg, bot.rng or random)
+    elapsed = time.perf_counter() - start
+    bot.memory["mcts_children"] = children
+    bot.memory["mcts_rollouts"] = bot.memory.get("mcts_rollouts", 0) + done
+    bot.memory["mcts_seconds"] = bot.memory.get("mcts_seconds", 0.0) + elapsed
+    bot.memory["mcts_reused"] = bot.memory.get("mcts_reused", 0) + sum(int(s[0]) for s in prior.values())
+
+    # Most-visited card is the robust choice.
+    return max(stats, key=lambda m: (stats[m][0], stats[m][1]))
+
+
+def shutdown():
+    """Stop the rollout worker pool, if one was started."""
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown()
+        _pool, _pool_workers = None, 0
@@ -1,31 +1,52 @@
+import random
 from dataclasses import dataclass, field
 from typing import List, Optional, Dict
-from .cards import Card, suit_hand
+from .cards import VALUES, Card
+from .hand import BitHand
 
-@dataclass
+@dataclass(slots=True)
 class Player:
     name: str
     suit: str
-    hand: List[Card] = field(default_factory=list)
+    hand: BitHand = None  # a list of Cards is also accepted and converted
     score: int = 0
 
-    def initialize_hand(self):
-        self.hand = suit_hand(self.suit)
+    def __post_init__(self):
+        if self.hand is None:
+            self.hand = BitHand(self.suit)
+        elif not isinstance(self.hand, BitHand):
+            self.hand = BitHand.from_cards(self.suit, self.hand)
+
+    def initialize_hand(self, size: int = VALUES):
+        self.hand = BitHand.full(self.suit, size)
 
     def has_card(self, value: int) -> bool:
-        return any(c.value == value for c in self.hand)
+        return self.hand.has(value)
 
     def play(self, value: int) -> Card:
         """Remove and return the card of 'value' from hand; raises if not present."""
-        for i, c in enumerate(self.hand):
-            if c.value == value:
-                return self.hand.pop(i)
-        raise ValueError(f"{self.name} does not have card value {value} {self.suit}")
+        if not self.hand.has(value):
+            raise ValueError(f"{self.name} does not have card value {value} {self.suit}")
+        return self.hand.remove(value)
 
     def remaining_values(self) -> List[int]:
-        return sorted(c.value for c in self.hand)
+        return self.hand.values()
+
+    def fork(self) -> "Player":
+        """Shallow copy with its own hand, for `Game.fork()`."""
+        p = object.__new__(Player)
+        p.name, p.suit, p.hand, p.score = self.name, self.suit, self.hand.copy(), self.score
+        return p
 
-@dataclass
+@dataclass(slots=True)
 class Bot(Player):
     difficulty: str = "random"
     memory: Dict[str, object] = field(default_factory=dict)  # space for strategy state
+    rng: Optional[random.Random] = field(default=None, repr=False, compare=False)  # None: global random
+    params: Optional[Dict[str, int]] = field(default=None, repr=False, compare=False)  # strategy parameters
+
+    def fork(self) -> "Bot":
+        b = object.__new__(Bot)
+        b.name, b.suit, b.hand, b.score = self.name, self.suit, self.hand.copy(), self.score
+        b.difficulty, b.memory, b.rng, b.params = self.difficulty, self.memory.copy(), self.rng, self.params
+        return b
@@ -0,0 +1,99 @@
+"""
+What every seat can see during a game.
+
+Every bot starts with a whole suit and all plays are shown, so the cards left
+in each hand are public, as are the diamonds still to come and the scores.
+`Game` keeps one `PublicInfo` and updates it in place as each diamond is drawn
+and each round resolves, with a few bit operations per seat. `choose_card`
+passes it to every strategy, which read opponents' cards from it without
+building lists.
+"""
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from .cards import VALUES
+
+
+@dataclass(slots=True)
+class PublicInfo:
+    hands: List[int]  # cards left per seat, bit v = value v
+    diamonds: int  # diamonds still to be drawn, not counting the one in play
+    scores: List[float]  # per seat, summed in the same order as the bots' scores
+    round_no: int = 0  # rounds drawn so far
+    size: int = VALUES  # card values run 1..size
+    # Highest card held, the seat holding it (-1 if several) and the next highest; rebuilt once per round.
+    _top: Optional[Tuple[int, int, int]] = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def start(cls, seats: int, diamonds: Iterable[int], size: int = VALUES) -> "PublicInfo":
+        """A new game: full hands, no points, `diamonds` all still to come."""
+        return cls([((1 << size) - 1) << 1] * seats, _mask(diamonds), [0.0] * seats, 0, size)
+
+    @classmethod
+    def of(cls, bots: Sequence, remaining_diamonds: Iterable[int], round_no: int = 0, size: int = VALUES) -> "PublicInfo":
+        """The view of a position given by its bots (hands and scores) and the diamonds to come."""
+        return cls([b.hand.mask for b in bots], _mask(remaining_diamonds), [b.score for b in bots], round_no, size)
+
+    def copy(self) -> "PublicInfo":
+        return PublicInfo(self.hands[:], self.diamonds, self.scores[:], self.round_no, self.size)
+
+    # --- Updates (called by Game) ---
+    def draw(self, diamond: int):
+        self.diamonds &= ~(1 << diamond)
+        self.round_no += 1
+
+    def resolve(self, plays: Sequence[int], winners: Sequence[int], share: float):
+        hands = self.hands
+        for i, v in enumerate(plays):
+            hands[i] ^= 1 << v
+        for i in winners:
+            self.scores[i] += share
+        self._top = None
+
+    # --- Queries ---
+    def opponents(self, seat: int) -> int:
+        """Union of the cards left in every other hand."""
+        hands = self.hands
+        if len(hands) == 2:
+            return hands[1 - seat]
+        mask = 0
+        for i, m in enumerate(hands):
+            if i != seat:
+                mask |= m
+        return mask
+
+    def opponent_high(self, seat: int) -> int:
+        """Highest card any opponent still holds (0 when they hold none)."""
+        hands = self.hands
+        if len(hands) == 2:
+            return max(hands[1 - seat].bit_length() - 1, 0)
+        # With many seats, one pass per round finds the top two; each query is then O(1).
+        top = self._top
+        if top is None:
+            best = second = 0
+            holder = -1
+            for i, m in enumerate(hands):
+                high = m.bit_length() - 1
+                if high > best:
+                    best, second, holder = high, best, i
+                elif high == best:
+                    second, holder = high, -1
+                elif high > second:
+                    second = high
+            top = self._top = (best, holder, second)
+        best, holder, second = top
+        return second if seat == holder else best
+
+    def gap(self, seat: int) -> float:
+        """This seat's score minus the best opponent's."""
+        return self.scores[seat] - max(s for i, s in enumerate(self.scores) if i != seat)
+
+    def remaining_diamonds(self) -> List[int]:
+        return [v for v in range(1, self.size + 1) if self.diamonds >> v & 1]
+
+
+def _mask(values: Iterable[int]) -> int:
+    mask = 0
+    for v in values:
+        mask |= 1 << v
+    return mask
@@ -0,0 +1,272 @@
+"""
+Hindsight regret of recorded bot decisions.
+
+For every card a bot played, the analyzer looks back with the realized diamond
+order and the opponents' plays held fixed and asks which card it should have
+played instead. An alternative is any card the bot still held, and is swapped
+with the round where the bot actually played it, so the rest of its plays are
+unchanged. Regret is the points the best such swap would have gained (0 when
+the played card was already best). Nothing is simulated again: a game's
+regrets come from a 13 x 13 table of "card from round j played in round k"
+points, computed for whole chunks of games at once with numpy.
+
+Regret is summed per level by round number and diamond value, which shows
+where a strategy's thresholds give points away. Games are read as a stream and
+analyzed in chunks across a process pool with a bounded number of chunks in
+flight, so memory stays flat however large the archive.
+
+    python -m diamond_game.regret diamond_game_summary.csv
+    python -m diamond_game.regret --db results.db --by diamond round
+    python -m diamond_game.regret --archive games.dga
+"""
+import argparse
+import itertools
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .archive import Archive
+from .cards import VALUES
+from .results import GameRecord, ResultsStore, read_summary_csv
+
+ROUNDS = VALUES
+
+
+def hindsight(rounds: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Hindsight analysis of complete games given as an (N, rounds, 1 + bots) array
+    of (diamond, *plays). Returns (points, regret, best), each (N, bots, rounds):
+    the points each play scored, the points the best swap would have added, and
+    the card that swap plays (the actual card when regret is 0).
+    """
+    rounds = np.asarray(rounds)
+    plays = rounds[:, :, 1:]
+    n, r, seats = plays.shape
+    # Points are counted in 1/lcm(1..bots) units so tie splits are whole numbers
+    # and the swap sums below are exact (a third is not, in any float); a rounding
+    # residue would otherwise count as a mistake. float32 while that stays exact.
+    scale = math.lcm(*range(1, seats + 1))
+    dtype = np.float32 if 4 * VALUES * scale < 2 ** 24 else np.float64
+    diamonds = rounds[:, :, 0].astype(dtype) * scale
+    earlier = np.where(np.tri(r, r, -1, dtype=bool), -np.inf, 0).astype(dtype)  # [k, j]: j before k
+    diag = np.arange(r)
+    points = np.empty((n, seats, r), dtype=dtype)
+    regret = np.empty((n, seats, r), dtype=dtype)
+    best = np.empty((n, seats, r), dtype=plays.dtype)
+    for s in range(seats):
+        mine = plays[:, :, s]
+        others = np.delete(plays, s, axis=2)
+        top = others.max(axis=2)[:, :, None]
+        split = diamonds / (1 + (others == top).sum(axis=2))
+        # gained[i, k, j]: points for playing the card from round j in round k
+        card = mine[:, None, :]
+        gained = (card > top) * diamonds[:, :, None]
+        gained += (card == top) * split[:, :, None]
+        actual = gained[:, diag, diag]
+        swap = gained + gained.transpose(0, 2, 1)
+        swap -= actual[:, :, None]
+        swap -= actual[:, None, :]
+        swap += earlier
+        j = swap.argmax(axis=2)  # the first maximum, so round k itself when nothing gains
+        points[:, s] = actual
+        regret[:, s] = np.take_along_axis(swap, j[:, :, None], axis=2)[:, :, 0]
+        best[:, s] = np.take_along_axis(mine, j, axis=1)
+    points /= scale
+    regret /= scale
+    return points, regret, best
+
+
+@dataclass
+class LevelRegret:
+    """Sums for one level, each indexed [round_no - 1, diamond - 1]."""
+    decisions: np.ndarray = field(default_factory=lambda: np.zeros((ROUNDS, VALUES), dtype=np.int64))
+    mistakes: np.ndarray = field(default_factory=lambda: np.zeros((ROUNDS, VALUES), dtype=np.int64))
+    points: np.ndarray = field(default_factory=lambda: np.zeros((ROUNDS, VALUES)))
+    regret: np.ndarray = field(default_factory=lambda: np.zeros((ROUNDS, VALUES)))
+
+    def merge(self, other: "LevelRegret"):
+        self.decisions += other.decisions
+        self.mistakes += other.mistakes
+        self.points += other.points
+        self.regret += other.regret
+
+    def by(self, axis: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(decisions, mistakes, regret) summed per "round" or per "diamond"."""
+        if axis not in ("round", "diamond"):
+            raise ValueError(f"Unknown breakdown: {axis}")
+        a = 1 if axis == "round" else 0
+        return self.decisions.sum(axis=a), self.mistakes.sum(axis=a), self.regret.sum(axis=a)
+
+
+@dataclass
+class RegretReport:
+    levels: Dict[str, LevelRegret] = field(default_factory=dict)
+    games: int = 0
+    skipped: int = 0  # games without exactly 13 rounds
+
+    def merge(self, other: "RegretReport"):
+        for level, stats in other.levels.items():
+            self.levels.setdefault(level, LevelRegret()).merge(stats)
+        self.games += other.games
+        self.skipped += other.skipped
+
+
+def analyze_chunk(names: Sequence[str], seat_levels: np.ndarray, rounds: np.ndarray) -> RegretReport:
+    """
+    Regret sums for a chunk of games. `seat_levels` is (N, bots) indexes into
+    `names` and `rounds` the (N, 13, 1 + bots) plays.
+    """
+    report = RegretReport(games=len(rounds))
+    if not len(rounds):
+        return report
+    points, regret, _ = hindsight(rounds)
+    n, seats, r = regret.shape
+    cell = np.arange(r) * VALUES + rounds[:, :, 0] - 1  # (N, rounds) flat [round, diamond] index
+    size = len(names) * ROUNDS * VALUES
+    idx = (seat_levels[:, :, None] * (ROUNDS * VALUES) + cell[:, None, :]).ravel()
+    sums = {
+        "decisions": np.bincount(idx, minlength=size),
+        "mistakes": np.bincount(idx, weights=(regret > 0).ravel(), minlength=size).astype(np.int64),
+        "points": np.bincount(idx, weights=points.ravel(), minlength=size),
+        "regret": np.bincount(idx, weights=regret.ravel(), minlength=size),
+    }
+    for i, name in enumerate(names):
+        part = {k: v[i * ROUNDS * VALUES:(i + 1) * ROUNDS * VALUES].reshape(ROUNDS, VALUES) for k, v in sums.items()}
+        if part["decisions"].any():
+            report.levels.setdefault(name, LevelRegret()).merge(LevelRegret(**part))
+    return report
+
+
+def _pack(records: Sequence[GameRecord]) -> Tuple[List[str], np.ndarray, np.ndarray, int]:
+    """Compact arrays for a chunk of records: level names, level indexes, rounds, skipped count."""
+    names: Dict[str, int] = {}
+    complete = [rec for rec in records if len(rec.rounds) == ROUNDS]
+    seat_levels = np.array(
+        [[names.setdefault(level, len(names)) for level in rec.bot_levels] for rec in complete], dtype=np.int64
+    ).reshape(len(complete), -1)
+    flat = itertools.chain.from_iterable
+    rounds = np.fromiter(flat(flat(rec.rounds for rec in complete)), dtype=np.int8).reshape(len(complete), ROUNDS, -1)
+    return list(names), seat_levels, rounds, len(records) - len(complete)
+
+
+def _batches(records: Iterable[GameRecord], size: int) -> Iterator[List[GameRecord]]:
+    batch: List[GameRecord] = []
+    for rec in records:
+        batch.append(rec)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def analyze(
+    records: Iterable[GameRecord],
+    chunk_size: int = 2000,
+    workers: Optional[int] = None,
+) -> RegretReport:
+    """
+    Stream `records` in chunks of `chunk_size` games, analyzing chunks in a
+    process pool. At most four chunks per worker are in flight at a time;
+    chunks of a few thousand games keep the per-game tables in cache.
+    """
+    return _analyze_packed((_pack(batch) for batch in _batches(records, chunk_size)), workers)
+
+
+def analyze_archive(archive: Archive, chunk_size: int = 2000, workers: Optional[int] = None) -> RegretReport:
+    """`analyze` for an `archive.Archive`, whose columns are already arrays: nothing is parsed or packed."""
+
+    def packed():
+        for chunk in archive.chunks(chunk_size):
+            complete = chunk[chunk["rounds"] == ROUNDS]
+            plays = complete["plays"].transpose(0, 2, 1)
+            rounds = np.concatenate([complete["diamonds"][:, :, None], plays], axis=2).astype(np.int8)
+            yield archive.levels, complete["levels"].astype(np.int64), rounds, len(chunk) - len(complete)
+
+    return _analyze_packed(packed(), workers)
+
+
+def _analyze_packed(chunks: Iterable[Tuple[List[str], np.ndarray, np.ndarray, int]], workers: Optional[int]):
+    workers = workers or os.cpu_count() or 1
+    report = RegretReport()
+    if workers == 1:
+        for names, seat_levels, rounds, skipped in chunks:
+            report.merge(analyze_chunk(names, seat_levels, rounds))
+            report.skipped += skipped
+        return report
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        # Chunks are packed here, which keeps what goes to the workers small.
+        for names, seat_levels, rounds, skipped in chunks:
+            report.skipped += skipped
+            pending.append(pool.submit(analyze_chunk, names, seat_levels, rounds))
+            if len(pending) >= 4 * workers:
+                report.merge(pending.pop(0).result())
+        for f in pending:
+            report.merge(f.result())
+    return report
+
+
+def format_report(report: RegretReport, by: Sequence[str] = ("diamond",)) -> str:
+    lines = [f"{report.games:,} games analyzed" + (f", {report.skipped:,} incomplete skipped" if report.skipped else "")]
+    levels = sorted(report.levels)
+    for level in levels:
+        s = report.levels[level]
+        n = s.decisions.sum()
+        lines.append(
+            f"{level:<10} {n:>10,} decisions | scored {s.points.sum() / n:6.3f} | "
+            f"regret {s.regret.sum() / n:6.3f} per decision | mistakes {s.mistakes.sum() / n:6.1%}"
+        )
+    for axis in by:
+        label = "round" if axis == "round" else "diamond"
+        lines.append(f"\nMean regret per decision by {label} (mistake rate):")
+        lines.append(f"{label:>8} " + " ".join(f"{level:>18}" for level in levels))
+        per_level = [report.levels[level].by(axis) for level in levels]
+        for v in range(VALUES):
+            cells = []
+            for decisions, mistakes, regret in per_level:
+                d = max(decisions[v], 1)
+                cells.append(f"{regret[v] / d:9.3f} ({mistakes[v] / d:5.1%})")
+            lines.append(f"{v + 1:>8} " + " ".join(f"{c:>18}" for c in cells))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Hindsight regret of recorded bot decisions.")
+    parser.add_argument("csv_path", nargs="?", help="a diamond_game_summary.csv file")
+    parser.add_argument("--db", default=None, help="read games from this SQLite results database instead")
+    parser.add_argument("--archive", default=None, help="read games from this binary game archive instead")
+    parser.add_argument("--by", nargs="+", choices=("diamond", "round"), default=["diamond"])
+    parser.add_argument("--chunk-size", type=int, default=2000, help="games per chunk")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+    if sum(x is not None for x in (args.csv_path, args.db, args.archive)) != 1:
+        parser.error("give one of a CSV path, --db or --archive")
+
+    start = time.perf_counter()
+    if args.archive:
+        with Archive(args.archive) as archive:
+            report = analyze_archive(archive, args.chunk_size, args.workers)
+    elif args.db:
+        if not os.path.exists(args.db):
+            parser.error(f"{args.db} does not exist")
+        with ResultsStore(args.db) as store:
+            report = analyze(store.records(), args.chunk_size, args.workers)
+    else:
+        report = analyze(read_summary_csv(args.csv_path), args.chunk_size, args.workers)
+    elapsed = time.perf_counter() - start
+    print(format_report(report, args.by))
+    print(f"\nAnalyzed in {elapsed:.2f}s ({report.games / max(elapsed, 1e-9):,.0f} games/s)")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -0,0 +1,279 @@
+"""
+SQLite results store for two-bot games.
+
+Games and rounds live in normalized tables with indexes on level pair, winner
+and diamond value. Inserts are batched, many games per transaction. Small
+aggregate tables (wins per level pair, and per level pair and diamond value) are
+maintained on insert so win-rate queries stay fast no matter how many rounds
+are stored.
+
+    python -m diamond_game.results import diamond_game_summary.csv --db results.db
+    python -m diamond_game.results winrate expert medium --diamond 13 --db results.db
+"""
+import argparse
+import ast
+import csv
+import itertools
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    game_uid TEXT,
+    bot1_level TEXT NOT NULL,
+    bot2_level TEXT NOT NULL,
+    bot1_score REAL NOT NULL,
+    bot2_score REAL NOT NULL,
+    winner INTEGER NOT NULL  -- 1 or 2, 0 on a tie
+);
+CREATE TABLE IF NOT EXISTS rounds (
+    game_id INTEGER NOT NULL REFERENCES games(id),
+    round_no INTEGER NOT NULL,
+    diamond INTEGER NOT NULL,
+    bot1_play INTEGER NOT NULL,
+    bot2_play INTEGER NOT NULL,
+    winner INTEGER NOT NULL,  -- 1 or 2, 0 on a tie
+    points INTEGER NOT NULL,
+    PRIMARY KEY (game_id, round_no)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS matchup_stats (
+    bot1_level TEXT NOT NULL,
+    bot2_level TEXT NOT NULL,
+    games INTEGER NOT NULL,
+    bot1_wins INTEGER NOT NULL,
+    bot2_wins INTEGER NOT NULL,
+    PRIMARY KEY (bot1_level, bot2_level)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS diamond_stats (
+    bot1_level TEXT NOT NULL,
+    bot2_level TEXT NOT NULL,
+    diamond INTEGER NOT NULL,
+    rounds INTEGER NOT NULL,
+    bot1_wins INTEGER NOT NULL,
+    bot2_wins INTEGER NOT NULL,
+    PRIMARY KEY (bot1_level, bot2_level, diamond)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS games_levels ON games(bot1_level, bot2_level, winner);
+CREATE INDEX IF NOT EXISTS games_winner ON games(winner);
+CREATE INDEX IF NOT EXISTS rounds_diamond ON rounds(diamond, winner);
+"""
+
+
+@dataclass
+class GameRecord:
+    bot_levels: Tuple[str, str]
+    rounds: List[Tuple[int, int, int]]  # (diamond, bot 1 play, bot 2 play) in play order
+    game_uid: Optional[str] = None
+    scores: Tuple[float, float] = field(init=False)
+
+    def __post_init__(self):
+        s1 = s2 = 0.0
+        for diamond, p1, p2 in self.rounds:
+            if p1 > p2:
+                s1 += diamond
+            elif p2 > p1:
+                s2 += diamond
+            else:
+                s1 += diamond / 2
+                s2 += diamond / 2
+        self.scores = (s1, s2)
+
+    @property
+    def winner(self) -> int:
+        s1, s2 = self.scores
+        return 1 if s1 > s2 else 2 if s2 > s1 else 0
+
+
+def _card_value(text: str) -> int:
+    return int(text.split()[0])
+
+
+def record_from_summary(summary: Dict) -> GameRecord:
+    """Build a record from `Game.summary()` of a two-bot game."""
+    rounds = [
+        (_card_value(r["diamond"]), _card_value(r["bot_play"][0]), _card_value(r["bot_play"][1]))
+        for r in summary["rounds"]
+    ]
+    return GameRecord(tuple(summary["bot_levels"]), rounds, summary.get("game_id"))
+
+
+class ResultsStore:
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self) -> "ResultsStore":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_games(self, records: Iterable[GameRecord], batch_size: int = 5000) -> int:
+        """Insert games, committing once per `batch_size` games. Returns the count."""
+        total = 0
+        batch: List[GameRecord] = []
+        for rec in records:
+            batch.append(rec)
+            if len(batch) >= batch_size:
+                total += self._insert(batch)
+                batch = []
+        if batch:
+            total += self._insert(batch)
+        return total
+
+    def _insert(self, batch: Sequence[GameRecord]) -> int:
+        conn = self.conn
+        with conn:
+            # Take the write lock before reading MAX(id), so concurrent writers get
+            # consecutive, gap-free id blocks (ResultsFeed reads games by id range).
+            conn.execute("BEGIN IMMEDIATE")
+            cur = conn.execute("SELECT COALESCE(MAX(id), 0) FROM games")
+            next_id = cur.fetchone()[0] + 1
+            games, rounds = [], []
+            matchups: Dict[Tuple[str, str], List[int]] = {}
+            stats: Dict[Tuple[str, str, int], List[int]] = {}
+            for offset, rec in enumerate(batch):
+                gid = next_id + offset
+                l1, l2 = rec.bot_levels
+                games.append((gid, rec.game_uid, l1, l2, rec.scores[0], rec.scores[1], rec.winner))
+                m = matchups.setdefault((l1, l2), [0, 0, 0])
+                m[0] += 1
+                if rec.winner:
+                    m[rec.winner] += 1
+                for round_no, (diamond, p1, p2) in enumerate(rec.rounds, start=1):
+                    winner = 1 if p1 > p2 else 2 if p2 > p1 else 0
+                    rounds.append((gid, round_no, diamond, p1, p2, winner, diamond))
+                    s = stats.setdefault((l1, l2, diamond), [0, 0, 0])
+                    s[0] += 1
+                    if winner:
+                        s[winner] += 1
+            conn.executemany("INSERT INTO games VALUES (?, ?, ?, ?, ?, ?, ?)", games)
+            conn.executemany("INSERT INTO rounds VALUES (?, ?, ?, ?, ?, ?, ?)", rounds)
+            conn.executemany(
+                """INSERT INTO matchup_stats VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (bot1_level, bot2_level) DO UPDATE SET
+                       games = games + excluded.games,
+                       bot1_wins = bot1_wins + excluded.bot1_wins,
+                       bot2_wins = bot2_wins + excluded.bot2_wins""",
+                [(l1, l2, n, w1, w2) for (l1, l2), (n, w1, w2) in matchups.items()],
+            )
+            conn.executemany(
+                """INSERT INTO diamond_stats VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (bot1_level, bot2_level, diamond) DO UPDATE SET
+                       rounds = rounds + excluded.rounds,
+                       bot1_wins = bot1_wins + excluded.bot1_wins,
+                       bot2_wins = bot2_wins + excluded.bot2_wins""",
+                [(l1, l2, d, n, w1, w2) for (l1, l2, d), (n, w1, w2) in stats.items()],
+            )
+        return len(batch)
+
+    # --- Queries ---
+    def records(self) -> Iterator[GameRecord]:
+        """Stream every stored game back in insertion order."""
+        cur = self.conn.execute(
+            """SELECT g.id, g.game_uid, g.bot1_level, g.bot2_level, r.diamond, r.bot1_play, r.bot2_play
+               FROM games g JOIN rounds r ON r.game_id = g.id
+               ORDER BY g.id, r.round_no"""
+        )
+        for (_, uid, l1, l2), rows in itertools.groupby(cur, key=lambda row: row[:4]):
+            yield GameRecord((l1, l2), [row[4:] for row in rows], uid)
+
+    def game_win_rate(self, level: str, opponent: str) -> Tuple[int, int, int]:
+        """(wins, ties, games) for `level` against `opponent`, in either seat."""
+        return self._win_rate("matchup_stats", "games", level, opponent)
+
+    def round_win_rate(self, level: str, opponent: str, diamond: Optional[int] = None) -> Tuple[int, int, int]:
+        """(wins, ties, rounds) for `level` against `opponent`, optionally on one diamond value."""
+        return self._win_rate("diamond_stats", "rounds", level, opponent, diamond)
+
+    def _win_rate(self, table: str, count: str, level: str, opponent: str, diamond: Optional[int] = None):
+        wins = ties = total = 0
+        where = "bot1_level = ? AND bot2_level = ?" + (" AND diamond = ?" if diamond is not None else "")
+        for first, second, mine in ((level, opponent, 1), (opponent, level, 2)):
+            params = (first, second) + ((diamond,) if diamond is not None else ())
+            row = self.conn.execute(
+                f"SELECT SUM({count}), SUM(bot1_wins), SUM(bot2_wins) FROM {table} WHERE {where}", params
+            ).fetchone()
+            n, w1, w2 = (v or 0 for v in row)
+            total += n
+            wins += w1 if mine == 1 else w2
+            ties += n - w1 - w2
+            if first == second:
+                break
+        return wins, ties, total
+
+
+# --- CSV import ---
+def _parse_play(cell: str) -> List[int]:
+    if cell.startswith("["):
+        return [_card_value(c) for c in ast.literal_eval(cell)]
+    return [_card_value(cell)]
+
+
+def read_summary_csv(path: str) -> Iterator[GameRecord]:
+    """
+    Stream games from the CLI's `diamond_game_summary.csv`.
+
+    Round rows are grouped into games; the "Final Scores"/"Winner" trailer rows,
+    blank lines and repeated headers are skipped. `Bot 1 Play` may hold the
+    stringified list of both plays, as the CLI writes it.
+    """
+    levels: Optional[Tuple[str, str]] = None
+    game_no: Optional[str] = None
+    rounds: List[Tuple[int, int, int]] = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            is_round = len(row) >= 9 and row[0].isdigit() and row[3].isdigit()
+            if not is_round:
+                continue
+            if rounds and (row[0] != game_no or row[3] == "1"):
+                yield GameRecord(levels, rounds)
+                rounds = []
+            game_no, levels = row[0], (row[1], row[2])
+            plays = _parse_play(row[5])
+            p1 = plays[0]
+            p2 = plays[1] if len(plays) > 1 else _card_value(row[6])
+            rounds.append((_card_value(row[4]), p1, p2))
+    if rounds:
+        yield GameRecord(levels, rounds)
+
+
+def import_csv(csv_path: str, store: ResultsStore, batch_size: int = 5000) -> int:
+    return store.add_games(read_summary_csv(csv_path), batch_size=batch_size)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Import and query game results.")
+    parser.add_argument("--db", default="results.db", help="SQLite database path")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="import a diamond_game_summary.csv file")
+    imp.add_argument("csv_path")
+    wr = sub.add_parser("winrate", help="win rate of one level against another")
+    wr.add_argument("level")
+    wr.add_argument("opponent")
+    wr.add_argument("--diamond", type=int, default=None, help="only rounds on this diamond value")
+    args = parser.parse_args(argv)
+
+    with ResultsStore(args.db) as store:
+        if args.command == "import":
+            n = import_csv(args.csv_path, store)
+            print(f"Imported {n} games into {args.db}")
+        else:
+            if args.diamond is None:
+                wins, ties, n = store.game_win_rate(args.level, args.opponent)
+                unit = "games"
+            else:
+                wins, ties, n = store.round_win_rate(args.level, args.opponent, args.diamond)
+                unit = f"rounds on {args.diamond} ♦"
+            rate = (wins + 0.5 * ties) / n if n else float("nan")
+            print(f"{args.level} vs {args.opponent}: {wins} wins, {ties} ties in {n} {unit} ({rate:.3f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+"""
+Sharded, resumable tournaments that survive crashes and span machines.
+
+A run is planned once into a directory: the matchups, game count and seed are
+written to `run.json`, and every worker derives the same list of shards from it
+(a level pair and a range of game indexes). Workers, as many processes and
+hosts as share the directory, claim shards by creating a claim file with
+O_EXCL, play them with `tournament.run_matchup`, and write each shard's
+outcomes to `results/` through a temp file and `os.replace`, so a result file
+is either complete or absent. Claims are refreshed while a shard runs; a claim
+left by a crashed worker expires after `--lease` seconds, or at once when it
+belongs to a dead process on the same host, and the shard is played again.
+Since games are seeded from their ids, any worker produces the same result for
+a shard, and merging the shards in plan order gives exactly the result of one
+uninterrupted `run_matchup`.
+
+No database or service is involved, only plain files and atomic renames, so
+the run directory can live on a filesystem shared by several nodes.
+
+    python -m diamond_game.shards plan runs/big medium:expert easy:expert --games 1000000 --shard-size 20000
+    python -m diamond_game.shards work runs/big --workers 8      # on every node; rerun to resume
+    python -m diamond_game.shards status runs/big
+    python -m diamond_game.shards merge runs/big --db results.db
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .archive import ArchiveWriter
+from .events import EventWriter, round_events
+from .results import GameRecord, ResultsStore
+from .strategies import LEVEL_PARAMS, LEVELS, load_levels, register_level
+from .tournament import GameOutcome, MatchupResult, _parse_pair, format_result, run_matchup
+
+PLAN_FILE = "run.json"
+PLAN_VERSION = 2  # 2: shard ids start with the matchup index
+
+
+@dataclass(frozen=True)
+class Shard:
+    levels: Tuple[str, ...]
+    start: int
+    stop: int
+    matchup: int = 0  # index in the plan's pairs
+
+    @property
+    def id(self) -> str:
+        # Level names may contain "-", so the index keeps ids of different matchups apart.
+        return f"{self.matchup:03d}-{'-'.join(self.levels)}.{self.start:010d}"
+
+
+@dataclass
+class Plan:
+    pairs: List[Tuple[str, ...]]
+    games: int
+    seed: int = 0
+    shard_size: int = 10000
+    paired: bool = False
+    record: bool = False  # keep per-round plays, needed to merge into --db or --events
+    custom_levels: Optional[Dict[str, Dict]] = None  # parametric levels, registered by every worker
+
+    def shards(self) -> List[Shard]:
+        return [
+            Shard(tuple(levels), start, min(start + self.shard_size, self.games), matchup)
+            for matchup, levels in enumerate(self.pairs)
+            for start in range(0, self.games, self.shard_size)
+        ]
+
+    def register_levels(self):
+        for name, spec in (self.custom_levels or {}).items():
+            register_level(name, spec["strategy"], spec.get("params"))
+
+
+# --- Run directory ---
+def _paths(run_dir: str) -> Tuple[str, str]:
+    return os.path.join(run_dir, "claims"), os.path.join(run_dir, "results")
+
+
+def _write_atomic(path: str, text: str):
+    """Write via a unique temp file and rename, so readers see all of it or nothing."""
+    tmp = f"{path}.{socket.gethostname()}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def create_plan(run_dir: str, plan: Plan):
+    """Write the plan for a new run; an existing run must have the same plan."""
+    for levels in plan.pairs:
+        for level in levels:
+            if level not in LEVELS:
+                raise ValueError(f"Unknown bot level: {level}")
+    if plan.games <= 0 or plan.shard_size <= 0:
+        raise ValueError("games and shard_size must be positive")
+    if plan.paired and (plan.shard_size % 2 or plan.games % 2 or any(len(p) != 2 for p in plan.pairs)):
+        raise ValueError("Paired runs need two-bot matchups and an even games and shard size")
+    plan.pairs = [tuple(p) for p in plan.pairs]
+    custom = {level for p in plan.pairs for level in p if level in LEVEL_PARAMS}
+    plan.custom_levels = {
+        name: {"strategy": LEVELS[name], "params": LEVEL_PARAMS[name]} for name in sorted(custom)
+    } or None
+    data = dict(asdict(plan), version=PLAN_VERSION)
+    path = os.path.join(run_dir, PLAN_FILE)
+    if os.path.exists(path):
+        if read_plan(run_dir) != plan:
+            raise ValueError(f"{run_dir} already holds a different plan")
+        return
+    for d in _paths(run_dir):
+        os.makedirs(d, exist_ok=True)
+    _write_atomic(path, json.dumps(data, indent=2) + "\n")
+
+
+def read_plan(run_dir: str) -> Plan:
+    with open(os.path.join(run_dir, PLAN_FILE), encoding="utf-8") as f:
+        data = json.load(f)
+    if data.pop("version", None) != PLAN_VERSION:
+        raise ValueError(f"{run_dir} was planned by an incompatible version")
+    data["pairs"] = [tuple(p) for p in data["pairs"]]
+    return Plan(**data)
+
+
+def _result_path(run_dir: str, shard: Shard) -> str:
+    return os.path.join(_paths(run_dir)[1], f"{shard.id}.json")
+
+
+def _claim_path(run_dir: str, shard: Shard) -> str:
+    return os.path.join(_paths(run_dir)[0], f"{shard.id}.claim")
+
+
+def is_done(run_dir: str, shard: Shard) -> bool:
+    return os.path.exists(_result_path(run_dir, shard))
+
+
+# --- Claims ---
+def _owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _is_stale(path: str, lease: float) -> bool:
+    try:
+        age = time.time() - os.path.getmtime(path)
+        with open(path, encoding="utf-8") as f:
+            host, _, pid = f.read().strip().rpartition(":")
+    except (FileNotFoundError, ValueError):
+        return False
+    if age > lease:
+        return True
+    # A claim from a dead process on this host need not wait out the lease.
+    return host == socket.gethostname() and pid.isdigit() and not _pid_alive(int(pid))
+
+
+def claim(run_dir: str, shard: Shard, lease: float) -> bool:
+    """Try to take `shard`; False if it is done or held by a live claim."""
+    if is_done(run_dir, shard):
+        return False
+    path = _claim_path(run_dir, shard)
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            if not _is_stale(path, lease):
+                return False
+            # Renaming is atomic, so usually only one of the workers that saw the stale
+            # claim takes it over. In the rare race where two both play the shard,
+            # they write identical results and the second rename changes nothing.
+            try:
+                os.replace(path, f"{path}.{socket.gethostname()}.{os.getpid()}.stale")
+            except FileNotFoundError:
+                return False
+            os.remove(f"{path}.{socket.gethostname()}.{os.getpid()}.stale")
+            continue
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(_owner())
+        # The shard may have finished between the check above and taking the claim.
+        if is_done(run_dir, shard):
+            release(run_dir, shard)
+            return False
+        return True
+    return False
+
+
+def release(run_dir: str, shard: Shard):
+    try:
+        os.remove(_claim_path(run_dir, shard))
+    except FileNotFoundError:
+        pass
+
+
+# --- Playing ---
+def run_shard(run_dir: str, plan: Plan, shard: Shard, step: int = 1000) -> MatchupResult:
+    """Play a claimed shard in steps, refreshing the claim after each, and write its result."""
+    claim_path = _claim_path(run_dir, shard)
+    result = MatchupResult(bot_levels=shard.levels, seed=plan.seed, paired=plan.paired)
+    step += step % 2
+    for a in range(shard.start, shard.stop, step):
+        b = min(a + step, shard.stop)
+        part = run_matchup(shard.levels, b - a, plan.seed, workers=1, record=plan.record, paired=plan.paired, start=a)
+        result.outcomes.extend(part.outcomes)
+        result.elapsed += part.elapsed
+        try:
+            os.utime(claim_path)
+        except FileNotFoundError:
+            pass  # taken over after our lease ran out; the result is the same either way
+    data = {
+        "shard": shard.id,
+        "levels": list(shard.levels),
+        "start": shard.start,
+        "stop": shard.stop,
+        "elapsed": result.elapsed,
+        "host": _owner(),
+        "outcomes": [asdict(o) for o in result.outcomes],
+    }
+    _write_atomic(_result_path(run_dir, shard), json.dumps(data, separators=(",", ":")))
+    return result
+
+
+def work(run_dir: str, lease: float = 600.0, limit: Optional[int] = None) -> int:
+    """Claim and play shards until none are left (or `limit` were played); returns the count."""
+    plan = read_plan(run_dir)
+    plan.register_levels()
+    played = 0
+    while limit is None or played < limit:
+        taken = None
+        for shard in plan.shards():
+            if claim(run_dir, shard, lease):
+                taken = shard
+                break
+        if taken is None:
+            return played
+        try:
+            run_shard(run_dir, plan, taken)
+        finally:
+            release(run_dir, taken)
+        played += 1
+    return played
+
+
+def work_parallel(run_dir: str, workers: Optional[int] = None, lease: float = 600.0) -> int:
+    """Run `work` in several local processes; returns the number of shards played."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return work(run_dir, lease)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return sum(f.result() for f in [pool.submit(work, run_dir, lease) for _ in range(workers)])
+
+
+# --- Status and merge ---
+def status(run_dir: str) -> Dict[str, int]:
+    plan = read_plan(run_dir)
+    counts = {"done": 0, "claimed": 0, "pending": 0}
+    for shard in plan.shards():
+        if is_done(run_dir, shard):
+            counts["done"] += 1
+        elif os.path.exists(_claim_path(run_dir, shard)):
+            counts["claimed"] += 1
+        else:
+            counts["pending"] += 1
+    return counts
+
+
+def read_result(run_dir: str, shard: Shard) -> Tuple[List[GameOutcome], float]:
+    """A finished shard's outcomes and the seconds it took to play."""
+    with open(_result_path(run_dir, shard), encoding="utf-8") as f:
+        data = json.load(f)
+    outcomes = []
+    for o in data["outcomes"]:
+        o["scores"] = tuple(o["scores"])
+        if o["rounds"] is not None:
+            o["rounds"] = [tuple(r) for r in o["rounds"]]
+        outcomes.append(GameOutcome(**o))
+    return outcomes, data["elapsed"]
+
+
+def merge(run_dir: str, partial: bool = False) -> List[MatchupResult]:
+    """One `MatchupResult` per matchup, in plan order; missing shards raise unless `partial`."""
+    plan = read_plan(run_dir)
+    missing = [s.id for s in plan.shards() if not is_done(run_dir, s)]
+    if missing and not partial:
+        raise RuntimeError(f"{len(missing)} shard(s) not finished, e.g. {missing[0]}")
+    results: Dict[Tuple[str, ...], MatchupResult] = {
+        p: MatchupResult(bot_levels=p, seed=plan.seed, paired=plan.paired) for p in plan.pairs
+    }
+    for shard in plan.shards():
+        if not is_done(run_dir, shard):
+            continue
+        outcomes, elapsed = read_result(run_dir, shard)
+        results[shard.levels].outcomes.extend(outcomes)
+        results[shard.levels].elapsed += elapsed
+    return list(results.values())
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Sharded, resumable bot-vs-bot tournaments.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("plan", help="describe a run as shards in a directory")
+    p.add_argument("run_dir")
+    p.add_argument("pairs", nargs="+", help="matchups such as medium:expert")
+    p.add_argument("--games", type=int, default=100000, help="games per matchup")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--shard-size", type=int, default=10000)
+    p.add_argument("--paired", action="store_true")
+    p.add_argument("--record", action="store_true", help="keep per-round plays (needed for merge --db/--events)")
+    p.add_argument("--levels-file", default=None, help="register extra levels saved by diamond_game.sweep")
+    w = sub.add_parser("work", help="claim and play shards until none are left")
+    w.add_argument("run_dir")
+    w.add_argument("--workers", type=int, default=None)
+    w.add_argument("--lease", type=float, default=600.0, help="seconds before a silent claim is taken over")
+    s = sub.add_parser("status", help="count finished, claimed and pending shards")
+    s.add_argument("run_dir")
+    m = sub.add_parser("merge", help="combine finished shards into per-matchup results")
+    m.add_argument("run_dir")
+    m.add_argument("--partial", action="store_true", help="merge what is finished so far")
+    m.add_argument("--db", default=None, help="also store every game in this SQLite results database")
+    m.add_argument("--events", default=None, help="also append per-round events to this JSONL file")
+    m.add_argument("--archive", default=None, help="also append every game to this binary game archive")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "plan":
+            if args.levels_file:
+                load_levels(args.levels_file)
+            plan = Plan(
+                [_parse_pair(x) for x in args.pairs], args.games, args.seed, args.shard_size, args.paired, args.record
+            )
+            create_plan(args.run_dir, plan)
+            print(f"Planned {len(plan.shards())} shards in {args.run_dir}")
+        elif args.command == "work":
+            start = time.perf_counter()
+            played = work_parallel(args.run_dir, args.workers, args.lease)
+            print(f"Played {played} shard(s) in {time.perf_counter() - start:.1f}s; {status(args.run_dir)}")
+        elif args.command == "status":
+            counts = status(args.run_dir)
+            total = sum(counts.values())
+            print(f"{counts['done']}/{total} shards done, {counts['claimed']} claimed, {counts['pending']} pending")
+        else:
+            plan = read_plan(args.run_dir)
+            if (args.db or args.events or args.archive) and not plan.record:
+                parser.error("--db, --events and --archive need a run planned with --record")
+            # Checked before anything is written, as the tournament runner does.
+            if args.db and any(len(p) != 2 for p in plan.pairs):
+                parser.error("--db stores two-bot games only")
+            if args.archive and len({len(p) for p in plan.pairs}) > 1:
+                parser.error("--archive needs matchups with the same number of bots")
+            results = merge(args.run_dir, args.partial)
+            for r in results:
+                print(format_result(r))
+            if args.events:
+                with EventWriter(args.events) as out:
+                    for r in results:
+                        for o in r.outcomes:
+                            out.write_many(round_events(o.game_id, o.rounds))
+                print(f"Wrote {out.written} round events to {args.events}")
+            if args.db:
+                with ResultsStore(args.db) as store:
+                    stored = store.add_games(
+                        GameRecord(r.bot_levels, o.rounds, o.game_id) for r in results for o in r.outcomes
+                    )
+                print(f"Stored {stored} games in {args.db}")
+            if args.archive:
+                with ArchiveWriter(args.archive, bots=len(results[0].bot_levels)) as archive:
+                    for r in results:
+                        for o in r.outcomes:
+                            archive.add_outcome(r.bot_levels, o)
+                print(f"Archived {archive.written} games in {args.archive}")
+    except (OSError, ValueError, RuntimeError, argparse.ArgumentTypeError) as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -0,0 +1,226 @@
+"""
+Compact, versioned binary snapshots of `Game` state.
+
+A two-bot game packs into about 50 bytes:
+
+    header   version, bot count, round number, flags          4 bytes
+    id       UUID bytes (or length-prefixed text)            16 bytes
+    bots     level code and suit index per bot                2 bytes each
+    deck     diamond order, 13 values at 4 bits each          7 bytes
+    moves    each bot's play per round, 4 bits each          13 bytes (full game)
+    hands    remaining cards per bot as 13-bit masks          2 bytes each
+    scores   per bot, in twelfths of a point                  2 bytes each
+
+Optional sections (custom bot names, levels without a code, the deal id of a
+paired game, which plays were forced) follow when flagged. Decoding deals the
+deck again from the id and replays the move list through the randomized bots'
+strategies and the game's own scoring, so the RNG, `Bot.memory` and scores end
+where the original's did and a restored game continues exactly like the
+original. Forced plays are skipped; every other replayed pick (except those of
+mcts searching to a time budget), and the final hands and scores, are checked
+against the stored values.
+"""
+import struct
+import uuid
+from typing import Iterable, Iterator, List, Sequence
+
+from .cards import SUITS, card
+from .game import _RANDOMIZED, Game
+from .strategies import choose_card
+from . import mcts
+
+VERSION = 1
+MAGIC = b"DGS1"
+
+# Stable codes for known levels; never reorder, only append.
+LEVEL_CODES = ("easy", "medium", "expert", "perfect", "mcts", "cfr")
+_CUSTOM_LEVEL = 255
+_SCORE_SCALE = 12  # tie splits among up to 4 bots are exact in twelfths
+_VALUES = 13
+
+_FLAG_ACTIVE = 1
+_FLAG_TEXT_ID = 2
+_FLAG_NAMES = 4
+_FLAG_DEAL = 8
+_FLAG_FORCED = 16
+
+_HEADER = struct.Struct("<BBBB")
+
+
+def _pack_nibbles(values: Sequence[int]) -> bytes:
+    out = bytearray((len(values) + 1) // 2)
+    for i, v in enumerate(values):
+        out[i >> 1] |= (v & 0xF) << (4 * (i & 1))
+    return bytes(out)
+
+
+def _unpack_nibbles(data: bytes, count: int) -> List[int]:
+    return [(data[i >> 1] >> (4 * (i & 1))) & 0xF for i in range(count)]
+
+
+def _pack_text(text: str) -> bytes:
+    raw = text.encode("utf-8")
+    if len(raw) > 255:
+        raise ValueError(f"text too long for snapshot: {text[:20]!r}...")
+    return bytes([len(raw)]) + raw
+
+
+def _default_names(n: int) -> List[str]:
+    return [f"Bot {i+1}" for i in range(n)]
+
+
+def encode(g: Game) -> bytes:
+    """Pack one game into bytes."""
+    n = len(g.bots)
+    if len(g.deck) != _VALUES:
+        raise ValueError("only standard 13-card games can be snapshotted")
+    flags = _FLAG_ACTIVE if g.active else 0
+    try:
+        id_bytes = uuid.UUID(g.id).bytes
+    except ValueError:
+        flags |= _FLAG_TEXT_ID
+        id_bytes = _pack_text(g.id)
+    names = [b.name for b in g.bots]
+    if names != _default_names(n):
+        flags |= _FLAG_NAMES
+    if g.deal_id is not None and g.deal_id != g.id:
+        flags |= _FLAG_DEAL
+    forced = [r.forced for r in g.history]
+    if any(forced):
+        flags |= _FLAG_FORCED
+
+    out = bytearray(_HEADER.pack(VERSION, n, g.round_no, flags))
+    out += id_bytes
+    custom_levels = []
+    for b, level in zip(g.bots, g.bot_levels):
+        code = LEVEL_CODES.index(level) if level in LEVEL_CODES else _CUSTOM_LEVEL
+        if code == _CUSTOM_LEVEL:
+            custom_levels.append(level)
+        out += bytes([code, SUITS.index(b.suit)])
+    out += _pack_nibbles([c.value for c in g.deck])
+    moves = [v for r in g.history for v in r.plays]
+    out += _pack_nibbles(moves)
+    for b in g.bots:
+        out += struct.pack("<H", b.hand.mask >> 1)
+    for b in g.bots:
+        out += struct.pack("<h", round(b.score * _SCORE_SCALE))
+    for level in custom_levels:
+        out += _pack_text(level)
+    if flags & _FLAG_NAMES:
+        for name in names:
+            out += _pack_text(name)
+    if flags & _FLAG_DEAL:
+        out += _pack_text(g.deal_id)
+    if flags & _FLAG_FORCED:
+        out += _pack_nibbles(forced)  # seat bitmask per round; at most four seats
+    return bytes(out)
+
+
+def _timed(bot) -> bool:
+    """An mcts bot searching to a time budget, whose picks do not repeat."""
+    return bot.difficulty == "mcts" and bot.memory.get("mcts_config", mcts.config).time_ms is not None
+
+
+def _decode_at(data: bytes, pos: int):
+    version, n, round_no, flags = _HEADER.unpack_from(data, pos)
+    if version != VERSION:
+        raise ValueError(f"unsupported snapshot version {version}")
+    pos += _HEADER.size
+
+    def text() -> str:
+        nonlocal pos
+        length = data[pos]
+        s = bytes(data[pos + 1:pos + 1 + length]).decode("utf-8")
+        pos += 1 + length
+        return s
+
+    if flags & _FLAG_TEXT_ID:
+        game_id = text()
+    else:
+        game_id = str(uuid.UUID(bytes=bytes(data[pos:pos + 16])))
+        pos += 16
+    codes, suits = [], []
+    for _ in range(n):
+        codes.append(data[pos])
+        suits.append(SUITS[data[pos + 1]])
+        pos += 2
+    deck_len = (_VALUES + 1) // 2
+    deck = _unpack_nibbles(data[pos:pos + deck_len], _VALUES)
+    pos += deck_len
+    moves_len = (round_no * n + 1) // 2
+    moves = _unpack_nibbles(data[pos:pos + moves_len], round_no * n)
+    pos += moves_len
+    masks = [struct.unpack_from("<H", data, pos + 2 * i)[0] << 1 for i in range(n)]
+    pos += 2 * n
+    scores = [struct.unpack_from("<h", data, pos + 2 * i)[0] for i in range(n)]
+    pos += 2 * n
+    levels = [text() if c == _CUSTOM_LEVEL else LEVEL_CODES[c] for c in codes]
+    names = [text() for _ in range(n)] if flags & _FLAG_NAMES else _default_names(n)
+    deal_id = text() if flags & _FLAG_DEAL else None
+    forced = [0] * round_no
+    if flags & _FLAG_FORCED:
+        forced = _unpack_nibbles(data[pos:pos + (round_no + 1) // 2], round_no)
+        pos += (round_no + 1) // 2
+
+    # Deal again so the RNG is where the original's was after its shuffle; a
+    # game that was given its deck never shuffled, so it gets the stored one.
+    spec = dict(bot_names=names, bot_suits=suits, bot_levels=levels, id=game_id, deal_id=deal_id)
+    g = Game(**spec)
+    if [c.value for c in g.deck] != deck:
+        g = Game(**spec, deck=[card("♦", v) for v in deck])
+    # Replay the recorded plays through each strategy and the normal scoring path.
+    for r in range(round_no):
+        diamond = g._draw()
+        values = moves[r * n:(r + 1) * n]
+        for i, (b, v) in enumerate(zip(g.bots, values)):
+            if not b.has_card(v):
+                raise ValueError(f"corrupt snapshot for game {game_id}")
+            if forced[r] >> i & 1 or b.difficulty not in _RANDOMIZED:
+                continue  # forced plays and deterministic strategies leave no state behind
+            chosen = choose_card(b, diamond.value, g.public, i)
+            if chosen != v and not _timed(b):
+                raise ValueError(f"game {game_id} does not replay: seat {i} picks {chosen}, not {v}, in round {r + 1}")
+        for b, v in zip(g.bots, values):
+            b.play(v)
+        g.history.append(g._resolve_points(values, diamond, forced[r]))
+    g.active = bool(flags & _FLAG_ACTIVE)
+    if [b.hand.mask for b in g.bots] != masks or [round(b.score * _SCORE_SCALE) for b in g.bots] != scores:
+        raise ValueError(f"corrupt snapshot for game {game_id}")
+    return g, pos
+
+
+def decode(data: bytes) -> Game:
+    """Restore one game from `encode()` output."""
+    g, pos = _decode_at(data, 0)
+    if pos != len(data):
+        raise ValueError("trailing bytes after snapshot")
+    return g
+
+
+def encode_many(games: Iterable[Game]) -> bytes:
+    """Pack many games into one buffer: magic, count, then length-prefixed snapshots."""
+    parts = [encode(g) for g in games]
+    out = bytearray(MAGIC)
+    out += struct.pack("<I", len(parts))
+    for p in parts:
+        out += struct.pack("<H", len(p))
+        out += p
+    return bytes(out)
+
+
+def iter_decode_many(data: bytes) -> Iterator[Game]:
+    """Restore games from `encode_many()` output one at a time."""
+    if data[:4] != MAGIC:
+        raise ValueError("not a game snapshot bundle")
+    (count,) = struct.unpack_from("<I", data, 4)
+    view = memoryview(data)
+    pos = 8
+    for _ in range(count):
+        (length,) = struct.unpack_from("<H", data, pos)
+        pos += 2
+        yield decode(view[pos:pos + length])
+        pos += length
+
+
+def decode_many(data: bytes) -> List[Game]:
+    return list(iter_decode_many(data))
@@ -1,9 +1,126 @@
-from typing import Dict
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Union
 from .game import Game
+from . import snapshot
+
+class ArchivedGame:
+    """Read-only stand-in for a finished game that was evicted from memory."""
+
+    def __init__(self, game_id: str, status: Dict, summary: Dict):
+        self.id = game_id
+        self.active = False
+        self._status = status
+        self._summary = summary
+
+    def is_over(self) -> bool:
+        return True
+
+    def status(self) -> Dict:
+        return dict(self._status, active=False)
+
+    def summary(self) -> Dict:
+        return self._summary
+
+    def abandon(self):
+        pass
+
+# Approximate retained size of a live game, from `python -m benchmarks.alloc`.
+GAME_BYTES = 5_200  # a new two-bot game
+ROUND_BYTES = 200  # each played round (RoundResult and its tuples)
+
+class SpillStore:
+    """Summaries of evicted games, kept in a small SQLite table."""
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS evicted (game_id TEXT PRIMARY KEY, status TEXT, summary TEXT)"
+        )
+        # Rows at open plus rows written since; a game spilled twice counts twice.
+        self.count = len(self)
+
+    def put(self, g: Game):
+        self.put_many([g])
+
+    def put_many(self, games: Iterable[Game]):
+        """Write several summaries in one transaction."""
+        rows = [(g.id, json.dumps(g.status()), json.dumps(g.summary())) for g in games]
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO evicted VALUES (?, ?, ?)", rows)
+        self.count += len(rows)
+
+    def get(self, game_id: str) -> Optional[ArchivedGame]:
+        row = self.conn.execute("SELECT status, summary FROM evicted WHERE game_id = ?", (game_id,)).fetchone()
+        if row is None:
+            return None
+        return ArchivedGame(game_id, json.loads(row[0]), json.loads(row[1]))
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM evicted").fetchone()[0]
 
 class GameManager:
-    def __init__(self):
-        self._games: Dict[str, Game] = {}
+    """
+    Keeps live games in memory, up to `capacity`.
+
+    Games are held in least-recently-used order. When over capacity, the least
+    recently used finished or abandoned games are evicted; games idle for longer
+    than `ttl` seconds are abandoned and evicted as well. Active games inside the
+    TTL are never evicted, so capacity may be exceeded while they are all in use.
+    With `spill_path`, summaries of evicted games are written to disk and `get()`
+    keeps returning them as read-only `ArchivedGame`s; then, once over capacity,
+    up to `evict_batch` extra finished games (at most a tenth of capacity) go in
+    the same pass, so summaries are written a batch per transaction. Without a
+    spill, games are evicted one at a time: freeing them in bulk makes the
+    garbage collector run more often.
+
+    `stats()` is O(1): live rounds are counted as games play them and memory
+    is estimated from per-game and per-round sizes.
+    """
+
+    def __init__(
+        self,
+        capacity: Optional[int] = 10_000,
+        ttl: Optional[float] = None,
+        spill_path: Optional[str] = None,
+        clock: Callable[[], float] = time.monotonic,
+        evict_batch: int = 100,
+    ):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.evict_batch = evict_batch
+        self._clock = clock
+        self._games: "OrderedDict[str, Game]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._spill = SpillStore(spill_path) if spill_path else None
+        self.hits = 0
+        self.misses = 0
+        self.spill_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.created = 0
+        self.live_rounds = 0
+        self._rounds: Dict[str, int] = {}  # rounds counted per live game
+        # Rounds are counted from whichever thread plays them (the API's executor for search levels).
+        self._rounds_lock = threading.Lock()
+
+    def _count_round(self, g: Game):
+        with self._rounds_lock:
+            if self._games.get(g.id) is g:  # not dropped (or replaced) meanwhile
+                self._rounds[g.id] += 1
+                self.live_rounds += 1
+
+    def _add(self, g: Game):
+        with self._rounds_lock:
+            self._games[g.id] = g
+            self._rounds[g.id] = len(g.history)
+            self.live_rounds += len(g.history)
+        self._last_used[g.id] = self._clock()
+        g.on_round = self._count_round
 
     def create(self, bot_names=None, bot_suits=None, bot_levels=None) -> Game:
         if bot_names is None:
@@ -13,18 +130,110 @@ class GameManager:
         if bot_levels is None:
             bot_levels = ["medium", "hard"]
         g = Game(bot_names=bot_names, bot_suits=bot_suits, bot_levels=bot_levels)
-        self._games[g.id] = g
+        self._add(g)
+        self.created += 1
+        self._expire()
+        self._evict_over_capacity()
         return g
 
-    def get(self, game_id: str) -> Game:
-        if game_id not in self._games:
-            raise KeyError("Game not found")
-        return self._games[game_id]
+    def get(self, game_id: str) -> Union[Game, ArchivedGame]:
+        self._expire()
+        g = self._games.get(game_id)
+        if g is not None:
+            self.hits += 1
+            self._games.move_to_end(game_id)
+            self._last_used[game_id] = self._clock()
+            return g
+        if self._spill is not None:
+            archived = self._spill.get(game_id)
+            if archived is not None:
+                self.spill_hits += 1
+                return archived
+        self.misses += 1
+        raise KeyError("Game not found")
 
     def abandon(self, game_id: str):
         g = self.get(game_id)
         g.abandon()
         return g
 
+    # --- Eviction ---
+    def _drop(self, game_id: str) -> Game:
+        with self._rounds_lock:
+            g = self._games.pop(game_id)
+            self.live_rounds -= self._rounds.pop(game_id)
+        g.on_round = None
+        del self._last_used[game_id]
+        return g
+
+    def _evict(self, game_ids: Iterable[str]):
+        evicted = [self._drop(game_id) for game_id in game_ids]
+        if self._spill is not None and evicted:
+            self._spill.put_many(evicted)
+        self.evictions += len(evicted)
+
+    def _expire(self):
+        if self.ttl is None:
+            return
+        # LRU order means the oldest access is always at the front.
+        cutoff = self._clock() - self.ttl
+        expired = []
+        for game_id, g in self._games.items():
+            if self._last_used[game_id] > cutoff:
+                break
+            g.abandon()
+            expired.append(game_id)
+        self.expirations += len(expired)
+        self._evict(expired)
+
+    def _evict_over_capacity(self):
+        if self.capacity is None or len(self._games) <= self.capacity:
+            return
+        wanted = len(self._games) - self.capacity
+        if self._spill is not None:
+            # Go a little below capacity, so the next few creates evict nothing.
+            wanted += min(self.evict_batch, self.capacity // 10)
+        finished = []
+        for game_id, g in self._games.items():
+            if not g.active or g.is_over():
+                finished.append(game_id)
+                if len(finished) == wanted:
+                    break
+        self._evict(finished)
+
+    # --- Checkpoints ---
+    def checkpoint(self, path: str) -> int:
+        """Atomically write binary snapshots of all live games to `path`."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(snapshot.encode_many(self._games.values()))
+        os.replace(tmp, path)
+        return len(self._games)
+
+    def restore(self, path: str) -> int:
+        """Load games saved by `checkpoint()`; returns how many were restored."""
+        with open(path, "rb") as f:
+            games = snapshot.decode_many(f.read())
+        for g in games:
+            if g.id in self._games:
+                self._drop(g.id)  # replaced by the saved copy
+            self._add(g)
+        self._evict_over_capacity()
+        return len(games)
+
+    def stats(self) -> Dict:
+        return {
+            "live_games": len(self._games),
+            "live_rounds": self.live_rounds,
+            "live_bytes_estimate": len(self._games) * GAME_BYTES + self.live_rounds * ROUND_BYTES,
+            "created": self.created,
+            "hits": self.hits,
+            "misses": self.misses,
+            "spill_hits": self.spill_hits,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "spilled": self._spill.count if self._spill is not None else 0,
+        }
+
 # Singleton for simple deployments
 manager = GameManager()
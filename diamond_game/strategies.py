@@ -1,78 +1,157 @@
+import json
 import random
-from typing import List, Optional
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from .players import Bot
-from .cards import Card
+from .cards import VALUES, Card
+from .public import PublicInfo
+from . import cfr, endgame, instrument, mcts
 
 # --- Strategy helpers ---
 def _pick_random(bot: Bot) -> int:
-    return random.choice(bot.remaining_values())
+    # Same draw as rng.choice(bot.remaining_values()) without building the list.
+    return bot.hand.nth((bot.rng or random).randrange(len(bot.hand)))
 
 def _pick_above_available(bot: Bot, diamond_value: int) -> int:
-    options = bot.remaining_values()
-    above = [v for v in options if v >= diamond_value]
-    if above:
-        return min(above)
-    return min(options)
-
-def _pick_matching(bot: Bot, diamond_value: int) -> int:
-    # If matching value available use it, else conservative.
-    if bot.has_card(diamond_value):
-        return diamond_value
-    return _pick_above_available(bot, diamond_value)
-
-def _estimate_user_high_remaining(known_user_remaining: Optional[List[int]]) -> int:
-    if not known_user_remaining:
-        return 10  # neutral guess
-    return max(known_user_remaining)
+    above = bot.hand.ceil(diamond_value)
+    if above is not None:
+        return above
+    return bot.hand.min()
+
+def _pick_matching(bot: Bot, diamond_value: int, offset: int = 0, top: int = VALUES) -> int:
+    # If matching value (diamond + offset) available use it, else conservative.
+    target = diamond_value
+    if offset:
+        target = min(max(diamond_value + offset, 1), top)
+    if bot.hand.has(target):
+        return target
+    return _pick_above_available(bot, target)
 
 def _pick_smart(
     bot: Bot,
     diamond_value: int,
-    remaining_diamonds: List[int],
-    known_user_remaining: Optional[List[int]] = None,
+    opponent_high: Optional[int] = None,
+    threshold: int = 10,
+    neutral_high: int = 10,
 ) -> int:
     """
     Heuristic:
     - Save high cards for future high diamonds.
-    - If current diamond is high (>=10), try to beat user's likely high with minimal necessary value.
+    - If current diamond is high (>= threshold), try to beat the opponents' highest remaining card with minimal necessary value.
     - If current diamond is low, dump the lowest card.
+    `opponent_high` is unknown (None, or 0) without a public view; `neutral_high` is assumed then.
     """
-    bot_vals = bot.remaining_values()
-    if not bot_vals:
+    hand = bot.hand
+    if not hand:
         raise RuntimeError("Bot has no cards to play")
 
-    high_diamond_threshold = 10
-    user_high = _estimate_user_high_remaining(known_user_remaining)  # Estimate user's high card
+    high_diamond_threshold = threshold
+    user_high = opponent_high or neutral_high
     # If diamond is low, dump lowest
     if diamond_value < high_diamond_threshold:
-        return min(bot_vals)
+        return hand.min()
 
-    # For high diamonds, try to minimally exceed user's likely high if possible
-    candidates = [v for v in bot_vals if v > user_high]
-    if candidates:
-        return min(candidates)
+    # For high diamonds, try to minimally exceed the opponents' high card if possible
+    candidate = hand.higher(user_high)
+    if candidate is not None:
+        return candidate
 
     # Else, play the smallest card >= diamond_value, else smallest available
-    atleast = [v for v in bot_vals if v >= diamond_value]
-    if atleast:
-        return min(atleast)
+    atleast = hand.ceil(diamond_value)
+    if atleast is not None:
+        return atleast
+
+    return hand.min()
+
+def _opponent_high(public: Optional[PublicInfo], seat: int) -> Optional[int]:
+    return public.opponent_high(seat) if public is not None else None
+
+def _scaled(value: int, size: int) -> int:
+    """A parameter given for 13 values, stretched to a deck of `size` values."""
+    return value if size == VALUES else round(value * size / VALUES)
+
+def _size(public: Optional[PublicInfo]) -> int:
+    return public.size if public is not None else VALUES
+
+def _smart(bot: Bot, diamond_value: int, public: Optional[PublicInfo], seat: int,
+           params: Optional[Dict[str, int]] = None) -> int:
+    """Smart with its parameters scaled to the game's deck size."""
+    size = _size(public)
+    if size == VALUES:
+        return _pick_smart(bot, diamond_value, _opponent_high(public, seat), **(params or {}))
+    p = {k: _scaled((params or {}).get(k, default), size) for k, (default, _, _) in PARAMETERS["smart"].items()}
+    return _pick_smart(bot, diamond_value, _opponent_high(public, seat), **p)
+
+def _single_opponent(public: Optional[PublicInfo], seat: int) -> Optional[int]:
+    """Seat of the only opponent, or None without a view or with several opponents."""
+    if public is None or len(public.hands) != 2:
+        return None
+    return 1 - seat
+
+def _pick_perfect(bot: Bot, diamond_value: int, public: Optional[PublicInfo] = None, seat: int = 0) -> int:
+    """
+    Play the endgame equilibrium once the position is small enough to solve
+    exactly (one opponent, at most endgame.MAX_CARDS cards each); otherwise smart.
+    """
+    opp = _single_opponent(public, seat)
+    if opp is None or len(bot.hand) > endgame.MAX_CARDS:
+        return _smart(bot, diamond_value, public, seat)
+    diff2 = round(2 * public.gap(seat))
+    cards, probs = endgame.solver.strategy(diamond_value, public.diamonds, bot.hand.mask, public.hands[opp], diff2)
+    return (bot.rng or random).choices(cards, weights=probs)[0]
+
+def _pick_mcts(bot: Bot, diamond_value: int, public: Optional[PublicInfo] = None, seat: int = 0) -> int:
+    """Monte Carlo search against a single opponent; smart otherwise."""
+    opp = _single_opponent(public, seat)
+    if opp is None:
+        return _smart(bot, diamond_value, public, seat)
+    return mcts.choose(bot, diamond_value, public.diamonds, public.hands[opp], round(2 * public.gap(seat)), public.size)
 
-    return min(bot_vals)
+def _pick_cfr(bot: Bot, diamond_value: int, public: Optional[PublicInfo] = None, seat: int = 0) -> int:
+    """Sample from the trained CFR policy against a single opponent in a 13-value game; smart otherwise."""
+    opp = _single_opponent(public, seat)
+    if opp is None or public.size != VALUES:
+        return _smart(bot, diamond_value, public, seat)
+    return cfr.choose(bot, diamond_value, public.diamonds, public.hands[opp], round(2 * public.gap(seat)))
 
 # --- Public strategy selector ---
-def choose_card(
-    bot: Bot,
-    diamond_value: int,
-    remaining_diamonds: List[int],
-    known_user_remaining: Optional[List[int]] = None,
-) -> int:
+def choose_card(bot: Bot, diamond_value: int, public: Optional[PublicInfo] = None, seat: int = 0) -> int:
+    """
+    Pick the value `bot`, sitting in `seat`, plays this round. `public` is the
+    game's public view as it stands before anyone plays this round (with this
+    round's diamond already drawn); without one, strategies that look at
+    opponents fall back to their no-information defaults.
+    """
+    sink = instrument.sink
+    if sink is None:
+        return _choose_card(bot, diamond_value, public, seat)
+    start = perf_counter()
+    value = _choose_card(bot, diamond_value, public, seat)
+    sink.decision(bot.difficulty, perf_counter() - start)
+    return value
+
+def _choose_card(bot: Bot, diamond_value: int, public: Optional[PublicInfo], seat: int) -> int:
     d = bot.difficulty.lower()
     if d == "random":
         return _pick_random(bot)
+    params = bot.params
+    size = _size(public)
+    if params or size != VALUES:  # parameters are given for 13 values and scaled
+        if d == "matching":
+            offset = _scaled((params or {}).get("offset", 0), size)
+            return _pick_matching(bot, diamond_value, offset, size)
+        if d == "smart":
+            return _smart(bot, diamond_value, public, seat, params)
     if d == "matching":
         return _pick_matching(bot, diamond_value)
     if d == "smart":
-        return _pick_smart(bot, diamond_value, remaining_diamonds, known_user_remaining)
+        return _pick_smart(bot, diamond_value, _opponent_high(public, seat))
+    if d == "perfect":
+        return _pick_perfect(bot, diamond_value, public, seat)
+    if d == "mcts":
+        return _pick_mcts(bot, diamond_value, public, seat)
+    if d == "cfr":
+        return _pick_cfr(bot, diamond_value, public, seat)
     # fallback to random
     return _pick_random(bot)
 
@@ -80,4 +159,101 @@ LEVELS = {
     "easy": "random",
     "medium": "matching",
     "expert": "smart",
+    "perfect": "perfect",
+    "mcts": "mcts",
+    "cfr": "cfr",
+}
+
+def playable_levels() -> List[str]:
+    """Registered levels that can play now; cfr levels only once a policy is available."""
+    return [name for name, strategy in LEVELS.items() if strategy != "cfr" or cfr.available()]
+
+
+def check_levels(levels: Sequence[str], size: int = VALUES):
+    """Raise ValueError if a cfr level would need a policy that is not available (two bots, 13 values)."""
+    if len(levels) == 2 and size == VALUES and any(LEVELS.get(level) == "cfr" for level in levels):
+        if not cfr.available():
+            raise ValueError(cfr.missing())
+
+# --- Parametric levels ---
+# Tunable parameters per strategy: name -> (default, lowest, highest).
+PARAMETERS: Dict[str, Dict[str, Tuple[int, int, int]]] = {
+    "random": {},
+    "matching": {"offset": (0, -3, 3)},  # play diamond + offset, else the next card up
+    "smart": {"threshold": (10, 1, 14)},  # diamonds from here up are contested (14: never)
+    "perfect": {},
+    "mcts": {},
+    "cfr": {},
 }
+
+# Parameters that no longer affect play; dropped when old level files are loaded.
+# smart's neutral_high only applied without a public view, which games always pass.
+_RETIRED: Dict[str, Tuple[str, ...]] = {"smart": ("neutral_high",)}
+
+# Non-default parameters of levels added with `register_level`.
+LEVEL_PARAMS: Dict[str, Dict[str, int]] = {}
+
+
+def strategy_params(strategy: str, params: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """Validate `params` for `strategy` and return only those that differ from the defaults."""
+    if strategy not in PARAMETERS:
+        raise ValueError(f"Unknown strategy: {strategy}")
+    known = PARAMETERS[strategy]
+    out = {}
+    for name, value in (params or {}).items():
+        if name not in known:
+            raise ValueError(f"{strategy} has no parameter {name!r}")
+        default, low, high = known[name]
+        if not low <= value <= high:
+            raise ValueError(f"{strategy} {name} must be between {low} and {high}, got {value}")
+        if value != default:
+            out[name] = int(value)
+    return out
+
+
+def register_level(name: str, strategy: str, params: Optional[Dict[str, int]] = None):
+    """Add (or replace) a named level playing `strategy` with the given parameters."""
+    if name in _BUILTIN_LEVELS:
+        raise ValueError(f"{name} is a built-in level")
+    if ":" in name or not name.strip():
+        raise ValueError(f"Invalid level name: {name!r}")
+    params = strategy_params(strategy, params)
+    LEVELS[name] = strategy
+    if params:
+        LEVEL_PARAMS[name] = params
+    else:
+        LEVEL_PARAMS.pop(name, None)
+
+
+def unregister_level(name: str):
+    if name in _BUILTIN_LEVELS:
+        raise ValueError(f"{name} is a built-in level")
+    LEVELS.pop(name, None)
+    LEVEL_PARAMS.pop(name, None)
+
+
+def save_levels(path: str, names: Iterable[str]):
+    """Write the given registered levels to a JSON file, keeping levels already in it."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        data = {}
+    for name in names:
+        data[name] = {"strategy": LEVELS[name], "params": LEVEL_PARAMS.get(name, {})}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load_levels(path: str) -> List[str]:
+    """Register every level in a JSON file written by `save_levels`; returns their names."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    for name, spec in data.items():
+        params = {k: v for k, v in (spec.get("params") or {}).items() if k not in _RETIRED.get(spec["strategy"], ())}
+        register_level(name, spec["strategy"], params)
+    return list(data)
+
+
+_BUILTIN_LEVELS = frozenset(LEVELS)
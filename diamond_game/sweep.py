@@ -0,0 +1,307 @@
+"""
+Parameter sweeps for the parametric strategies, with successive halving.
+
+Candidate configurations (a grid, or random samples from `PARAMETERS`) each
+play the same deals against a set of reference opponents; every configuration
+sees the same game ids, so differences between them are not deal luck. Games
+are handed out in rungs: all candidates get `min_games` games per opponent, the
+best 1/`eta` by mean score difference go on with `eta` times as many, and so
+on until one is left or `max_games` is reached. Weak settings are dropped after
+a few dozen games, and the budget goes to the close ones.
+
+Games run on the batched engine when every level has an array policy, otherwise
+one `Game` at a time, spread across a process pool. The best configurations can
+be saved as named levels that `strategies.load_levels` (and `--levels-file` on
+the tournament and ladder) registers again.
+
+    python -m diamond_game.sweep smart --grid threshold=6:14
+    python -m diamond_game.sweep matching --opponents easy expert --save levels.json --top 2
+"""
+import argparse
+import itertools
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from . import batched
+from .strategies import LEVELS, PARAMETERS, register_level, save_levels, strategy_params, unregister_level
+from .tournament import game_id, play_game
+
+DEFAULT_OPPONENTS = ("easy", "medium", "expert")
+
+
+@dataclass(frozen=True)
+class Config:
+    strategy: str
+    params: Tuple[Tuple[str, int], ...] = ()  # sorted (name, value) pairs that differ from the defaults
+
+    @classmethod
+    def of(cls, strategy: str, params: Optional[Dict[str, int]] = None) -> "Config":
+        # Defaults are dropped, so equal configurations compare equal.
+        return cls(strategy, tuple(sorted(strategy_params(strategy, params).items())))
+
+    @property
+    def label(self) -> str:
+        values = dict(self.params)
+        shown = ", ".join(f"{k}={values.get(k, d)}" for k, (d, _, _) in PARAMETERS[self.strategy].items())
+        return f"{self.strategy}({shown})"
+
+    def is_default(self) -> bool:
+        return not self.params
+
+
+def grid(strategy: str, values: Optional[Dict[str, Sequence[int]]] = None) -> List[Config]:
+    """Every combination of `values`, with unlisted parameters over their full range."""
+    ranges = _ranges(strategy, values)
+    names = list(ranges)
+    return [Config.of(strategy, dict(zip(names, combo))) for combo in itertools.product(*ranges.values())]
+
+
+def sample(
+    strategy: str, n: int, rng: random.Random, values: Optional[Dict[str, Sequence[int]]] = None
+) -> List[Config]:
+    """Up to `n` distinct configurations drawn uniformly from the same space as `grid`."""
+    ranges = _ranges(strategy, values)
+    size = math.prod(len(v) for v in ranges.values())
+    seen: Dict[Config, None] = {}
+    while len(seen) < min(n, size):
+        seen[Config.of(strategy, {k: rng.choice(v) for k, v in ranges.items()})] = None
+    return list(seen)
+
+
+def _ranges(strategy: str, values: Optional[Dict[str, Sequence[int]]]) -> Dict[str, Sequence[int]]:
+    if strategy not in PARAMETERS:
+        raise ValueError(f"Unknown strategy: {strategy}")
+    ranges = {k: range(low, high + 1) for k, (_, low, high) in PARAMETERS[strategy].items()}
+    for k, v in (values or {}).items():
+        if k not in ranges:
+            raise ValueError(f"{strategy} has no parameter {k!r}")
+        ranges[k] = list(v)
+    return ranges
+
+
+@dataclass
+class Trial:
+    config: Config
+    games: int = 0  # per opponent
+    n: int = 0  # all games, over every opponent
+    diff_sum: float = 0.0
+    diff_sq: float = 0.0
+    wins: int = 0
+    ties: int = 0
+    rung: int = 0  # last rung this configuration played in
+
+    def add(self, stats: Tuple[int, float, float, int, int]):
+        n, s, sq, wins, ties = stats
+        self.n += n
+        self.diff_sum += s
+        self.diff_sq += sq
+        self.wins += wins
+        self.ties += ties
+
+    def mean(self) -> float:
+        return self.diff_sum / self.n if self.n else 0.0
+
+    def stderr(self) -> float:
+        if self.n < 2:
+            return float("inf")
+        var = (self.diff_sq - self.n * self.mean() ** 2) / (self.n - 1)
+        return math.sqrt(max(var, 0.0) / self.n)
+
+    def score(self) -> float:
+        """Win rate with ties as half a win."""
+        return (self.wins + 0.5 * self.ties) / self.n if self.n else 0.0
+
+
+def _evaluate(
+    config: Config, opponents: Sequence[str], seed: int, start: int, stop: int
+) -> Tuple[int, float, float, int, int]:
+    """Play games [start, stop) against each opponent: (games, sum and sum of squares of the score
+    difference, wins, ties)."""
+    name = f"sweep/{config.label}"
+    register_level(name, config.strategy, dict(config.params))
+    n, total, sq, wins, ties = 0, 0.0, 0.0, 0, 0
+    try:
+        for opp in opponents:
+            levels = (name, opp)
+            ids = [game_id(seed, i) for i in range(start, stop)]
+            if batched.supports(levels):
+                scores = batched.play_batch(levels, ids).scores
+                diffs = (scores[:, 0] - scores[:, 1]).tolist()
+            else:
+                diffs = []
+                for gid in ids:
+                    g = play_game(levels, gid)
+                    diffs.append(g.bots[0].score - g.bots[1].score)
+            n += len(diffs)
+            total += sum(diffs)
+            sq += sum(d * d for d in diffs)
+            wins += sum(d > 0 for d in diffs)
+            ties += sum(d == 0 for d in diffs)
+    finally:
+        unregister_level(name)
+    return n, total, sq, wins, ties
+
+
+@dataclass
+class Sweep:
+    configs: Sequence[Config]
+    opponents: Sequence[str] = DEFAULT_OPPONENTS
+    seed: int = 0
+    min_games: int = 64
+    max_games: int = 4096
+    eta: int = 3
+    chunk: int = 1024  # games per task and opponent
+    trials: List[Trial] = field(init=False)
+
+    def __post_init__(self):
+        if not self.configs:
+            raise ValueError("Nothing to sweep")
+        unknown = [level for level in self.opponents if level not in LEVELS]
+        if unknown:
+            raise ValueError(f"Unknown bot level(s): {', '.join(unknown)}")
+        if self.eta < 2 or not 0 < self.min_games <= self.max_games:
+            raise ValueError("Need eta >= 2 and 0 < min_games <= max_games")
+        self.trials = [Trial(c) for c in dict.fromkeys(self.configs)]
+
+    @property
+    def games(self) -> int:
+        return sum(t.n for t in self.trials)
+
+    def _play(self, alive: List[Trial], budget: int, pool: Optional[ProcessPoolExecutor]):
+        tasks = []
+        for t in alive:
+            for a in range(t.games, budget, self.chunk):
+                tasks.append((t, a, min(a + self.chunk, budget)))
+            t.games = budget
+        if pool is None:
+            for t, a, b in tasks:
+                t.add(_evaluate(t.config, self.opponents, self.seed, a, b))
+            return
+        futures = [(t, pool.submit(_evaluate, t.config, self.opponents, self.seed, a, b)) for t, a, b in tasks]
+        for t, f in futures:
+            t.add(f.result())
+
+    def run(
+        self,
+        workers: Optional[int] = None,
+        on_rung: Optional[Callable[["Sweep", int, List[Trial]], None]] = None,
+    ) -> List[Trial]:
+        """Play every rung and return the trials, best first."""
+        workers = workers or os.cpu_count() or 1
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        alive = list(self.trials)
+        rung = 0
+        try:
+            while True:
+                budget = min(self.min_games * self.eta ** rung, self.max_games)
+                self._play(alive, budget, pool)
+                for t in alive:
+                    t.rung = rung
+                alive.sort(key=lambda t: -t.mean())
+                if on_rung is not None:
+                    on_rung(self, rung, alive)
+                if len(alive) == 1 or budget >= self.max_games:
+                    break
+                alive = alive[:max(1, math.ceil(len(alive) / self.eta))]
+                rung += 1
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return self.ranked()
+
+    def ranked(self) -> List[Trial]:
+        # Later rungs rank first: those results rest on more games.
+        return sorted(self.trials, key=lambda t: (-t.rung, -t.mean()))
+
+
+def format_trials(trials: Sequence[Trial], limit: Optional[int] = None) -> str:
+    lines = []
+    for i, t in enumerate(trials[:limit]):
+        default = "  (defaults)" if t.config.is_default() else ""
+        lines.append(
+            f"{i + 1:>4}. {t.config.label:<40} rung {t.rung} | {t.n:>7,} games | "
+            f"diff {t.mean():+7.2f} ± {1.96 * t.stderr():5.2f} | score {t.score():6.1%}{default}"
+        )
+    return "\n".join(lines)
+
+
+def _parse_values(text: str) -> Tuple[str, List[int]]:
+    """"name=a:b" (inclusive range) or "name=a,b,c"."""
+    name, sep, spec = text.partition("=")
+    try:
+        if not sep:
+            raise ValueError
+        if ":" in spec:
+            low, high = spec.split(":")
+            return name, list(range(int(low), int(high) + 1))
+        return name, [int(v) for v in spec.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected NAME=LOW:HIGH or NAME=V1,V2,..., got {text!r}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Successive-halving parameter sweep for a bot strategy.")
+    parser.add_argument("strategy", choices=[s for s, p in PARAMETERS.items() if p])
+    parser.add_argument("--grid", nargs="+", type=_parse_values, default=[], metavar="NAME=LOW:HIGH",
+                        help="values to try per parameter (default: its full range)")
+    parser.add_argument("--samples", type=int, default=None, help="try this many random configurations instead")
+    parser.add_argument("--opponents", nargs="+", default=list(DEFAULT_OPPONENTS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-games", type=int, default=64, help="games per opponent in the first rung")
+    parser.add_argument("--max-games", type=int, default=4096, help="games per opponent in the last rung")
+    parser.add_argument("--eta", type=int, default=3, help="keep the best 1/eta after each rung")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--save", default=None, help="save the best configurations as levels in this JSON file")
+    parser.add_argument("--top", type=int, default=1, help="how many configurations to save")
+    parser.add_argument("--prefix", default=None, help="saved level names (default: STRATEGY-tuned)")
+    args = parser.parse_args(argv)
+
+    try:
+        values = dict(args.grid)
+        if args.samples:
+            configs = sample(args.strategy, args.samples, random.Random(args.seed), values)
+        else:
+            configs = grid(args.strategy, values)
+        # The untuned strategy is always in the running, as the baseline.
+        configs = [Config.of(args.strategy)] + configs
+        sweep = Sweep(configs, args.opponents, args.seed, args.min_games, args.max_games, args.eta)
+    except ValueError as e:
+        parser.error(str(e))
+    start = time.perf_counter()
+
+    def progress(sw: Sweep, rung: int, alive: List[Trial]):
+        print(f"[{time.perf_counter() - start:7.1f}s] rung {rung}: {len(alive)} configurations, "
+              f"{alive[0].games:,} games per opponent, {sw.games:,} games so far")
+        print(format_trials(alive, limit=5))
+        sys.stdout.flush()
+
+    ranked = sweep.run(args.workers, progress)
+    flat = len(sweep.trials) * args.max_games * len(args.opponents)
+    print("\nFinal ranking:")
+    print(format_trials(ranked, limit=15))
+    print(
+        f"Played {sweep.games:,} games in {time.perf_counter() - start:.1f}s; every configuration at "
+        f"{args.max_games:,} games per opponent would be {flat:,} ({1 - sweep.games / flat:.0%} saved)."
+    )
+    if args.save:
+        prefix = args.prefix or f"{args.strategy}-tuned"
+        names = []
+        for i, t in enumerate(ranked[:args.top]):
+            name = f"{prefix}{i + 1}" if args.top > 1 else prefix
+            register_level(name, t.config.strategy, dict(t.config.params))
+            names.append(name)
+        save_levels(args.save, names)
+        print(f"Saved {', '.join(names)} to {args.save}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -0,0 +1,191 @@
+"""
+Precomputed decision tables for the deterministic strategies.
+
+`matching` and `smart` depend only on the bot's hand, the diamond value and
+(for smart) the opponent's estimated high card, so every reachable input can
+be enumerated ahead of time: all 8191 non-empty 13-card hands by 13 diamonds,
+times 13 estimated highs for smart. Entries are one byte each and the file is
+memory-mapped, so a decision becomes a single indexed read. The batched engine
+gathers whole rounds from them; a scalar `choose_card` is no faster with a table
+read than with the bit operations, so it does not use them.
+
+    python -m diamond_game.tables build --out decision_tables.bin
+    python -m diamond_game.tables verify decision_tables.bin
+
+    from diamond_game import tables
+    tables.load("decision_tables.bin")   # play_batch now uses the tables
+
+Empty hands and inputs outside the table read as 0 from the scalar lookups
+(used by `verify`); the batched engine only plays the standard deck, whose
+inputs are all inside the table.
+"""
+import argparse
+import mmap
+import os
+import struct
+import time
+from typing import Optional, Tuple
+
+from .cards import VALUES
+from .hand import BitHand
+
+VERSION = 1
+MAGIC = b"DGT1"
+
+_HEADER = struct.Struct("<4sHH")  # magic, version, values
+_HANDS = 1 << VALUES
+_LIMIT = 1 << (VALUES + 1)  # first mask bit outside the table
+_MATCHING_SIZE = _HANDS * VALUES
+_SMART_SIZE = _HANDS * VALUES * VALUES
+
+
+def _matching_index(mask: int, diamond: int) -> int:
+    return (mask >> 1) * VALUES + diamond - 1
+
+
+def _smart_index(mask: int, diamond: int, user_high: int) -> int:
+    return ((mask >> 1) * VALUES + diamond - 1) * VALUES + user_high - 1
+
+
+class _TableBot:
+    """Just enough of a `Bot` for the strategy helpers."""
+    __slots__ = ("hand",)
+
+    def __init__(self, mask: int):
+        self.hand = BitHand("", mask)
+
+
+def generate() -> bytes:
+    """Run the reference strategies over every input and pack the answers."""
+    from .strategies import _pick_matching, _pick_smart
+
+    matching = bytearray(_MATCHING_SIZE)
+    smart = bytearray(_SMART_SIZE)
+    for h in range(1, _HANDS):
+        bot = _TableBot(h << 1)
+        for d in range(1, VALUES + 1):
+            matching[_matching_index(bot.hand.mask, d)] = _pick_matching(bot, d)
+            base = _smart_index(bot.hand.mask, d, 1)
+            for uh in range(1, VALUES + 1):
+                smart[base + uh - 1] = _pick_smart(bot, d, uh)
+    return _HEADER.pack(MAGIC, VERSION, VALUES) + bytes(matching) + bytes(smart)
+
+
+def build(path: str) -> int:
+    """Generate the tables and write them atomically to `path`; returns the file size."""
+    data = generate()
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+class DecisionTables:
+    """Read-only view of a tables file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, values = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION or values != VALUES:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {VERSION} decision table file")
+        if len(self._mm) != _HEADER.size + _MATCHING_SIZE + _SMART_SIZE:
+            self._mm.close()
+            raise ValueError(f"{path} is truncated")
+        self._buf = memoryview(self._mm)
+        # Offsets fold in the -1 of the 1-based value indexes.
+        self._matching = _HEADER.size - 1
+        self._smart = _HEADER.size + _MATCHING_SIZE - VALUES - 1
+
+    def __len__(self) -> int:
+        return len(self._buf)
+
+    # Values are at least 1, so one comparison checks that the hand and every
+    # value fit in the table.
+    def matching(self, mask: int, diamond: int) -> int:
+        if mask | 1 << diamond >= _LIMIT:
+            return 0
+        return self._buf[self._matching + (mask >> 1) * VALUES + diamond]
+
+    def smart(self, mask: int, diamond: int, user_high: int) -> int:
+        if mask | 1 << diamond | 1 << user_high >= _LIMIT:
+            return 0
+        return self._buf[self._smart + ((mask >> 1) * VALUES + diamond) * VALUES + user_high]
+
+    def sections(self) -> Tuple[memoryview, memoryview]:
+        """Raw (matching, smart) bytes, indexed [mask >> 1][diamond - 1] and
+        [mask >> 1][diamond - 1][user_high - 1], for array-based callers."""
+        start = _HEADER.size
+        return self._buf[start:start + _MATCHING_SIZE], self._buf[start + _MATCHING_SIZE:]
+
+    def close(self):
+        self._buf.release()
+        try:
+            self._mm.close()
+        except BufferError:
+            pass  # still viewed through `sections()`; unmapped once those are gone
+
+
+def verify(t: DecisionTables) -> int:
+    """Compare every entry against the reference strategies; returns the mismatch count."""
+    from .strategies import _pick_matching, _pick_smart
+
+    mismatches = 0
+    for h in range(1, _HANDS):
+        bot = _TableBot(h << 1)
+        mask = bot.hand.mask
+        for d in range(1, VALUES + 1):
+            mismatches += t.matching(mask, d) != _pick_matching(bot, d)
+            for uh in range(1, VALUES + 1):
+                mismatches += t.smart(mask, d, uh) != _pick_smart(bot, d, uh)
+    return mismatches
+
+
+# The tables `play_batch` gathers from; None means it uses the array policies.
+active: Optional[DecisionTables] = None
+
+
+def load(path: str) -> DecisionTables:
+    global active
+    unload()
+    active = DecisionTables(path)
+    return active
+
+
+def unload():
+    global active
+    if active is not None:
+        active.close()
+        active = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or verify precomputed decision tables.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_p = sub.add_parser("build", help="generate the tables file")
+    build_p.add_argument("--out", default="decision_tables.bin")
+    verify_p = sub.add_parser("verify", help="check a tables file against the strategies")
+    verify_p.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        size = build(args.out)
+        print(f"Wrote {args.out}: {size:,} bytes in {time.perf_counter() - start:.2f}s")
+        path = args.out
+    else:
+        path = args.path
+    t = DecisionTables(path)
+    start = time.perf_counter()
+    mismatches = verify(t)
+    t.close()
+    print(f"Verified {_MATCHING_SIZE - VALUES + _SMART_SIZE - VALUES * VALUES:,} entries "
+          f"in {time.perf_counter() - start:.2f}s: {mismatches} mismatches")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,379 @@
+"""
+Headless bot-vs-bot tournaments.
+
+Games are played without prompts or per-round output and are spread across a
+process pool. Each game's id is derived from the tournament seed and game index,
+and the game seeds its own RNG from that id, so results are reproducible, merged
+in game order regardless of worker count, and any game can be replayed from its
+id. Every matchup with the same seed plays the same deals.
+
+With `--paired`, consecutive games share a deal with the seats swapped, and the
+score difference is averaged per deal so deal luck cancels out.
+
+    python -m diamond_game.tournament medium:expert easy:expert --games 10000 --seed 42
+    python -m diamond_game.tournament easy:expert --games 10000 --paired
+    python -m diamond_game.tournament easy:expert --replay GAME_ID
+"""
+import argparse
+import math
+import os
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from . import instrument
+from .archive import ArchiveWriter
+from .cards import VALUES
+from .events import EventWriter, round_events
+from .game import Game
+from .results import GameRecord, ResultsStore
+from .strategies import LEVELS, check_levels, load_levels
+
+BOT_SUITS = ("♠", "♣", "♥", "♦")
+
+# Fixed namespace so tournament game ids are stable across runs and machines.
+_GAME_NAMESPACE = uuid.UUID("6f1d3c2e-8b4a-5e7f-9a0b-1c2d3e4f5a6b")
+
+
+@dataclass
+class GameOutcome:
+    game_index: int
+    scores: Tuple[float, ...]  # in matchup level order, also for seat-swapped games
+    winner: int  # index into the matchup levels of the winner, -1 on a tie
+    rounds: Optional[List[Tuple[int, ...]]] = None  # (diamond, *plays) per round, when recorded
+    game_id: Optional[str] = None
+    deal_id: Optional[str] = None  # set when the deck came from another game (paired mode)
+    swapped: bool = False  # seats were reversed relative to the matchup levels
+
+
+@dataclass
+class MatchupResult:
+    bot_levels: Tuple[str, ...]
+    seed: int
+    outcomes: List[GameOutcome] = field(default_factory=list)
+    elapsed: float = 0.0
+    profile: Optional[instrument.MemorySink] = None
+    paired: bool = False
+
+    @property
+    def games(self) -> int:
+        return len(self.outcomes)
+
+    @property
+    def games_per_sec(self) -> float:
+        return self.games / self.elapsed if self.elapsed > 0 else float("inf")
+
+    def wins(self) -> List[int]:
+        counts = [0] * len(self.bot_levels)
+        for o in self.outcomes:
+            if o.winner >= 0:
+                counts[o.winner] += 1
+        return counts
+
+    def ties(self) -> int:
+        return sum(1 for o in self.outcomes if o.winner < 0)
+
+    def mean_scores(self) -> List[float]:
+        if not self.outcomes:
+            return [0.0] * len(self.bot_levels)
+        n = len(self.outcomes)
+        return [sum(o.scores[i] for o in self.outcomes) / n for i in range(len(self.bot_levels))]
+
+    def score_diff(self) -> Tuple[float, float]:
+        """
+        Mean score difference (first level minus second) and its standard error.
+        Paired games are averaged per deal first.
+        """
+        diffs = [o.scores[0] - o.scores[1] for o in self.outcomes]
+        if self.paired:
+            diffs = [(a + b) / 2 for a, b in zip(diffs[::2], diffs[1::2])]
+        if len(diffs) < 2:
+            return (diffs[0] if diffs else 0.0), float("inf")
+        return statistics.fmean(diffs), statistics.stdev(diffs) / math.sqrt(len(diffs))
+
+
+def compare_results(a: MatchupResult, b: MatchupResult) -> Tuple[float, float]:
+    """
+    Difference between two matchups' mean score differences, with its standard
+    error. Results played with the same seed share deals (and the random draws of
+    a common opponent), so they are compared game by game and the shared luck
+    cancels; otherwise they are treated as independent samples.
+    """
+    if a.seed == b.seed and a.paired == b.paired and a.games == b.games:
+        diffs = [
+            (x.scores[0] - x.scores[1]) - (y.scores[0] - y.scores[1])
+            for x, y in zip(a.outcomes, b.outcomes)
+        ]
+        if len(diffs) < 2:
+            return (diffs[0] if diffs else 0.0), float("inf")
+        return statistics.fmean(diffs), statistics.stdev(diffs) / math.sqrt(len(diffs))
+    (mean_a, se_a), (mean_b, se_b) = a.score_diff(), b.score_diff()
+    return mean_a - mean_b, math.hypot(se_a, se_b)
+
+
+def game_id(seed: int, game_index: int) -> str:
+    """Id of game `game_index` in a tournament with `seed`; the id also seeds the game."""
+    return str(uuid.uuid5(_GAME_NAMESPACE, f"{seed}:{game_index}"))
+
+
+def new_game(
+    bot_levels: Sequence[str], game_id: Optional[str] = None, deal_id: Optional[str] = None, deck_size: int = VALUES
+) -> Game:
+    """Create a bot-only game for the given levels (one bot per level) with `deck_size` values per suit."""
+    n = len(bot_levels)
+    extra = {"id": game_id} if game_id is not None else {}
+    return Game(
+        bot_names=[f"Bot {i+1}" for i in range(n)],
+        bot_suits=[BOT_SUITS[i % len(BOT_SUITS)] for i in range(n)],
+        bot_levels=list(bot_levels),
+        deal_id=deal_id,
+        deck_size=deck_size,
+        **extra,
+    )
+
+
+def play_game(
+    bot_levels: Sequence[str], game_id: Optional[str] = None, deal_id: Optional[str] = None, deck_size: int = VALUES
+) -> Game:
+    """Play one full game silently and return it. The same id (and deal) replays the same game."""
+    g = new_game(bot_levels, game_id, deal_id, deck_size)
+    while not g.is_over():
+        g.play_round()
+    return g
+
+
+def _outcome(game_index: int, g: Game, record: bool = False, swapped: bool = False) -> GameOutcome:
+    scores = tuple(b.score for b in g.bots)
+    rounds = None
+    if record:
+        rounds = [(r.diamond.value,) + r.plays for r in g.history]
+    if swapped:
+        scores = scores[::-1]
+        if rounds is not None:
+            rounds = [(r[0],) + r[:0:-1] for r in rounds]
+    best = max(scores)
+    winners = [i for i, s in enumerate(scores) if s == best]
+    deal_id = g.deal_id if g.deal_id != g.id else None
+    return GameOutcome(
+        game_index, scores, winners[0] if len(winners) == 1 else -1, rounds, g.id, deal_id, swapped
+    )
+
+
+def _play_one(bot_levels: Tuple[str, ...], seed: int, i: int, record: bool, paired: bool) -> GameOutcome:
+    # In paired mode odd games replay the previous game's deal with the seats reversed.
+    if paired and i % 2:
+        g = play_game(bot_levels[::-1], game_id(seed, i), deal_id=game_id(seed, i - 1))
+        return _outcome(i, g, record, swapped=True)
+    return _outcome(i, play_game(bot_levels, game_id(seed, i)), record)
+
+
+def _play_chunk(
+    bot_levels: Tuple[str, ...],
+    seed: int,
+    start: int,
+    stop: int,
+    record: bool = False,
+    profile: bool = False,
+    paired: bool = False,
+) -> Tuple[List[GameOutcome], Optional[Dict]]:
+    """Play games [start, stop); with `profile`, also return an instrumentation snapshot."""
+    if not profile:
+        return [_play_one(bot_levels, seed, i, record, paired) for i in range(start, stop)], None
+    previous = instrument.sink
+    sink = instrument.enable()
+    try:
+        outcomes = [_play_one(bot_levels, seed, i, record, paired) for i in range(start, stop)]
+    finally:
+        instrument.sink = previous
+    return outcomes, sink.snapshot()
+
+
+def _chunks(games: int, workers: int, start: int = 0) -> List[Tuple[int, int]]:
+    # A few chunks per worker keeps the pool busy without per-game IPC.
+    size = max(1, games // (workers * 4))
+    stop = start + games
+    return [(s, min(s + size, stop)) for s in range(start, stop, size)]
+
+
+def run_matchup(
+    bot_levels: Sequence[str],
+    games: int,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    executor: Optional[ProcessPoolExecutor] = None,
+    record: bool = False,
+    profile: bool = False,
+    paired: bool = False,
+    start: int = 0,
+) -> MatchupResult:
+    """
+    Play `games` games between the given levels and merge results in game order.
+    With `record`, each outcome also keeps its per-round plays; with `profile`,
+    instrumentation from every worker is merged into `result.profile`. With
+    `paired` (two bots, even `games`), each deal is played twice with seats swapped.
+    `start` offsets the game indexes, so a matchup can be extended in batches.
+    """
+    for level in bot_levels:
+        if level not in LEVELS:
+            raise ValueError(f"Unknown bot level: {level}")
+    check_levels(bot_levels)
+    if paired and (len(bot_levels) != 2 or games % 2 or start % 2):
+        raise ValueError("Paired mode needs two bot levels and an even number of games and start")
+    levels = tuple(bot_levels)
+    workers = workers or os.cpu_count() or 1
+    result = MatchupResult(bot_levels=levels, seed=seed, paired=paired)
+    if profile:
+        result.profile = instrument.MemorySink()
+
+    began = time.perf_counter()
+    if workers == 1 and executor is None:
+        chunk_results = [_play_chunk(levels, seed, start, start + games, record, profile, paired)]
+    else:
+        chunks = _chunks(games, workers, start)
+        own = executor is None
+        pool = executor or ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = [pool.submit(_play_chunk, levels, seed, a, b, record, profile, paired) for a, b in chunks]
+            # Futures are collected in submission order, so the merge is deterministic.
+            chunk_results = [f.result() for f in futures]
+        finally:
+            if own:
+                pool.shutdown()
+    for outcomes, snap in chunk_results:
+        result.outcomes.extend(outcomes)
+        if snap is not None:
+            result.profile.merge(snap)
+    result.elapsed = time.perf_counter() - began
+    return result
+
+
+def run_tournament(
+    pairs: Sequence[Sequence[str]],
+    games: int,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    record: bool = False,
+    profile: bool = False,
+    paired: bool = False,
+) -> List[MatchupResult]:
+    """Run every matchup in `pairs`, sharing one process pool."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [run_matchup(p, games, seed, workers=1, record=record, profile=profile, paired=paired) for p in pairs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [
+            run_matchup(p, games, seed, workers, executor=pool, record=record, profile=profile, paired=paired)
+            for p in pairs
+        ]
+
+
+def format_result(r: MatchupResult) -> str:
+    names = " vs ".join(r.bot_levels)
+    wins = " / ".join(str(w) for w in r.wins())
+    means = " / ".join(f"{s:.2f}" for s in r.mean_scores())
+    diff = ""
+    if len(r.bot_levels) == 2:
+        mean, stderr = r.score_diff()
+        diff = f" | diff {mean:+.2f} ± {1.96 * stderr:.2f}{' (paired)' if r.paired else ''}"
+    return (
+        f"{names}: {r.games} games | wins {wins} | ties {r.ties()} | "
+        f"mean scores {means}{diff} | {r.elapsed:.2f}s ({r.games_per_sec:,.0f} games/sec)"
+    )
+
+
+def _parse_pair(text: str) -> Tuple[str, ...]:
+    levels = tuple(p.strip() for p in text.split(":"))
+    if len(levels) < 2 or any(level not in LEVELS for level in levels):
+        raise argparse.ArgumentTypeError(
+            f"expected LEVEL:LEVEL with levels from {', '.join(LEVELS)}, got {text!r}"
+        )
+    return levels
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run headless bot-vs-bot tournaments.")
+    parser.add_argument("pairs", nargs="+", help="matchups such as medium:expert")
+    parser.add_argument("--games", type=int, default=1000, help="games per matchup")
+    parser.add_argument("--seed", type=int, default=0, help="tournament seed")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--db", default=None, help="also store every game in this SQLite results database")
+    parser.add_argument("--events", default=None, help="also append per-round events to this JSONL file")
+    parser.add_argument("--archive", default=None, help="also append every game to this binary game archive")
+    parser.add_argument("--profile", action="store_true", help="print an instrumentation summary at the end")
+    parser.add_argument("--paired", action="store_true", help="play each deal twice with seats swapped")
+    parser.add_argument("--replay", default=None, metavar="GAME_ID", help="replay one game of the first matchup")
+    parser.add_argument("--deal", default=None, metavar="GAME_ID", help="with --replay: id the deck was dealt from")
+    parser.add_argument("--levels-file", default=None, help="register extra levels saved by diamond_game.sweep")
+    args = parser.parse_args(argv)
+    try:
+        if args.levels_file:
+            load_levels(args.levels_file)
+        # Parsed only now, so that levels from --levels-file are known.
+        args.pairs = [_parse_pair(p) for p in args.pairs]
+        for levels in args.pairs:
+            check_levels(levels)
+    except (OSError, ValueError, argparse.ArgumentTypeError) as e:
+        parser.error(str(e))
+    if args.db and any(len(p) != 2 for p in args.pairs):
+        parser.error("--db stores two-bot games only")
+    if args.archive and len({len(p) for p in args.pairs}) > 1:
+        parser.error("--archive needs matchups with the same number of bots")
+    if args.paired and (any(len(p) != 2 for p in args.pairs) or args.games % 2):
+        parser.error("--paired needs two-bot matchups and an even --games")
+
+    if args.replay:
+        g = play_game(args.pairs[0], args.replay, args.deal)
+        for r in g.history:
+            print(f"Round {r.round_no:>2}: {r.diamond} | {' vs '.join(r.bot_play)} -> {r.winner}")
+        print(f"Final scores: {g.summary()['final_scores']}")
+        return
+
+    total_games = 0
+    start = time.perf_counter()
+    results = run_tournament(
+        args.pairs, args.games, args.seed, args.workers, record=bool(args.db or args.events or args.archive), profile=args.profile,
+        paired=args.paired,
+    )
+    for r in results:
+        print(format_result(r))
+        total_games += r.games
+    elapsed = time.perf_counter() - start
+    print(f"Total: {total_games} games in {elapsed:.2f}s ({total_games / elapsed:,.0f} games/sec)")
+
+    if args.profile:
+        combined = instrument.MemorySink()
+        for r in results:
+            combined.merge(r.profile.snapshot())
+        print(combined.format_summary())
+
+    if args.events:
+        with EventWriter(args.events) as out:
+            for r in results:
+                for o in r.outcomes:
+                    out.write_many(round_events(o.game_id, o.rounds))
+        print(f"Wrote {out.written} round events to {args.events}")
+
+    if args.db:
+        with ResultsStore(args.db) as store:
+            stored = store.add_games(
+                GameRecord(r.bot_levels, [tuple(x) for x in o.rounds], o.game_id) for r in results for o in r.outcomes
+            )
+        print(f"Stored {stored} games in {args.db}")
+
+    if args.archive:
+        with ArchiveWriter(args.archive, bots=len(args.pairs[0])) as archive:
+            for r in results:
+                for o in r.outcomes:
+                    archive.add_outcome(r.bot_levels, o)
+        print(f"Archived {archive.written} games in {args.archive}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -1,57 +1,161 @@
+"""
+Streamlit front end: play against a bot, or look at recorded results.
+
+    streamlit run streamlit_app.py
+
+The dashboard reads a replay archive or a SQLite results database through
+`diamond_game.dashboard`. The feed is a cached resource, so each rerun adds
+only the games appended since the previous one, and the tables derived from
+it are cached by game count.
+"""
+import numpy as np
+import pandas as pd
 import streamlit as st
-from diamond_game import game, players, cards, strategies
-from itertools import cycle
-from diamond_game import players
-
-st.title("Diamond Card Game")
-
-
-
-
-# Game setup
-if 'game' not in st.session_state:
-    st.session_state['game'] = None
-    st.session_state['players'] = []
-    st.session_state['started'] = False
-
-# Limit to 2 human players, plus 1 bot
-num_players = st.number_input("Number of human players (max 2):", min_value=1, max_value=2, value=2)
-player_names = []
-for i in range(num_players):
-    name = st.text_input(f"Player {i+1} name:", value=f"Player {i+1}")
-    player_names.append(name)
-
-bot_name = st.text_input("Bot name:", value="Bot")
-if st.button("Start Game", key="start_game_1"):
-    # Create a cycle of suits to assign to players
-    suits = cycle(["♥", "♠", "♣", "♦"])
-    # Create human players with assigned suits
-    human_players = [players.Player(name, next(suits)) for name in player_names]
-    # Create bot player with an assigned suit
-    bot_player = players.Player(bot_name, next(suits))
-
-if st.button("Start Game", key="start_game_2"):
-    human_players = [players.Player(name) for name in player_names]
-    # Add bot using a strategy (replace with your bot implementation if needed)
-    bot_player = players.Player(bot_name)
-    # If you have a bot strategy, assign it here
-    # bot_player.strategy = strategies.BotStrategy()
-    all_players = human_players + [bot_player]
-    st.session_state['players'] = all_players
-    st.session_state['game'] = game.Game(all_players)
-    st.session_state['started'] = True
-    st.success("Game started!")
-
-if st.session_state['started']:
-    st.header("Game Actions")
-    current_player = st.session_state['game'].current_player()
-    st.write(f"Current player: {current_player.name}")
-    hand = current_player.hand
-    card_choice = st.selectbox("Choose a card to play:", hand)
-    if st.button("Play Card"):
-        st.session_state['game'].play_card(current_player, card_choice)
-        st.success(f"{current_player.name} played {card_choice}")
-    st.write("Game State:")
-    st.write(st.session_state['game'].get_state())
-
-# Add more game actions and UI as needed
+
+from diamond_game.cards import suit_labels
+from diamond_game.dashboard import SCORE_BINS, VALUES, open_feed
+from diamond_game.game import Game
+from diamond_game.strategies import playable_levels
+
+PAGE_SIZE = 100
+
+st.set_page_config(page_title="Diamond Card Game", layout="wide")
+LEVEL_CHOICES = playable_levels()
+
+
+# --- Play ---
+def new_game(mode: str, levels):
+    if mode == "You vs bot":
+        # The human holds seat 0 and always plays through an override.
+        return Game(human_names=[], human_suits=[], bot_names=["You", "Bot"], bot_levels=["medium", levels[1]])
+    return Game(human_names=[], human_suits=[], bot_names=["Bot 1", "Bot 2"], bot_levels=list(levels))
+
+
+def play_page():
+    st.title("Diamond Card Game")
+    mode = st.sidebar.radio("Mode", ["You vs bot", "Bot vs bot"])
+    cols = st.sidebar.columns(2)
+    first = cols[0].selectbox("Bot 1 level", LEVEL_CHOICES, index=LEVEL_CHOICES.index("medium"),
+                              disabled=mode == "You vs bot")
+    second = cols[1].selectbox("Bot 2 level", LEVEL_CHOICES, index=LEVEL_CHOICES.index("expert"))
+    if st.sidebar.button("Start Game", type="primary"):
+        st.session_state.game = new_game(mode, (first, second))
+        st.session_state.mode = mode
+
+    g = st.session_state.get("game")
+    if g is None:
+        st.info("Pick the bot levels and press Start Game.")
+        return
+    human = st.session_state.mode == "You vs bot"
+    names = [b.name for b in g.bots]
+    st.caption(" vs ".join(name if human and i == 0 else f"{name} ({g.bot_levels[i]})" for i, name in enumerate(names)))
+
+    score_cols = st.columns(len(g.bots) + 1)
+    for col, b in zip(score_cols, g.bots):
+        col.metric(b.name, f"{b.score:g}")
+    score_cols[-1].metric("Round", f"{min(g.round_no + 1, 13)} / 13" if not g.is_over() else "done")
+
+    if not g.is_over():
+        diamond = g.deck[g.round_no]
+        st.subheader(f"Diamond: {suit_labels(diamond.suit)[diamond.value]}  ({diamond.value} points)")
+        if human:
+            you = g.bots[0]
+            labels = suit_labels(you.suit)
+            value = st.radio("Your card", you.remaining_values(), format_func=labels.__getitem__, horizontal=True)
+            if st.button("Play card"):
+                g.play_round({0: value})
+                st.rerun()
+        elif st.button("Play round"):
+            g.play_round()
+            st.rerun()
+    else:
+        top = max(b.score for b in g.bots)
+        st.success(f"Game over. Winner: {', '.join(b.name for b in g.bots if b.score == top)}")
+
+    if g.history:
+        st.dataframe(pd.DataFrame({
+            "round": [r.round_no for r in g.history],
+            "diamond": [r.diamond.value for r in g.history],
+            **{name: [r.bot_play[i] for r in g.history] for i, name in enumerate(names)},
+            "won by": [", ".join(names[i] for i in r.winners) for r in g.history],
+        }), hide_index=True, width="stretch")
+
+
+# --- Dashboard ---
+@st.cache_resource(show_spinner=False)
+def get_feed(path: str):
+    # One feed per source for the whole server; each rerun polls it for new games.
+    return open_feed(path)
+
+
+@st.cache_data(show_spinner=False)
+def win_table(_feed, path: str, games: int):
+    levels, rate, met = _feed.totals.win_matrix()
+    return pd.DataFrame(rate, index=levels, columns=levels), pd.DataFrame(met, index=levels, columns=levels)
+
+
+@st.cache_data(show_spinner=False)
+def score_table(_feed, path: str, games: int):
+    t = _feed.totals
+    hist = pd.DataFrame(t.score_hist.T, index=np.arange(SCORE_BINS) / 2, columns=t.levels)
+    return hist[hist.sum(axis=1) > 0], pd.Series(t.mean_scores(), index=t.levels, name="mean score")
+
+
+@st.cache_data(show_spinner=False)
+def diamond_table(_feed, path: str, games: int):
+    t = _feed.totals
+    return pd.DataFrame(t.diamond_rates().T, index=pd.Index(range(1, VALUES + 1), name="diamond"), columns=t.levels)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def game_page(_feed, path: str, start: int, size: int, games: int):
+    return pd.DataFrame(_feed.page(start, size))
+
+
+def dashboard_page():
+    st.title("Results")
+    path = st.sidebar.text_input("Archive or results database", "games.dga")
+    st.sidebar.caption("Convert the CLI's CSV with `python -m diamond_game.archive convert`.")
+    try:
+        feed = get_feed(path)
+    except (OSError, ValueError) as e:
+        st.warning(str(e))
+        return
+    st.sidebar.button("Refresh")  # any click reruns the script, which polls below
+    new = feed.poll()
+    games = feed.totals.games
+    st.metric("Games", f"{games:,}", delta=f"+{new:,}" if new else None)
+    if not games:
+        st.info("No games recorded yet.")
+        return
+
+    st.subheader("Win rate by level")
+    st.caption("Row level's score against the column level over every pairing of seats; a tie counts as half.")
+    rate, met = win_table(feed, path, games)
+    st.dataframe(rate.style.format("{:.1%}", na_rep=""), width="stretch")
+    with st.expander("Games per pairing"):
+        st.dataframe(met, width="stretch")
+
+    st.subheader("Final scores")
+    hist, means = score_table(feed, path, games)
+    shown = st.multiselect("Levels", list(hist.columns), default=list(hist.columns))
+    if shown:
+        st.bar_chart(hist[shown])
+    st.dataframe(means.to_frame().T.style.format("{:.2f}"), width="stretch")
+
+    st.subheader("Round win rate by diamond")
+    st.caption("Share of rounds with each diamond value that the level won; a split counts as half.")
+    st.line_chart(diamond_table(feed, path, games))
+
+    st.subheader("Games")
+    pages = max(1, -(-len(feed) // PAGE_SIZE))
+    page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, value=1)
+    st.dataframe(game_page(feed, path, (page - 1) * PAGE_SIZE, PAGE_SIZE, games),
+                 hide_index=True, width="stretch")
+
+
+page = st.sidebar.radio("Page", ["Play", "Dashboard"])
+if page == "Play":
+    play_page()
+else:
+    dashboard_page()